@@ -0,0 +1,55 @@
+"""
+Cold-start benchmark: package import, first open and first read.
+
+Each sample runs in a fresh interpreter so module import and codec loading
+costs are measured the way short-lived CLI jobs and serverless workers see them.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--repeat N] [--file PATH]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from common import make_synthetic_ome, summarize
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import mxtifffile
+t1 = time.perf_counter()
+f = mxtifffile.MxTiffFile(sys.argv[1])
+t2 = time.perf_counter()
+f.read_region(f.biomarkers[0], pos=(0, 0), shape=(256, 256))
+t3 = time.perf_counter()
+f.read_region(f.biomarkers[-1], pos=(256, 256), shape=(256, 256))
+t4 = time.perf_counter()
+f.close()
+print(json.dumps({"import": t1 - t0, "open": t2 - t1,
+                  "first_read": t3 - t2, "second_read": t4 - t3}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--file', default=None, help='TIFF to open (default: synthetic OME-TIFF)')
+    args = parser.parse_args()
+
+    path = args.file or make_synthetic_ome(channels=8, size=(2048, 2048))
+    results = {"import": [], "open": [], "first_read": [], "second_read": []}
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, '-c', _PROBE, path],
+                             check=True, capture_output=True, text=True)
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        for key, value in sample.items():
+            results[key].append(value)
+
+    print(f"file: {path}")
+    for key, samples in results.items():
+        summarize(key, samples)
+
+
+if __name__ == '__main__':
+    main()
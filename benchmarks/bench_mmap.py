@@ -0,0 +1,44 @@
+"""
+Random crop latency on uncompressed files with and without use_mmap.
+
+Usage:
+    python benchmarks/bench_mmap.py [--tiled] [--crop 256] [--reads 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common import make_synthetic_ome, summarize
+
+from mxtifffile import MxTiffFile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tiled', action='store_true', help='write 512x512 tiles instead of strips')
+    parser.add_argument('--crop', type=int, default=256)
+    parser.add_argument('--reads', type=int, default=500)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    path = args.file or make_synthetic_ome(channels=4, size=(args.size, args.size),
+                                           tile=512 if args.tiled else None, levels=1,
+                                           compression=None)
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, args.size - args.crop, (args.reads, 2))
+    print(f"file: {path}  crop: {args.crop}x{args.crop}")
+
+    for use_mmap in (False, True):
+        with MxTiffFile(path, enable_cache=False, use_mmap=use_mmap) as tif:
+            samples = []
+            for x, y in positions:
+                t0 = time.perf_counter()
+                tif.read_region('DAPI', pos=(int(x), int(y)), shape=(args.crop, args.crop))
+                samples.append(time.perf_counter() - t0)
+            summarize(f"use_mmap={use_mmap}", samples, unit='us', scale=1e6)
+
+
+if __name__ == '__main__':
+    main()
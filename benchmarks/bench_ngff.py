@@ -0,0 +1,46 @@
+"""
+OME-NGFF (Zarr) export throughput on local disk vs. worker threads and compressor.
+
+Usage:
+    python benchmarks/bench_ngff.py [--workers 1 2 4 8] [--compressors blosc zstd zlib]
+"""
+import argparse
+import shutil
+import tempfile
+
+from common import make_synthetic_ome
+
+from mxtifffile import MxTiffFile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--compressors', nargs='+', default=['blosc', 'zstd', 'zlib'])
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--out-dir', default=None, help='directory on the disk to measure')
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    path = args.file or make_synthetic_ome(channels=args.channels, size=(args.size, args.size))
+    out_dir = tempfile.mkdtemp(prefix='mxtiff-ngff-', dir=args.out_dir)
+    print(f"file: {path}  output: {out_dir}")
+
+    try:
+        with MxTiffFile(path, enable_cache=False) as tif:
+            for compressor in args.compressors:
+                for workers in args.workers:
+                    out = f"{out_dir}/{compressor}-{workers}.ome.zarr"
+                    report = tif.export_ngff(out, compressor=compressor, max_workers=workers)
+                    label = f"{compressor}, {workers} workers"
+                    print(f"{label:<40} {report.seconds:8.3f} s  "
+                          f"{report.throughput:8.1f} MB/s decoded  "
+                          f"{report.bytes_written / 2**20:8.1f} MiB written")
+                    shutil.rmtree(out)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
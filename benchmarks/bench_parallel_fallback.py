@@ -0,0 +1,69 @@
+"""
+Parallel read scaling for pages that cannot use the tile fast path.
+
+Reads every channel of a region with read_region(parallel=True) for an
+increasing number of workers and reports throughput. For comparison the old
+fallback (page.asarray() under one file lock) is timed with the same pool.
+
+Usage:
+    python benchmarks/bench_parallel_fallback.py [--compression jpeg|zlib] [--tiled]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import make_synthetic_ome, summarize
+
+from mxtifffile import MxTiffFile
+
+
+def _locked_full_page(tif, workers, y, x, h, w):
+    lock = threading.Lock()
+    pages = tif.series[0].levels[0].pages
+
+    def read(idx):
+        with lock:
+            full = pages[idx].asarray()
+        return full[y:y + h, x:x + w].copy()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read, range(len(pages))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--compression', default='zlib')
+    parser.add_argument('--tiled', action='store_true', help='write tiles instead of strips')
+    parser.add_argument('--channels', type=int, default=16)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    dtype = 'uint8' if args.compression == 'jpeg' else 'uint16'
+    path = args.file or make_synthetic_ome(channels=args.channels, size=(args.size, args.size),
+                                           tile=512 if args.tiled else None, levels=1,
+                                           compression=args.compression, dtype=dtype)
+    y, x, h, w = 0, 0, args.size // 2, args.size // 2
+    print(f"file: {path}  region: {w}x{h}  channels: {args.channels}")
+
+    for workers in (1, 2, 4, 8):
+        with MxTiffFile(path, max_workers=workers, enable_cache=False) as tif:
+            samples = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                tif.read_region(None, pos=(x, y), shape=(w, h), parallel=True)
+                samples.append(time.perf_counter() - t0)
+            summarize(f"segment reader, {workers} workers", samples)
+
+            samples = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                _locked_full_page(tif, workers, y, x, h, w)
+                samples.append(time.perf_counter() - t0)
+            summarize(f"locked full page, {workers} workers", samples)
+
+
+if __name__ == '__main__':
+    main()
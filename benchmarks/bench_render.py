@@ -0,0 +1,75 @@
+"""
+Composite render latency: render() vs. read_region plus float pseudocoloring.
+
+Usage:
+    python benchmarks/bench_render.py [--channels 4] [--tile 512] [--renders 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common import make_synthetic_ome, summarize
+
+from mxtifffile import MxTiffFile
+
+COLORS = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255),
+          (255, 0, 255), (255, 255, 0), (255, 128, 0), (255, 255, 255)]
+
+
+def manual_render(tif, layers, colors, limits, pos, shape):
+    """The read-then-blend approach render() replaces."""
+    stack = tif.read_region(layers, pos=pos, shape=shape)
+    if stack.ndim == 2:
+        stack = stack[..., None]
+    rgb = np.zeros(stack.shape[:2] + (3,), dtype=np.float32)
+    for i, (low, high) in enumerate(limits):
+        channel = (stack[..., i].astype(np.float32) - low) / (high - low)
+        channel = np.clip(channel, 0, 1)
+        rgb += channel[..., None] * (np.asarray(colors[i], dtype=np.float32) / 255)
+    return (np.clip(rgb, 0, 1) * 255).astype(np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--tile', type=int, default=512, help='rendered tile edge in pixels')
+    parser.add_argument('--renders', type=int, default=50)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    path = args.file or make_synthetic_ome(channels=max(args.channels, 1),
+                                           size=(args.size, args.size), levels=3)
+    rng = np.random.default_rng(0)
+    with MxTiffFile(path) as tif:
+        layers = list(range(args.channels))
+        colors = [COLORS[i % len(COLORS)] for i in layers]
+        height, width = tif.series[0].pages[0].shape
+        positions = [(int(x), int(y)) for x, y in
+                     zip(rng.integers(0, width - args.tile, args.renders),
+                         rng.integers(0, height - args.tile, args.renders))]
+        shape = (args.tile, args.tile)
+        stats = tif.channel_stats(layers, level=len(tif.series[0].levels) - 1)
+        limits = [tuple(st.percentile([0.5, 99.5])) for st in stats]
+        print(f"file: {path}  {args.channels} channels, {args.tile}x{args.tile} tiles")
+
+        # Warm the tile cache so both variants measure rendering, as in a viewer
+        for pos in positions:
+            tif.read_region(layers, pos=pos, shape=shape)
+
+        for label, func in (
+                ("read_region + float blend", lambda pos: manual_render(
+                    tif, layers, colors, limits, pos, shape)),
+                ("render()", lambda pos: tif.render(
+                    layers, colors=colors, limits=limits, pos=pos, shape=shape))):
+            samples = []
+            for pos in positions:
+                t0 = time.perf_counter()
+                func(pos)
+                samples.append(time.perf_counter() - t0)
+            summarize(label, samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Training patch throughput: PatchSampler vs. one read_region call per random patch.
+
+Usage:
+    python benchmarks/bench_sampler.py [--patch 128] [--batch 64] [--batches 20] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from common import make_synthetic_ome
+
+from mxtifffile import MxTiffFile, PatchSampler, TileCache
+
+
+def naive_batches(path, layers, patch, batch, batches, cache_bytes, seed=0):
+    """Random patches read one by one and stacked channel-first."""
+    rng = np.random.default_rng(seed)
+    with MxTiffFile(path, tile_cache=TileCache(max_entries=None, max_bytes=cache_bytes)) as tif:
+        height, width = tif.series[0].pages[0].shape
+        for _ in range(batches):
+            xs = rng.integers(0, width - patch + 1, batch)
+            ys = rng.integers(0, height - patch + 1, batch)
+            np.stack([np.moveaxis(np.atleast_3d(tif.read_region(
+                layers, pos=(int(x), int(y)), shape=(patch, patch))), 2, 0)
+                for x, y in zip(xs, ys)])
+
+
+def sampler_batches(path, layers, patch, batch, batches, per_window, cache_bytes,
+                    worker_id=0, num_workers=1):
+    """Patches drawn by one PatchSampler worker, each with its own bounded tile cache."""
+    sampler = PatchSampler(path, layers=layers, patch_size=patch, batch_size=batch,
+                           patches_per_window=per_window, num_batches=batches, seed=0,
+                           open_kwargs={'tile_cache': TileCache(max_entries=None,
+                                                                max_bytes=cache_bytes)})
+    count = 0
+    with sampler:
+        for patches, _ in sampler.iter_batches(worker_id, num_workers):
+            count += len(patches)
+    return count
+
+
+def report(label, patches, seconds):
+    print(f"{label:<44} {patches / seconds:10.0f} patches/s  ({patches} in {seconds:.2f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--patch', type=int, default=128)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--batches', type=int, default=20)
+    parser.add_argument('--per-window', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--size', type=int, default=8192)
+    parser.add_argument('--cache-mb', type=int, default=64,
+                        help='tile cache size; keep it below the decoded slide size, as in training')
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    path = args.file or make_synthetic_ome(channels=args.channels,
+                                           size=(args.size, args.size), levels=1)
+    layers = list(range(args.channels))
+    total = args.batch * args.batches
+    print(f"file: {path}  {args.channels} channels, {args.patch}px patches, "
+          f"batch {args.batch}, {args.batches} batches")
+
+    t0 = time.perf_counter()
+    cache_bytes = args.cache_mb * 2**20
+    naive_batches(path, layers, args.patch, args.batch, args.batches, cache_bytes)
+    report("read_region per patch", total, time.perf_counter() - t0)
+
+    common_args = (path, layers, args.patch, args.batch, args.batches)
+    for per_window in (1, args.per_window):
+        t0 = time.perf_counter()
+        count = sampler_batches(*common_args, per_window, cache_bytes)
+        report(f"PatchSampler, {per_window} patches/window", count, time.perf_counter() - t0)
+
+    if args.processes > 1:
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(args.processes) as pool:
+            t0 = time.perf_counter()
+            count = sum(pool.starmap(sampler_batches, [
+                common_args + (args.per_window, cache_bytes, w, args.processes)
+                for w in range(args.processes)]))
+            report(f"PatchSampler, {args.processes} processes", count, time.perf_counter() - t0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Tile server throughput under concurrent load from a local load generator.
+
+Usage:
+    python benchmarks/bench_server.py [--clients 16] [--requests 2000] [--workers 8]
+    python benchmarks/bench_server.py --url http://host:8000   # load an already running server
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from common import make_synthetic_ome
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status, response.headers.get('ETag')
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers.get('ETag')
+
+
+def run_load(urls, clients, revalidate=None):
+    """Issue every URL once from *clients* threads; return (seconds, latencies, statuses)."""
+    latencies = [0.0] * len(urls)
+    statuses = [0] * len(urls)
+    cursor = iter(range(len(urls)))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                return
+            headers = {'If-None-Match': revalidate[urls[i]]} if revalidate else None
+            t0 = time.perf_counter()
+            statuses[i], _ = fetch(urls[i], headers)
+            latencies[i] = time.perf_counter() - t0
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - t0, latencies, statuses
+
+
+def report(label, seconds, latencies, statuses):
+    ms = np.array(latencies) * 1000
+    errors = sum(1 for s in statuses if s >= 400)
+    print(f"{label:<28} {len(latencies) / seconds:8.1f} req/s  p50 {np.percentile(ms, 50):7.2f} ms  "
+          f"p95 {np.percentile(ms, 95):7.2f} ms  errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=8, help='server worker threads')
+    parser.add_argument('--hot', type=int, default=64, help='number of distinct tiles requested')
+    parser.add_argument('--channels', default='0,1,2')
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--url', default=None, help='load an external server instead')
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+
+    server = None
+    if args.url is None:
+        from mxtifffile.server import TileServer
+
+        path = args.file or make_synthetic_ome(channels=4, size=(args.size, args.size), levels=3)
+        server = TileServer([path], port=0, workers=args.workers).start()
+        base = server.url
+    else:
+        base = args.url.rstrip('/')
+
+    try:
+        info = json.loads(urllib.request.urlopen(base + '/slides/0/info.json').read())
+        level = info['levels'][0]
+        rng = np.random.default_rng(0)
+        hot = [(int(c), int(r)) for c, r in zip(rng.integers(0, level['tiles_x'], args.hot),
+                                                rng.integers(0, level['tiles_y'], args.hot))]
+        urls = [f"{base}/slides/0/tiles/0/{c}/{r}.jpg?channels={args.channels}"
+                for c, r in (hot[i] for i in rng.integers(0, len(hot), args.requests))]
+        print(f"server: {base}  {args.clients} clients, {args.requests} requests "
+              f"over {len(set(urls))} distinct tiles")
+
+        report("first pass (cold caches)", *run_load(urls, args.clients))
+        report("second pass (warm caches)", *run_load(urls, args.clients))
+        etags = {url: fetch(url)[1] for url in set(urls)}
+        report("revalidation (If-None-Match)", *run_load(urls, args.clients, etags))
+        if server is not None:
+            print(f"tiles rendered: {server.counters['rendered']}  "
+                  f"decoded tile cache: {server.dataset.tile_cache.stats()}")
+    finally:
+        if server is not None:
+            server.close()
+
+
+if __name__ == '__main__':
+    main()
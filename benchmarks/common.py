@@ -0,0 +1,42 @@
+"""Shared helpers for the benchmark scripts in this directory."""
+import os
+import statistics
+import tempfile
+
+import numpy as np
+import tifffile
+
+
+def make_synthetic_ome(path=None, channels=8, size=(4096, 4096), tile=512,
+                       levels=3, compression='zlib', dtype='uint16', seed=0):
+    """
+    Write a tiled, pyramidal OME-TIFF with named channels and return its path.
+
+    Pixel values are smooth noise so compressed tiles have realistic sizes.
+    """
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='mxtiff-bench-'), 'synthetic.ome.tif')
+    rng = np.random.default_rng(seed)
+    height, width = size
+    names = [f'Marker{i}' for i in range(channels)]
+    names[0] = 'DAPI'
+    base = rng.integers(0, 64, (channels, height // 16, width // 16)).astype(dtype)
+    data = np.repeat(np.repeat(base, 16, axis=1), 16, axis=2)
+    data += rng.integers(0, 8, data.shape).astype(dtype)
+    tile_arg = None if tile is None else (tile, tile)
+    with tifffile.TiffWriter(path, ome=True, bigtiff=True) as writer:
+        writer.write(data, tile=tile_arg, compression=compression,
+                     subifds=levels - 1,
+                     metadata={'axes': 'CYX', 'Channel': {'Name': names}})
+        for level in range(1, levels):
+            step = 2 ** level
+            writer.write(data[:, ::step, ::step], tile=tile_arg,
+                         compression=compression, subfiletype=1)
+    return path
+
+
+def summarize(label, samples, unit='ms', scale=1000.0):
+    """Print median/min/max of a list of timings in seconds."""
+    values = [s * scale for s in samples]
+    print(f"{label:<40} median {statistics.median(values):9.2f} {unit}  "
+          f"min {min(values):9.2f}  max {max(values):9.2f}  (n={len(values)})")
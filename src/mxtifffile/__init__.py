@@ -1,28 +1,47 @@
-import warnings
+import importlib
 
-from .mxtifffile import MxTiffFile
-from .exceptions import MxTiffFormatError
-from .format_config import load_formats
-from .format_detector import detect_format
-from .heuristic import heuristic_detect, ANCHOR_MARKER
+# Public names are resolved on first attribute access so that
+# ``import mxtifffile`` does not pull in numpy/tifffile until a reader is used.
+_LAZY_ATTRS = {
+    'MxTiffFile': '.mxtifffile',
+    'QPTiffFile': '.mxtifffile',
+    'MxTiffDataset': '.dataset',
+    'PatchSampler': '.sampling',
+    'TileCache': '.cache',
+    'SharedTileCache': '.shm_cache',
+    'DiskTileCache': '.disk_cache',
+    'MxTiffFormatError': '.exceptions',
+    'MxTiffCorruptTileError': '.exceptions',
+    'load_formats': '.format_config',
+    'detect_format': '.format_detector',
+    'heuristic_detect': '.heuristic',
+    'ANCHOR_MARKER': '.heuristic',
+}
 
 
-class QPTiffFile(MxTiffFile):
-    """Deprecated alias for MxTiffFile. Use MxTiffFile instead."""
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-    def __init__(self, *args, **kwargs):
-        warnings.warn(
-            "QPTiffFile is deprecated, use MxTiffFile",
-            DeprecationWarning,
-            stacklevel=2,
-        )
-        super().__init__(*args, **kwargs)
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = [
     'MxTiffFile',
     'QPTiffFile',
+    'MxTiffDataset',
+    'PatchSampler',
+    'TileCache',
+    'SharedTileCache',
+    'DiskTileCache',
     'MxTiffFormatError',
+    'MxTiffCorruptTileError',
     'load_formats',
     'detect_format',
     'heuristic_detect',
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+_MIN_BUCKET = 4096
+
+
+def _bucket(nbytes: int) -> int:
+    """Round *nbytes* up to the pool's size class (a power of two, at least 4 KiB)."""
+    return max(_MIN_BUCKET, 1 << (max(nbytes, 1) - 1).bit_length())
+
+
+class BufferPool:
+    """Thread-safe pool of reusable uint8 buffers for compressed and decoded tile data.
+
+    Buffers are grouped in power-of-two size classes so tiles of similar size
+    share buffers. Released buffers are kept for reuse until *max_free_bytes*
+    of idle buffers are pooled; beyond that they are dropped.
+    """
+
+    def __init__(self, max_free_bytes: int = 64 * 2**20) -> None:
+        self.max_free_bytes = max_free_bytes
+        self._free: Dict[int, List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.free_bytes = 0
+        self.in_use_bytes = 0
+        self.high_water_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, nbytes: int) -> np.ndarray:
+        """Return a uint8 buffer of at least *nbytes*; give it back with release()."""
+        size = _bucket(nbytes)
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                buf = free.pop()
+                self.free_bytes -= size
+                self.hits += 1
+            else:
+                buf = None
+                self.misses += 1
+            self.in_use_bytes += size
+            self.high_water_bytes = max(self.high_water_bytes, self.in_use_bytes)
+        if buf is None:
+            buf = np.empty(size, dtype=np.uint8)
+        return buf
+
+    def release(self, buf: np.ndarray) -> None:
+        """Return a buffer obtained from acquire() to the pool."""
+        size = buf.nbytes
+        with self._lock:
+            self.in_use_bytes -= size
+            if self.free_bytes + size <= self.max_free_bytes:
+                self._free.setdefault(size, []).append(buf)
+                self.free_bytes += size
+
+    @contextmanager
+    def borrow(self, nbytes: int) -> Iterator[np.ndarray]:
+        """Context manager yielding ``acquire(nbytes)[:nbytes]`` and releasing it on exit."""
+        buf = self.acquire(nbytes)
+        try:
+            yield buf[:nbytes]
+        finally:
+            self.release(buf)
+
+    def _reset_after_fork(self) -> None:
+        # The lock may be held by a parent thread that does not exist in the child
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Drop all idle buffers."""
+        with self._lock:
+            self._free.clear()
+            self.free_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters, bytes in use, idle bytes and the in-use high-water mark."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "in_use_bytes": self.in_use_bytes,
+                "free_bytes": self.free_bytes,
+                "high_water_bytes": self.high_water_bytes,
+            }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def file_identity(path) -> Tuple[str, int, int]:
+    """Return a (realpath, size, mtime_ns) tuple identifying the contents of *path*.
+
+    Used as the file component of cache keys so entries can be shared between
+    MxTiffFile instances (and reused after a file is closed and reopened),
+    while a rewritten file never hits stale entries.
+    """
+    st = os.stat(path)
+    return (os.path.realpath(os.fspath(path)), st.st_size, st.st_mtime_ns)
+
+
+def _nbytes(value: Any) -> int:
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+class _Flight:
+    """A load in progress; threads asking for the same key wait on it."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TileCache:
+    """Thread-safe LRU cache of decoded image data.
+
+    Entries are evicted least-recently-used first once either *max_entries*
+    or *max_bytes* (when set) is exceeded. One instance can be shared by many
+    MxTiffFile objects; keys carry the file identity so they never collide.
+
+    :meth:`get_or_load` deduplicates concurrent misses: the first thread to
+    miss a key runs the loader and every other thread asking for the same key
+    meanwhile waits for that result instead of decoding it again.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 50, max_bytes: Optional[int] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    @property
+    def nbytes(self) -> int:
+        """Total size in bytes of the cached values."""
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _nbytes(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= _nbytes(old)
+            self._data[key] = value
+            self._bytes += size
+            self._evict()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for *key*, calling *loader* once on a miss.
+
+        Concurrent callers that miss the same key while a load is running wait
+        for it and receive the same value (or exception). The loaded value is
+        stored in the cache before waiters are released.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                pass
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.put(key, flight.value)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+        return flight.value
+
+    def _evict(self) -> None:
+        # Caller holds self._lock; always keep the most recent entry
+        while len(self._data) > 1 and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, value = self._data.popitem(last=False)
+            self._bytes -= _nbytes(value)
+            self.evictions += 1
+
+    def _reset_after_fork(self) -> None:
+        # In a forked child the lock may be held by a thread that no longer
+        # exists, and in-flight loads will never complete; entries stay valid
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+            }
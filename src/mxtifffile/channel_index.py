@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Fields searched for a channel name, highest priority first.  A name that
+# matches a biomarker never falls through to a fluorophore or display name.
+NAME_FIELDS = ("biomarker", "fluorophore", "display_name")
+
+LayerSpec = Union[str, int, Iterable[Union[str, int]], None]
+
+
+class LayerSelection:
+    """A resolved, reusable set of page indices for ``read_region``.
+
+    Build one with :meth:`MxTiffFile.select` and pass it as ``layers`` to skip
+    name resolution on every call.
+    """
+
+    __slots__ = ("indices", "names", "n_pages")
+
+    def __init__(self, indices: Sequence[int], names: Sequence[Optional[str]], n_pages: int) -> None:
+        self.indices: Tuple[int, ...] = tuple(indices)
+        self.names: Tuple[Optional[str], ...] = tuple(names)
+        self.n_pages = n_pages
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self):
+        return iter(self.indices)
+
+    def __repr__(self) -> str:
+        return f"LayerSelection(indices={self.indices!r}, names={self.names!r})"
+
+
+class ChannelIndex:
+    """Precomputed name -> page index lookup built from ``channel_info``.
+
+    Names are looked up in biomarker, fluorophore and display name order.
+    With ``case_sensitive=False`` names are compared after ``str.casefold``.
+    ``aliases`` maps alternative names to a name already present in the file;
+    real channel names always win over an alias with the same spelling.
+    """
+
+    def __init__(self,
+                 channel_info: Sequence[Mapping[str, Any]],
+                 case_sensitive: bool = True,
+                 aliases: Optional[Mapping[str, str]] = None) -> None:
+        self.case_sensitive = case_sensitive
+        self.biomarkers: List[Optional[str]] = [ch.get("biomarker") for ch in channel_info]
+        self._lookup: Dict[str, Tuple[int, ...]] = {}
+
+        # Lowest priority first so higher-priority fields overwrite on collision
+        for field_name in reversed(NAME_FIELDS):
+            per_field: Dict[str, List[int]] = {}
+            for i, ch in enumerate(channel_info):
+                value = ch.get(field_name)
+                if value:
+                    per_field.setdefault(self._key(value), []).append(i)
+            self._lookup.update((k, tuple(v)) for k, v in per_field.items())
+
+        self.aliases: Dict[str, str] = dict(aliases or {})
+        for alias, target in self.aliases.items():
+            key = self._key(alias)
+            if key in self._lookup:
+                continue
+            indices = self._lookup.get(self._key(target))
+            if indices is not None:
+                self._lookup[key] = indices
+
+    def _key(self, name: str) -> str:
+        return name if self.case_sensitive else name.casefold()
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._key(name) in self._lookup
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def names(self) -> List[str]:
+        """Return every name (including aliases) this index can resolve."""
+        return list(self._lookup)
+
+    def resolve(self, name: str) -> Optional[Tuple[int, ...]]:
+        """Return the page indices for *name*, or None if it is unknown."""
+        return self._lookup.get(self._key(name))
+
+    def parse_tokens(self, tokens: Iterable[str]) -> List[Union[str, int]]:
+        """Turn command-line or query tokens into layer identifiers.
+
+        Tokens this index resolves are kept as names, so channels named
+        with digits only stay selectable by name; other digit-only tokens
+        become page indices.
+        """
+        return [int(t) if t.isdigit() and t not in self else t for t in tokens]
+
+    def compile(self, layers: LayerSpec, n_pages: int) -> LayerSelection:
+        """Resolve *layers* to a :class:`LayerSelection` for a level with *n_pages* pages.
+
+        Raises ValueError for unknown names or out-of-range indices and
+        TypeError for identifiers that are neither str nor int.
+        """
+        if layers is None:
+            indices = list(range(n_pages))
+        else:
+            if isinstance(layers, (str, int)):
+                layers = [layers]
+
+            indices = []
+            for layer in layers:
+                if isinstance(layer, int):
+                    if layer < 0 or layer >= n_pages:
+                        raise ValueError(f"Layer index {layer} out of range (max: {n_pages - 1})")
+                    indices.append(layer)
+                elif isinstance(layer, str):
+                    found = self.resolve(layer)
+                    if found is None:
+                        raise ValueError(f"Biomarker '{layer}' not found in this file")
+                    indices.extend(found)
+                else:
+                    raise TypeError(f"Layer identifier must be string or int, got {type(layer)}")
+
+        # Remove duplicates while preserving order
+        indices = list(dict.fromkeys(indices))
+        names = [self.biomarkers[i] if i < len(self.biomarkers) else None for i in indices]
+        return LayerSelection(indices, names, n_pages)
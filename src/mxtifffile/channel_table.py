@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Canonical per-channel fields, in the order parsers emit them.
+CHANNEL_FIELDS = ("index", "biomarker", "fluorophore", "display_name",
+                  "description", "exposure", "wavelength", "raw_xml")
+
+_STRING_FIELDS = ("biomarker", "fluorophore", "display_name",
+                  "description", "exposure", "wavelength")
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class ChannelView(Mapping):
+    """Read/write dict-like view of one row of a :class:`ChannelTable`."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "ChannelTable", row: int) -> None:
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._get(self._row, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._table._set(self._row, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from CHANNEL_FIELDS
+        extra = self._table._extra.get(self._row)
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        return len(CHANNEL_FIELDS) + len(self._table._extra.get(self._row, ()))
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ChannelTable(Sequence):
+    """Columnar storage for per-channel metadata.
+
+    Each field is stored once per table: indices in an ``array``, text fields
+    as lists of interned strings, and ``raw_xml`` zlib-compressed and
+    de-duplicated. Indexing returns :class:`ChannelView` objects that behave
+    like the per-channel dicts produced by the parsers. MxTiffFile keeps its
+    channel metadata in a table and builds the plain dicts of
+    ``channel_info`` / ``get_channel_info()`` only when they are accessed.
+    """
+
+    __slots__ = ("_index", "_columns", "_xml_pool", "_xml_ids", "_extra")
+
+    def __init__(self) -> None:
+        self._index = array("q")
+        self._columns: Dict[str, List[Optional[str]]] = {f: [] for f in _STRING_FIELDS}
+        self._xml_pool: List[bytes] = []
+        self._xml_ids = array("i")
+        self._extra: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_dicts(cls, channels: Iterable[Mapping[str, Any]]) -> "ChannelTable":
+        """Build a table from parser output (a list of channel dicts)."""
+        table = cls()
+        xml_ids: Dict[str, int] = {}
+        for ch in channels:
+            row = len(table._index)
+            index = ch.get("index")
+            table._index.append(row if index is None else index)
+            for field_name in _STRING_FIELDS:
+                table._columns[field_name].append(_intern(ch.get(field_name)))
+
+            raw_xml = ch.get("raw_xml")
+            if raw_xml is None:
+                table._xml_ids.append(-1)
+            else:
+                xml_id = xml_ids.get(raw_xml)
+                if xml_id is None:
+                    xml_id = xml_ids[raw_xml] = len(table._xml_pool)
+                    table._xml_pool.append(zlib.compress(raw_xml.encode("utf-8")))
+                table._xml_ids.append(xml_id)
+
+            extra = {k: v for k, v in ch.items() if k not in CHANNEL_FIELDS}
+            if extra:
+                table._extra[row] = extra
+        return table
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [ChannelView(self, row) for row in range(len(self))[item]]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("channel index out of range")
+        return ChannelView(self, item)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ChannelTable, list, tuple)):
+            return len(self) == len(other) and all(
+                dict(a) == dict(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ChannelTable({self.to_dicts()!r})"
+
+    def column(self, name: str) -> List[Any]:
+        """Return all values of field *name*, one per channel."""
+        if name == "index":
+            return list(self._index)
+        if name == "raw_xml":
+            return [self._get(row, name) for row in range(len(self))]
+        if name in self._columns:
+            return list(self._columns[name])
+        return [self._extra.get(row, {}).get(name) for row in range(len(self))]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return an independent list of plain channel dicts."""
+        return [dict(view) for view in self]
+
+    def _get(self, row: int, key: str) -> Any:
+        if key == "index":
+            return self._index[row]
+        if key == "raw_xml":
+            xml_id = self._xml_ids[row]
+            if xml_id < 0:
+                return None
+            return zlib.decompress(self._xml_pool[xml_id]).decode("utf-8")
+        column = self._columns.get(key)
+        if column is not None:
+            return column[row]
+        return self._extra.get(row, {})[key]
+
+    def _set(self, row: int, key: str, value: Any) -> None:
+        if key == "index":
+            self._index[row] = value
+        elif key == "raw_xml":
+            if value is None:
+                self._xml_ids[row] = -1
+            else:
+                self._xml_ids[row] = len(self._xml_pool)
+                self._xml_pool.append(zlib.compress(value.encode("utf-8")))
+        elif key in self._columns:
+            self._columns[key][row] = _intern(value)
+        else:
+            self._extra.setdefault(row, {})[key] = value
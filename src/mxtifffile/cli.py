@@ -0,0 +1,300 @@
+"""Command line interface: ``mxtifffile <command> ...`` or ``python -m mxtifffile <command> ...``."""
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _cmd_scan(args) -> int:
+    from .scanner import iter_tiff_paths, load_scan_cache, scan_paths, write_jsonl, write_parquet
+
+    if args.resume and (args.output is None or args.format != "jsonl"):
+        print("mxtifffile scan: --resume requires --output with --format jsonl", file=sys.stderr)
+        return 2
+
+    cache = {}
+    if args.cache:
+        cache.update(load_scan_cache(args.cache))
+    if args.resume:
+        cache.update(load_scan_cache(args.output))
+
+    records = scan_paths(iter_tiff_paths(args.paths), max_workers=args.workers,
+                         formats_config=args.formats_config, cache=cache,
+                         skip_cached=args.resume)
+
+    if args.format == "parquet":
+        if args.output is None:
+            print("mxtifffile scan: --format parquet requires --output", file=sys.stderr)
+            return 2
+        count = write_parquet(records, args.output)
+    elif args.output is None:
+        count = write_jsonl(records, sys.stdout)
+    else:
+        with open(args.output, "a" if args.resume else "w", encoding="utf-8") as fh:
+            count = write_jsonl(records, fh)
+
+    print(f"mxtifffile scan: {count} files written", file=sys.stderr)
+    return 0
+
+
+def _cmd_serve(args) -> int:
+    from .scanner import iter_tiff_paths
+    from .server import serve
+
+    paths = list(iter_tiff_paths(args.paths))
+    if not paths:
+        print("mxtifffile serve: no TIFF files found", file=sys.stderr)
+        return 2
+    serve(paths, host=args.host, port=args.port, tile_size=args.tile_size,
+          workers=args.workers, max_open=args.max_open, verbose=args.verbose)
+    return 0
+
+
+def _cmd_replay(args) -> int:
+    import json
+
+    from .cache import TileCache
+    from .trace import load_trace, replay_trace
+
+    header, records = load_trace(args.trace)
+    open_kwargs = {"enable_cache": not args.no_cache}
+    if not args.no_cache:
+        open_kwargs["tile_cache"] = TileCache(max_entries=None, max_bytes=args.cache_mb * 2**20)
+    if args.disk_cache:
+        open_kwargs["disk_cache"] = args.disk_cache
+    if args.file is None:
+        print(f"mxtifffile replay: writing a synthetic file for {len(records)} requests...",
+              file=sys.stderr)
+    report = replay_trace((header, records), args.file, concurrency=args.workers,
+                          speed=args.speed, repeat=args.repeat, **open_kwargs)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.summary())
+    return 0
+
+
+def _channel_layers(tif, channels: Optional[List[str]]):
+    """Layers selected by -c/--channels: channel names, or page indices."""
+    return None if channels is None else tif.channel_index.parse_tokens(channels)
+
+
+def _cmd_export(args) -> int:
+    import json
+
+    from .mxtifffile import MxTiffFile
+
+    region = {}
+    if args.region:
+        try:
+            x, y, width, height = (int(v) for v in args.region.split(","))
+        except ValueError:
+            print("mxtifffile export: --region must be X,Y,WIDTH,HEIGHT", file=sys.stderr)
+            return 2
+        region = {"pos": (x, y), "shape": (width, height)}
+    with MxTiffFile(args.input, enable_cache=False) as tif:
+        report = tif.export(args.output, layers=_channel_layers(tif, args.channels),
+                            levels=args.levels, layout=args.layout, **region)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.summary())
+    return 0
+
+
+def _cmd_convert(args) -> int:
+    import json
+
+    from .mxtifffile import MxTiffFile
+
+    compression = None if args.compression == "none" else args.compression
+    with MxTiffFile(args.input, enable_cache=False) as tif:
+        report = tif.convert(args.output, layers=_channel_layers(tif, args.channels),
+                             tile=args.tile, compression=compression, levels=args.levels,
+                             downsample=args.downsample, max_workers=args.workers,
+                             temp_dir=args.temp_dir)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.summary())
+    return 0
+
+
+def _cmd_ngff(args) -> int:
+    import json
+
+    from .mxtifffile import MxTiffFile
+
+    chunk = None if args.chunk is None else (args.chunk, args.chunk)
+    compressor = None if args.compressor == "none" else args.compressor
+    with MxTiffFile(args.input, enable_cache=False) as tif:
+        report = tif.export_ngff(args.output, layers=_channel_layers(tif, args.channels),
+                                 chunk=chunk, levels=args.levels, compressor=compressor,
+                                 max_workers=args.workers, overwrite=args.overwrite)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.summary())
+    return 0
+
+
+def _cmd_verify(args) -> int:
+    import json
+
+    from .mxtifffile import MxTiffFile
+    from .scanner import iter_tiff_paths
+
+    reports, failed = [], 0
+    for path in iter_tiff_paths(args.paths):
+        try:
+            with MxTiffFile(path, enable_cache=False) as tif:
+                report = tif.verify(fast=args.fast, sample=args.sample, max_workers=args.workers)
+        except Exception as exc:
+            print(f"{path}: cannot open: {exc}", file=sys.stderr)
+            failed += 1
+            continue
+        failed += not report.ok
+        if args.json:
+            reports.append(report.to_dict())
+        else:
+            print(report.summary())
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mxtifffile",
+                                     description="Tools for multiplex TIFF files.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    scan = commands.add_parser("scan", help="Bulk metadata scan of files and directories",
+                               description="Scan TIFF files in parallel and write one "
+                                           "metadata record per file.")
+    scan.add_argument("paths", nargs="+", help="Files or directories (walked recursively)")
+    scan.add_argument("-o", "--output", help="Output file (default: JSON lines on stdout)")
+    scan.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    scan.add_argument("-j", "--workers", type=int, default=None,
+                      help="Worker processes (default: CPU count)")
+    scan.add_argument("--cache", help="Previous JSON-lines output; unchanged files "
+                                      "(same size and mtime) are not reopened")
+    scan.add_argument("--resume", action="store_true",
+                      help="Append to --output, skipping files already recorded in it")
+    scan.add_argument("--formats-config", help="Custom formats.json")
+    scan.set_defaults(func=_cmd_scan)
+
+    serve = commands.add_parser("serve", help="Serve rendered tiles over HTTP",
+                                description="Serve PNG/JPEG tiles of the native pyramid "
+                                            "levels of files over HTTP.")
+    serve.add_argument("paths", nargs="+", help="Files or directories (walked recursively)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--tile-size", type=int, default=256)
+    serve.add_argument("-j", "--workers", type=int, default=8,
+                       help="Request handler threads (default: 8)")
+    serve.add_argument("--max-open", type=int, default=32,
+                       help="Maximum number of open files (default: 32)")
+    serve.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    serve.set_defaults(func=_cmd_serve)
+
+    replay = commands.add_parser("replay", help="Replay a recorded read trace and report latency",
+                                 description="Run the reads of a trace written by "
+                                             "MxTiffFile.record_trace and report latency "
+                                             "percentiles, throughput and cache hit rates.")
+    replay.add_argument("trace", help="Trace file (.jsonl or .jsonl.gz)")
+    replay.add_argument("--file", help="File to replay against (default: a synthetic file "
+                                       "with the geometry recorded in the trace)")
+    replay.add_argument("-j", "--workers", type=int, default=1,
+                        help="Concurrent request threads (default: 1)")
+    replay.add_argument("--speed", type=float, default=None,
+                        help="Issue requests at recorded times divided by SPEED "
+                             "(default: as fast as possible)")
+    replay.add_argument("--repeat", type=int, default=1, help="Passes over the trace (default: 1)")
+    replay.add_argument("--cache-mb", type=int, default=256,
+                        help="In-memory tile cache size (default: 256)")
+    replay.add_argument("--no-cache", action="store_true", help="Disable the tile cache")
+    replay.add_argument("--disk-cache", help="Directory of a persistent tile cache")
+    replay.add_argument("--json", action="store_true", help="Print the report as JSON")
+    replay.set_defaults(func=_cmd_replay)
+
+    export = commands.add_parser("export", help="Export a channel and region subset",
+                                 description="Write selected channels and a region of a file, "
+                                             "with its pyramid, to a new OME-TIFF or QPTIFF, "
+                                             "copying compressed tiles where possible.")
+    export.add_argument("input", help="Source file")
+    export.add_argument("output", help="File to write")
+    export.add_argument("-c", "--channels", nargs="+", metavar="CHANNEL",
+                        help="Channel names or indices, in output order (default: all)")
+    export.add_argument("--region", metavar="X,Y,WIDTH,HEIGHT",
+                        help="Region at full resolution (default: whole image)")
+    export.add_argument("--levels", type=int, default=None,
+                        help="Pyramid levels to write (default: all)")
+    export.add_argument("--layout", choices=("ome", "qptiff"), default=None,
+                        help="Output layout (default: qptiff for QPTIFF input, else ome)")
+    export.add_argument("--json", action="store_true", help="Print the report as JSON")
+    export.set_defaults(func=_cmd_export)
+
+    convert = commands.add_parser("convert", help="Convert to a tiled pyramidal OME-TIFF",
+                                  description="Rewrite a file as a tiled, pyramidal OME-TIFF "
+                                              "with channel metadata, streaming with bounded "
+                                              "memory.")
+    convert.add_argument("input", help="Source file")
+    convert.add_argument("output", help="OME-TIFF to write")
+    convert.add_argument("-c", "--channels", nargs="+", metavar="CHANNEL",
+                         help="Channel names or indices, in output order (default: all)")
+    convert.add_argument("--tile", type=int, default=512, help="Tile size (default: 512)")
+    convert.add_argument("--compression", default="zlib",
+                         help="Tile compression, e.g. zlib, zstd, lzw or none (default: zlib)")
+    convert.add_argument("--levels", type=int, default=None,
+                         help="Pyramid levels (default: until the image fits in one tile)")
+    convert.add_argument("--downsample", choices=("mean", "nearest"), default="mean",
+                         help="Downsampling of pyramid levels (default: mean)")
+    convert.add_argument("-j", "--workers", type=int, default=None,
+                         help="Decoding and compression threads (default: 4)")
+    convert.add_argument("--temp-dir", help="Directory for temporary level files")
+    convert.add_argument("--json", action="store_true", help="Print the report as JSON")
+    convert.set_defaults(func=_cmd_convert)
+
+    ngff = commands.add_parser("ngff", help="Export to OME-NGFF (Zarr)",
+                               description="Write the pyramid of a file as an OME-NGFF 0.4 "
+                                           "Zarr v2 store, writing chunks in parallel.")
+    ngff.add_argument("input", help="Source file")
+    ngff.add_argument("output", help="Zarr directory to create, e.g. slide.ome.zarr")
+    ngff.add_argument("-c", "--channels", nargs="+", metavar="CHANNEL",
+                      help="Channel names or indices, in output order (default: all)")
+    ngff.add_argument("--chunk", type=int, default=None,
+                      help="Chunk size (default: the tile size of the file)")
+    ngff.add_argument("--levels", type=int, default=None, help="Levels to export (default: all)")
+    ngff.add_argument("--compressor", choices=("default", "blosc", "zstd", "zlib", "none"),
+                      default="default", help="Chunk compressor (default: blosc if available)")
+    ngff.add_argument("-j", "--workers", type=int, default=None,
+                      help="Chunk writer threads (default: 4)")
+    ngff.add_argument("--overwrite", action="store_true", help="Replace an existing store")
+    ngff.add_argument("--json", action="store_true", help="Print the report as JSON")
+    ngff.set_defaults(func=_cmd_ngff)
+
+    verify = commands.add_parser("verify", help="Check files for truncated or corrupt tiles",
+                                 description="Check the offsets of every tile and strip "
+                                             "against the file size and decode them in "
+                                             "parallel. Exits with status 1 if any file "
+                                             "has problems.")
+    verify.add_argument("paths", nargs="+", help="Files or directories (walked recursively)")
+    verify.add_argument("--fast", action="store_true",
+                        help="Check all offsets but decode only a sample of tiles per page")
+    verify.add_argument("--sample", type=int, default=None,
+                        help="Tiles decoded per page with --fast (default: 8)")
+    verify.add_argument("-j", "--workers", type=int, default=None,
+                        help="Decoding threads (default: 4)")
+    verify.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    verify.set_defaults(func=_cmd_verify)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
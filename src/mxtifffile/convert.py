@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .parallel import bounded_map
+
+# Outputs whose uncompressed size exceeds this are written as BigTIFF
+_BIGTIFF_BYTES = 2**32 - 2**25
+# Bytes of one channel read from the source per level 0 band at most; strips
+# larger than this are decoded once for each band overlapping them
+_BAND_BYTES = 32 * 2**20
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+# Micrometers per TIFF resolution unit: inch, centimeter, millimeter, micrometer
+_UNIT_UM = {2: 25400.0, 3: 10000.0, 4: 1000.0, 5: 1.0}
+
+
+@dataclass
+class ConvertReport:
+    """Geometry and timing of a conversion by convert_to_ome_tiff."""
+
+    path: str
+    channels: List[str]
+    shapes: List[Tuple[int, int]]
+    tile: int
+    compression: Optional[str]
+    bytes_written: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "channels": list(self.channels),
+            "shapes": [list(s) for s in self.shapes],
+            "tile": self.tile,
+            "compression": self.compression,
+            "bytes_written": self.bytes_written,
+            "seconds": self.seconds,
+        }
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        width, height = self.shapes[0]
+        return (f"{self.path}: {len(self.channels)} channels, {width}x{height}, "
+                f"{len(self.shapes)} levels, {self.tile}x{self.tile} tiles, "
+                f"{self.compression or 'uncompressed'}\n"
+                f"written      {self.bytes_written / 2**20:.1f} MiB in {self.seconds:.3f} s")
+
+
+def pyramid_shapes(height: int, width: int, tile: int,
+                   levels: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Return the (height, width) of each level, halving (rounding up) until
+    the image fits in one tile or *levels* levels are reached.
+    """
+    shapes = [(height, width)]
+    while (levels is None and max(shapes[-1]) > tile) or (levels is not None and len(shapes) < levels):
+        h, w = shapes[-1]
+        if h == 1 and w == 1:
+            break
+        shapes.append(((h + 1) // 2, (w + 1) // 2))
+    return shapes
+
+
+def downsample2(band: np.ndarray, method: str = "mean") -> np.ndarray:
+    """
+    Halve a 2D array, rounding odd sizes up by repeating the last row or column.
+
+    'mean' averages 2x2 blocks (rounding integers to nearest); 'nearest'
+    keeps the top-left sample of each block, for label images.
+    """
+    height, width = band.shape
+    if height % 2 or width % 2:
+        band = np.pad(band, ((0, height % 2), (0, width % 2)), mode="edge")
+    if method == "nearest":
+        return band[::2, ::2]
+    if method != "mean":
+        raise ValueError(f"Unknown downsampling method {method!r}; expected 'mean' or 'nearest'")
+    if band.dtype.kind in "ui":
+        acc = band[0::2, 0::2].astype(np.int64)
+        acc += band[1::2, 0::2]
+        acc += band[0::2, 1::2]
+        acc += band[1::2, 1::2]
+        return ((acc + 2) // 4).astype(band.dtype)
+    if band.dtype.kind == "b":
+        return band[::2, ::2]
+    acc = band[0::2, 0::2].astype(np.float64)
+    acc += band[1::2, 0::2]
+    acc += band[0::2, 1::2]
+    acc += band[1::2, 1::2]
+    return (acc / 4).astype(band.dtype)
+
+
+def _numbers(values) -> Optional[List[float]]:
+    """Parse leading numbers of all values, or None if any is missing."""
+    result = []
+    for value in values:
+        match = _NUMBER.search(str(value)) if value not in (None, "") else None
+        if match is None:
+            return None
+        result.append(float(match.group()))
+    return result
+
+
+def ome_metadata(tif, indices) -> Dict[str, Any]:
+    """OME metadata for tifffile from the channel table and resolution of *tif*."""
+    table = tif._channel_table
+    rows = [table[i] if i < len(table) else {} for i in indices]
+    names = [row.get("biomarker") or row.get("display_name") or f"Channel {i}"
+             for i, row in zip(indices, rows)]
+    channel: Dict[str, Any] = {"Name": names}
+    fluors = [row.get("fluorophore") for row in rows]
+    if all(fluors) and fluors != names:
+        channel["Fluor"] = fluors
+    wavelengths = _numbers(row.get("wavelength") for row in rows)
+    if wavelengths is not None:
+        channel["EmissionWavelength"] = wavelengths
+    metadata: Dict[str, Any] = {"axes": "CYX", "Channel": channel}
+    exposures = _numbers(row.get("exposure") for row in rows)
+    if exposures is not None:
+        metadata["Plane"] = {"ExposureTime": exposures}
+
+    size = physical_size(tif)
+    if size is not None:
+        metadata.update(PhysicalSizeX=size[0], PhysicalSizeXUnit="µm",
+                        PhysicalSizeY=size[1], PhysicalSizeYUnit="µm")
+    return metadata
+
+
+def physical_size(tif) -> Optional[Tuple[float, float]]:
+    """(x, y) pixel size of level 0 in micrometers from the resolution tags, or None."""
+    key = tif.series[0].levels[0].pages[0].keyframe
+    try:
+        xres, yres = key.resolution
+        scale = _UNIT_UM.get(int(key.resolutionunit))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if not (scale and xres and yres):
+        return None
+    return scale / xres, scale / yres
+
+
+class _Pyramid:
+    """
+    Streams the levels of the output one band of tile rows at a time.
+
+    Level 0 bands are decoded from the source by a thread pool, a few bands
+    ahead of the writer. While a level is written, its next level is
+    downsampled into an uncompressed memory-mapped temporary file, which
+    the next pass reads back; memory use is a few bands per channel.
+    """
+
+    def __init__(self, tif, indices, shapes, tile: int, downsample: str,
+                 workers: int, temp_dir: str) -> None:
+        self.tif = tif
+        self.indices = list(indices)
+        self.shapes = shapes
+        self.tile = tile
+        self.downsample = downsample
+        self.workers = max(1, workers)
+        self.temp_dir = temp_dir
+        self.series = tif.series[0].levels[0]
+        self.dtype = self.series.pages[self.indices[0]].dtype
+        self._current: Optional[np.ndarray] = None  # level being written, if not level 0
+        # Level 0 is read in bands of whole output tile rows covering whole
+        # source tiles or strips, so each is decoded once when sizes divide,
+        # but no taller than _BAND_BYTES allows, so single-strip files stay bounded
+        key = self.series.pages[self.indices[0]].keyframe
+        height, width = self.shapes[0]
+        segment = key.tilelength if key.is_tiled else min(key.rowsperstrip or height, height)
+        budget = _BAND_BYTES // (width * self.dtype.itemsize) // tile * tile
+        self.source_band = min(tile * max(1, -(-segment // tile)), max(tile, budget))
+
+    def _next_level(self, level: int) -> Optional[np.ndarray]:
+        if level + 1 >= len(self.shapes):
+            return None
+        path = os.path.join(self.temp_dir, f"level{level + 1}.raw")
+        return np.memmap(path, dtype=self.dtype, mode="w+",
+                         shape=(len(self.indices),) + self.shapes[level + 1])
+
+    def _read_source_band(self, channel: int, y: int, height: int) -> np.ndarray:
+        page = self.series.pages[self.indices[channel]]
+        width = self.shapes[0][1]
+        # Bypass the caches, which would only be filled with bands read once
+        return self.tif._read_page_region_optimized(page, y, 0, height, width)
+
+    def _bands(self, level: int) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """Yield (channel, y, band) of a level, channel by channel."""
+        height = self.shapes[level][0]
+        step = self.source_band if level == 0 else self.tile
+        jobs = [(c, y, min(step, height - y))
+                for c in range(len(self.indices)) for y in range(0, height, step)]
+        if level > 0:
+            for c, y, h in jobs:
+                yield c, y, np.array(self._current[c, y:y + h])
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            bands = bounded_map(pool, lambda job: self._read_source_band(*job), jobs,
+                                self.workers + 1)
+            for (c, y, _), band in zip(jobs, bands):
+                yield c, y, band
+
+    def tiles(self, level: int) -> Iterator[np.ndarray]:
+        """Yield the tiles of a level in TIFF order, filling the next level."""
+        tile = self.tile
+        width = self.shapes[level][1]
+        following = self._next_level(level)
+        try:
+            for c, y, band in self._bands(level):
+                if following is not None:
+                    reduced = downsample2(band, self.downsample)
+                    following[c, y // 2:y // 2 + reduced.shape[0]] = reduced
+                for row in range(0, band.shape[0], tile):
+                    for x in range(0, width, tile):
+                        yield band[row:row + tile, x:x + tile]
+        finally:
+            previous = self._current
+            self._current = following
+            if previous is not None:
+                filename = previous.filename
+                del previous
+                try:
+                    os.unlink(filename)
+                except OSError:
+                    # Still mapped (Windows): removed with the temporary directory
+                    pass
+
+
+def convert_to_ome_tiff(tif, path, layers=None, tile: int = 512,
+                        compression: Optional[str] = "zlib",
+                        compressionargs: Optional[Dict[str, Any]] = None,
+                        predictor: Optional[bool] = None, levels: Optional[int] = None,
+                        downsample: str = "mean", max_workers: Optional[int] = None,
+                        bigtiff: Optional[bool] = None,
+                        temp_dir: Optional[str] = None) -> ConvertReport:
+    """Write *tif* as a tiled pyramidal OME-TIFF; see MxTiffFile.convert."""
+    import tifffile
+
+    start = time.perf_counter()
+    if tile % 16:
+        raise ValueError(f"Tile size must be a multiple of 16, got {tile}")
+    if levels is not None and levels < 1:
+        raise ValueError(f"levels must be at least 1, got {levels}")
+    if downsample not in ("mean", "nearest"):
+        raise ValueError(f"Unknown downsampling method {downsample!r}; "
+                         "expected 'mean' or 'nearest'")
+    selection = tif.select(layers, 0)
+    indices = list(selection.indices)
+    if not indices:
+        raise ValueError("No layers selected for conversion")
+    page = tif.series[0].levels[0].pages[indices[0]]
+    if len(page.shape) != 2:
+        raise ValueError(f"Only single-sample pages can be converted, got shape {page.shape}")
+
+    shapes = pyramid_shapes(page.shape[0], page.shape[1], tile, levels)
+    metadata = ome_metadata(tif, indices)
+    if bigtiff is None:
+        raw = sum(h * w for h, w in shapes) * len(indices) * page.dtype.itemsize
+        bigtiff = raw > _BIGTIFF_BYTES
+    workers = max_workers or tif._max_workers
+    key = page.keyframe
+    resolution = {}
+    if "PhysicalSizeX" in metadata:
+        resolution = {"resolution": key.resolution, "resolutionunit": key.resolutionunit}
+
+    with tempfile.TemporaryDirectory(prefix="mxtifffile-convert-", dir=temp_dir) as tmp:
+        pyramid = _Pyramid(tif, indices, shapes, tile, downsample, workers, tmp)
+        with tifffile.TiffWriter(os.fspath(path), bigtiff=bigtiff, ome=True) as writer:
+            for level, (height, width) in enumerate(shapes):
+                args: Dict[str, Any] = {}
+                if resolution:
+                    scale = width / shapes[0][1]
+                    args.update(resolution=(resolution["resolution"][0] * scale,
+                                            resolution["resolution"][1] * scale),
+                                resolutionunit=resolution["resolutionunit"])
+                if level == 0:
+                    args.update(subifds=len(shapes) - 1, metadata=metadata)
+                else:
+                    args.update(subfiletype=1, metadata=None)
+                writer.write(pyramid.tiles(level), shape=(len(indices), height, width),
+                             dtype=page.dtype, tile=(tile, tile), photometric="minisblack",
+                             compression=compression, compressionargs=compressionargs,
+                             predictor=predictor, maxworkers=workers, **args)
+
+    names = metadata["Channel"]["Name"]
+    return ConvertReport(os.fspath(path), names, [(w, h) for h, w in shapes], tile, compression,
+                         os.path.getsize(path), time.perf_counter() - start)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .buffers import BufferPool
+from .cache import TileCache
+from .mxtifffile import MxTiffFile
+
+Key = Union[int, str, "os.PathLike[str]"]
+
+
+def catalog_entry(tif: MxTiffFile) -> Dict[str, Any]:
+    """Return the metadata kept in a dataset catalog for an open file."""
+    levels = tif.series[0].levels if len(tif.series) else []
+    return {
+        "format_id": tif.format_id,
+        "biomarkers": list(tif.biomarkers),
+        "fluorophores": list(tif.fluorophores),
+        "level_shapes": [list(level.pages[0].shape) for level in levels],
+    }
+
+
+class MxTiffDataset:
+    """A collection of multiplex TIFF files with a bounded pool of open handles.
+
+    Files are opened lazily on first access. At most *max_open* files are kept
+    open; the least recently used unpinned file is closed when the limit is
+    exceeded. All files share one TileCache, BufferPool and thread pool, and the
+    format/channel metadata of every file that has been opened (or scanned)
+    is kept in :attr:`catalog` so marker queries never reopen files.
+
+    Parameters:
+    -----------
+    paths : Iterable[str]
+        Paths of the TIFF files in the dataset
+    max_open : int
+        Maximum number of simultaneously open files (default: 32)
+    tile_cache : TileCache or None
+        Cache shared by all files; None creates one bounded to 512 MiB
+    max_workers : int
+        Size of the shared thread pool used for parallel reads (default: 4)
+    catalog : dict or None
+        Previously collected catalog entries, keyed by path
+    **open_kwargs :
+        Additional arguments passed to every MxTiffFile
+    """
+
+    def __init__(self, paths: Iterable[Union[str, "os.PathLike[str]"]], max_open: int = 32,
+                 tile_cache: Optional[TileCache] = None, max_workers: int = 4,
+                 catalog: Optional[Dict[str, Dict[str, Any]]] = None,
+                 **open_kwargs) -> None:
+        if max_open < 1:
+            raise ValueError(f"max_open must be at least 1, got {max_open}")
+        self.paths: List[str] = [os.fspath(p) for p in paths]
+        self.max_open = max_open
+        self.tile_cache = tile_cache if tile_cache is not None else TileCache(
+            max_entries=None, max_bytes=512 * 2**20)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.buffer_pool = BufferPool()
+        self.catalog: Dict[str, Dict[str, Any]] = dict(catalog or {})
+        self._open_kwargs = open_kwargs
+        self._open: "OrderedDict[str, MxTiffFile]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __enter__(self) -> "MxTiffDataset":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _path(self, key: Key) -> str:
+        if isinstance(key, int):
+            return self.paths[key]
+        return os.fspath(key)
+
+    @property
+    def open_files(self) -> List[str]:
+        """Paths currently open, least recently used first."""
+        with self._lock:
+            return list(self._open)
+
+    def get(self, key: Key) -> MxTiffFile:
+        """
+        Return the open MxTiffFile for *key* (index or path), opening it if needed.
+
+        The returned handle may be closed by later calls that open other files;
+        use :meth:`open` to keep it open for the duration of a block.
+        """
+        path = self._path(key)
+        with self._lock:
+            if self._closed:
+                raise ValueError("dataset is closed")
+            tif = self._open.get(path)
+            if tif is not None:
+                self._open.move_to_end(path)
+                return tif
+
+            tif = MxTiffFile(path, tile_cache=self.tile_cache, executor=self.executor,
+                             buffer_pool=self.buffer_pool, **self._open_kwargs)
+            self._open[path] = tif
+            self.catalog[path] = catalog_entry(tif)
+            self._evict(keep=path)
+            return tif
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # Caller holds self._lock; pinned files and *keep* are skipped
+        excess = len(self._open) - self.max_open
+        for path in list(self._open):
+            if excess <= 0:
+                break
+            if path == keep or self._pins.get(path):
+                continue
+            self._open.pop(path).close()
+            excess -= 1
+
+    @contextmanager
+    def open(self, key: Key) -> Iterator[MxTiffFile]:
+        """Context manager yielding an MxTiffFile that is not evicted until the block exits."""
+        path = self._path(key)
+        with self._lock:
+            tif = self.get(path)
+            self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            yield tif
+        finally:
+            with self._lock:
+                self._pins[path] -= 1
+                if not self._pins[path]:
+                    del self._pins[path]
+                self._evict()
+
+    def read_region(self, key: Key, *args, **kwargs):
+        """Call MxTiffFile.read_region on the file for *key*; see that method for arguments."""
+        with self.open(key) as tif:
+            return tif.read_region(*args, **kwargs)
+
+    def scan(self, keys: Optional[Iterable[Key]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Populate the catalog for *keys* (default: all files not yet catalogued).
+
+        Files are opened through the pool, so no more than max_open are open at once.
+        """
+        paths = [self._path(k) for k in keys] if keys is not None else self.paths
+        for path in paths:
+            if path not in self.catalog:
+                self.get(path)
+        return self.catalog
+
+    def files_with_marker(self, name: str, case_sensitive: bool = True) -> List[str]:
+        """
+        Return catalogued paths whose biomarkers include *name*.
+
+        Only the catalog is consulted; call scan() first to cover unopened files.
+        """
+        key = name if case_sensitive else name.casefold()
+        hits = []
+        for path, entry in self.catalog.items():
+            markers = [m for m in entry.get("biomarkers", []) if m]
+            if not case_sensitive:
+                markers = [m.casefold() for m in markers]
+            if key in markers:
+                hits.append(path)
+        return hits
+
+    def markers(self) -> Dict[str, int]:
+        """Return the number of catalogued files containing each biomarker."""
+        counts: Dict[str, int] = {}
+        for entry in self.catalog.values():
+            for marker in set(m for m in entry.get("biomarkers", []) if m):
+                counts[marker] = counts.get(marker, 0) + 1
+        return counts
+
+    def close(self) -> None:
+        """Close every open file and shut down the shared thread pool."""
+        with self._lock:
+            self._closed = True
+            while self._open:
+                _, tif = self._open.popitem(last=False)
+                tif.close()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+_MAGIC = b"MXTC\x01"
+_HEADER = struct.Struct("<I")
+_SUFFIX = ".tile"
+# Bytes hashed at each end of a file for its fingerprint
+_FINGERPRINT_BYTES = 64 * 1024
+# Eviction trims the directory to this fraction of max_bytes
+_LOW_WATER = 0.9
+# Hits refresh a file's mtime (its LRU clock) at most this often, in seconds
+_TOUCH_INTERVAL = 60.0
+# Temporary files older than this are left over from crashed writers
+_STALE_TMP_SECONDS = 3600.0
+
+
+def file_fingerprint(path) -> Tuple[int, int, str]:
+    """
+    Return (size, mtime_ns, digest) identifying the contents of *path*.
+
+    The digest covers the first and last 64 KiB, where TIFF headers and IFDs
+    live, so entries survive moves and mounts under other paths, while a file
+    rewritten with its old mtime (cp -p, rsync -t) still gets new entries.
+    """
+    st = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        digest.update(fh.read(_FINGERPRINT_BYTES))
+        if st.st_size > 2 * _FINGERPRINT_BYTES:
+            fh.seek(-_FINGERPRINT_BYTES, os.SEEK_END)
+        digest.update(fh.read(_FINGERPRINT_BYTES))
+    return st.st_size, st.st_mtime_ns, digest.hexdigest()
+
+
+def _default_codec() -> str:
+    try:
+        import imagecodecs
+    except ImportError:
+        return "none"
+    return "lz4" if imagecodecs.LZ4.available else "none"
+
+
+def _encode(codec: str, data: np.ndarray) -> bytes:
+    raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+    if codec == "none":
+        return raw.tobytes()
+    if codec == "zlib":
+        return zlib.compress(raw, 1)
+    import imagecodecs
+
+    if codec == "lz4":
+        return imagecodecs.lz4_encode(raw)
+    if codec == "zstd":
+        return imagecodecs.zstd_encode(raw, level=1)
+    raise ValueError(f"Unknown disk cache codec {codec!r}")
+
+
+def _decode(codec: str, payload: bytes, out: np.ndarray) -> None:
+    raw = out.reshape(-1).view(np.uint8)
+    if codec == "none":
+        raw[:] = np.frombuffer(payload, dtype=np.uint8)
+    elif codec == "zlib":
+        raw[:] = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    else:
+        import imagecodecs
+
+        decode = imagecodecs.lz4_decode if codec == "lz4" else imagecodecs.zstd_decode
+        decoded = decode(payload, out=raw)
+        if decoded is not None and decoded.nbytes != raw.nbytes:
+            raise ValueError("Truncated tile payload")
+
+
+class DiskTileCache:
+    """
+    Persistent directory of decoded tiles, shared by processes and runs.
+
+    Used by MxTiffFile below its in-memory tile cache (``disk_cache=``): a
+    tile missing from memory is read from here before it is decoded from the
+    file, and decoded tiles are written here. Tiles are stored re-compressed
+    with a fast codec (LZ4 by default, when imagecodecs is installed), which
+    decodes far faster than JPEG, JPEG 2000 or Deflate.
+
+    Entries are written to a temporary file and renamed into place, so a
+    crash never leaves a partial entry under a valid name; unreadable
+    entries are treated as misses and removed. Once the directory exceeds
+    *max_bytes*, the least recently used entries, by file mtime, which hits
+    refresh, are removed until it is below 90% of the cap.
+
+    Parameters:
+    -----------
+    directory : str or None
+        Cache directory; None uses 'tiles' under $MXTIFFFILE_CACHE_DIR
+        (default ~/.cache/mxtifffile)
+    max_bytes : int
+        Size cap of the directory (default: 10 GiB)
+    codec : str or None
+        'lz4', 'zstd', 'zlib' or 'none'; None picks 'lz4' if available
+    fsync : bool
+        Flush each entry to disk before renaming it (default: False). Without
+        it a power loss can drop recent entries, which are then recomputed.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 10 * 2**30,
+                 codec: Optional[str] = None, fsync: bool = False) -> None:
+        if directory is None:
+            from .stats import default_cache_dir
+
+            directory = os.path.join(default_cache_dir(), "tiles")
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.codec = codec or _default_codec()
+        if self.codec not in ("lz4", "zstd", "zlib", "none"):
+            raise ValueError(f"Unknown disk cache codec {self.codec!r}")
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None  # scanned lazily on the first write
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def __reduce__(self):
+        return DiskTileCache, (self.directory, self.max_bytes, self.codec, self.fsync)
+
+    def _path(self, key: Hashable) -> str:
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=20).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:] + _SUFFIX)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                blob = fh.read()
+            value = self._unpack(blob)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except (OSError, ValueError, KeyError, RuntimeError):
+            # Corrupt or foreign entry: drop it and decode again
+            self.errors += 1
+            self.misses += 1
+            self._remove(path)
+            return default
+        self.hits += 1
+        self._touch(path)
+        return value
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        if not isinstance(value, np.ndarray) or value.dtype.hasobject:
+            return
+        blob = self._pack(value)
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(blob)
+                    if self.fsync:
+                        fh.flush()
+                        os.fsync(fh.fileno())
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp, path)
+            except BaseException:
+                self._remove(tmp)
+                raise
+        except OSError:
+            # A read-only or full cache directory only costs a decode
+            self.errors += 1
+            return
+        self.writes += 1
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            else:
+                # Overwriting an entry only adds the difference in size
+                self._bytes += len(blob) - replaced
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the stored value for *key*, or call *loader* and store its result."""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.put(key, value)
+        return value
+
+    def _pack(self, value: np.ndarray) -> bytes:
+        payload = _encode(self.codec, value)
+        header = json.dumps({"codec": self.codec, "dtype": value.dtype.str,
+                             "shape": list(value.shape), "size": len(payload)}).encode("utf-8")
+        return b"".join((_MAGIC, _HEADER.pack(len(header)), header, payload))
+
+    @staticmethod
+    def _unpack(blob: bytes) -> np.ndarray:
+        if not blob.startswith(_MAGIC):
+            raise ValueError("Not a tile cache entry")
+        start = len(_MAGIC) + _HEADER.size
+        (header_len,) = _HEADER.unpack_from(blob, len(_MAGIC))
+        header = json.loads(blob[start:start + header_len])
+        payload = blob[start + header_len:]
+        if len(payload) != header["size"]:
+            raise ValueError("Truncated tile cache entry")
+        value = np.empty(header["shape"], dtype=np.dtype(header["dtype"]))
+        _decode(header["codec"], payload, value)
+        value.flags.writeable = False
+        return value
+
+    def _touch(self, path: str) -> None:
+        try:
+            if time.time() - os.stat(path).st_mtime > _TOUCH_INTERVAL:
+                os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _scan(self):
+        """Return ([(mtime, size, path)] of entries, total bytes); drop stale temp files."""
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            subdirs = [d.path for d in os.scandir(self.directory) if d.is_dir()]
+        except FileNotFoundError:
+            return entries, total
+        for subdir in subdirs:
+            try:
+                files = list(os.scandir(subdir))
+            except FileNotFoundError:
+                continue
+            for entry in files:
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith(".tmp"):
+                    if now - st.st_mtime > _STALE_TMP_SECONDS:
+                        self._remove(entry.path)
+                    continue
+                if entry.name.endswith(_SUFFIX):
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        return entries, total
+
+    def evict(self) -> int:
+        """Remove least recently used entries until below the cap; return the count."""
+        entries, total = self._scan()
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * _LOW_WATER
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+        with self._lock:
+            self._bytes = total
+            self.evictions += removed
+        return removed
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Total size in bytes of the entries on disk."""
+        return self._scan()[1]
+
+    def __len__(self) -> int:
+        return len(self._scan()[0])
+
+    def clear(self) -> None:
+        """Remove every entry from the directory."""
+        for _, _, path in self._scan()[0]:
+            self._remove(path)
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return this process's hit/miss/write counters and the directory size."""
+        entries, total = self._scan()
+        return {
+            "entries": len(entries),
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
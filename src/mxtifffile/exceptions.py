@@ -1,2 +1,21 @@
 class MxTiffFormatError(Exception):
     """Raised when MxTiffFile cannot detect or parse the format of a TIFF file."""
+
+
+class MxTiffCorruptTileError(ValueError):
+    """
+    Raised when a tile or strip cannot be read or decoded: its bytes lie
+    beyond the end of the file, or its codec rejects them.
+
+    Attributes ifd, index, offset and bytecount locate the segment; reason
+    is 'truncated' or 'decode_error'.
+    """
+
+    def __init__(self, message: str, ifd: int = -1, index: int = -1, offset: int = 0,
+                 bytecount: int = 0, reason: str = "decode_error") -> None:
+        super().__init__(message)
+        self.ifd = ifd
+        self.index = index
+        self.offset = offset
+        self.bytecount = bytecount
+        self.reason = reason
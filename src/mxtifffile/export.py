@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .convert import _BIGTIFF_BYTES
+
+# Longest side of the thumbnail page of QPTIFF output
+_THUMBNAIL_SIZE = 256
+# Tile size used when the source pages are striped
+_DEFAULT_TILE = 256
+
+
+@dataclass
+class ExportReport:
+    """What export_subset wrote and how much of it was copied without decoding."""
+
+    path: str
+    layout: str
+    channels: List[str]
+    shapes: List[Tuple[int, int]]
+    copied_tiles: int = 0
+    encoded_tiles: int = 0
+    copied_bytes: int = 0
+    seconds: float = 0.0
+    passthrough_levels: List[bool] = field(default_factory=list)
+
+    @property
+    def copied_fraction(self) -> float:
+        """Fraction of the written tiles copied as compressed bytes."""
+        total = self.copied_tiles + self.encoded_tiles
+        return self.copied_tiles / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "layout": self.layout,
+            "channels": list(self.channels),
+            "shapes": [list(s) for s in self.shapes],
+            "copied_tiles": self.copied_tiles,
+            "encoded_tiles": self.encoded_tiles,
+            "copied_bytes": self.copied_bytes,
+            "copied_fraction": self.copied_fraction,
+            "seconds": self.seconds,
+        }
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        width, height = self.shapes[0] if self.shapes else (0, 0)
+        return (f"{self.path}: {len(self.channels)} channels, {width}x{height}, "
+                f"{len(self.shapes)} levels ({self.layout})\n"
+                f"tiles        {self.copied_tiles} copied, {self.encoded_tiles} encoded "
+                f"({self.copied_fraction:.1%} copied, {self.copied_bytes / 2**20:.1f} MiB)\n"
+                f"time         {self.seconds:.3f} s")
+
+
+def _level_window(start: int, length: int, full: int, level_full: int, halve: int) -> Tuple[int, int]:
+    """Map a level 0 extent to a pyramid level of size *level_full*."""
+    if halve:
+        # QPTIFF readers expect every level to be exactly half the previous one
+        return start >> halve, length >> halve
+    lstart = start * level_full // full
+    lend = -(-(start + length) * level_full // full)
+    lend = min(max(lend, lstart + 1), level_full)
+    return lstart, lend - lstart
+
+
+def _encoder(keyframe):
+    """
+    Return a function compressing a 2D tile with the codec and predictor of *keyframe*.
+
+    JPEG tiles are encoded as complete streams with default quality and
+    their own tables, which take precedence over the JPEGTables copied
+    from the source, so they decode alongside copied tiles.
+    """
+    import tifffile
+
+    compression = keyframe.compression.value
+    predictor = keyframe.predictor
+    compress = None if compression == 1 else tifffile.TIFF.COMPRESSORS[compression]
+    predict = None if predictor == 1 else tifffile.TIFF.PREDICTORS[predictor]
+
+    def encode(tile: np.ndarray) -> bytes:
+        if predict is not None:
+            tile = predict(tile, axis=-1)
+        if compress is None:
+            return np.ascontiguousarray(tile).tobytes()
+        return compress(tile)
+
+    return encode
+
+
+def _codec(page) -> tuple:
+    key = page.keyframe
+    return (key.tilelength, key.tilewidth, key.compression.value, key.predictor,
+            key.jpegtables, key.photometric.value, page.dtype.str)
+
+
+class _LevelPlan:
+    """Source window of one exported level and how its tiles are produced."""
+
+    def __init__(self, tif, level: int, indices, x: int, y: int, width: int, height: int):
+        self.level = level
+        self.series = tif.series[0].levels[level]
+        self.indices = list(indices)
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.keyframe = self.series.pages[self.indices[0]].keyframe
+        key = self.keyframe
+        if key.is_tiled:
+            self.tile = (key.tilelength, key.tilewidth)
+        else:
+            self.tile = (_DEFAULT_TILE, _DEFAULT_TILE)
+        # Compressed tiles can be copied when the crop starts on the tile grid
+        # and all selected pages share their codec settings
+        codecs = {_codec(self.series.pages[i]) for i in self.indices}
+        self.passthrough = (key.is_tiled and y % key.tilelength == 0
+                            and x % key.tilewidth == 0
+                            and len(self.series.pages[0].shape) == 2 and len(codecs) == 1)
+
+    def page_plan(self, tif, idx: int) -> "_LevelPlan":
+        """Plan of a single page of this level, for layouts writing pages one by one."""
+        return _LevelPlan(tif, self.level, [idx], self.x, self.y, self.width, self.height)
+
+    @property
+    def grid(self) -> Tuple[int, int]:
+        th, tw = self.tile
+        return -(-self.height // th), -(-self.width // tw)
+
+    def page_tiles(self, tif, idx: int, report: ExportReport, encode) -> Iterator[Any]:
+        """Yield the output tiles of one page: compressed bytes or arrays."""
+        page = self.series.pages[idx]
+        rows, cols = self.grid
+        th, tw = self.tile
+        if not self.passthrough:
+            for row in range(rows):
+                for col in range(cols):
+                    y0 = self.y + row * th
+                    x0 = self.x + col * tw
+                    h = min(th, self.y + self.height - y0)
+                    w = min(tw, self.x + self.width - x0)
+                    report.encoded_tiles += 1
+                    yield tif._read_single_layer(self.series, idx, y0, x0, h, w, self.level)
+            return
+
+        img_height, img_width = page.shape
+        src_cols = -(-img_width // tw)
+        row0, col0 = self.y // th, self.x // tw
+        # Tiles reaching past the crop are re-encoded, unless the crop ends
+        # where the page does, so no pixel outside the crop is exported
+        crop_bottom = self.y + self.height
+        crop_right = self.x + self.width
+        for row in range(rows):
+            for col in range(cols):
+                src = (row0 + row) * src_cols + col0 + col
+                top = (row0 + row) * th
+                left = (col0 + col) * tw
+                inside_y = top + th <= crop_bottom or crop_bottom == img_height
+                inside_x = left + tw <= crop_right or crop_right == img_width
+                bytecount = page.databytecounts[src] if src < len(page.dataoffsets) else 0
+                if inside_y and inside_x:
+                    data = tif._pread(page.dataoffsets[src], bytecount) if bytecount else b""
+                    report.copied_tiles += 1
+                    report.copied_bytes += len(data)
+                    yield data
+                    continue
+                tile = np.zeros(self.tile, dtype=page.dtype)
+                if bytecount:
+                    decoded = tif._load_tile(page, src)
+                    h = min(th, crop_bottom - top)
+                    w = min(tw, crop_right - left)
+                    tile[:h, :w] = decoded[:h, :w]
+                report.encoded_tiles += 1
+                yield encode(tile)
+
+    def tiles(self, tif, indices, report: ExportReport) -> Iterator[Any]:
+        encode = _encoder(self.keyframe) if self.passthrough else None
+        for idx in indices:
+            yield from self.page_tiles(tif, idx, report, encode)
+
+    def write_args(self) -> Dict[str, Any]:
+        """TiffWriter.write arguments for this level's codec and tiling."""
+        key = self.keyframe
+        args = {"tile": self.tile, "compression": key.compression.value,
+                "predictor": key.predictor if key.predictor != 1 else None,
+                "photometric": "minisblack", "dtype": self.series.pages[self.indices[0]].dtype}
+        if self.passthrough and key.jpegtables is not None:
+            args["jpegtables"] = key.jpegtables
+        if self.passthrough and key.compression.value == 7:
+            # Copied JPEG streams keep their own colorspace
+            args["photometric"] = key.photometric.value
+        return args
+
+
+def _plan_levels(tif, selection, x: int, y: int, width: int, height: int,
+                 levels: Optional[int], halving: bool) -> List[_LevelPlan]:
+    pyramid = tif.series[0].levels
+    full_height, full_width = pyramid[0].pages[0].shape[:2]
+    plans = []
+    for level in range(len(pyramid) if levels is None else min(levels, len(pyramid))):
+        level_height, level_width = pyramid[level].pages[0].shape[:2]
+        halve = level if halving else 0
+        lx, lw = _level_window(x, width, full_width, level_width, halve)
+        ly, lh = _level_window(y, height, full_height, level_height, halve)
+        if lw < 1 or lh < 1:
+            break
+        plans.append(_LevelPlan(tif, level, selection.indices, lx, ly, lw, lh))
+    return plans
+
+
+def _channel_names(tif, indices) -> List[str]:
+    names = []
+    for idx in indices:
+        name = tif.biomarkers[idx] if idx < len(tif.biomarkers) else None
+        names.append(name or f"Channel {idx}")
+    return names
+
+
+def _resolution(page, scale: float) -> Dict[str, Any]:
+    try:
+        xres, yres = page.keyframe.resolution
+        unit = page.keyframe.resolutionunit
+    except (AttributeError, TypeError, ValueError):
+        return {}
+    if not xres or not yres:
+        return {}
+    return {"resolution": (xres * scale, yres * scale), "resolutionunit": unit}
+
+
+def _write_ome(tif, writer, plans: List[_LevelPlan], names: List[str], report: ExportReport,
+               maxworkers: int) -> None:
+    fluors = [tif.fluorophores[i] if i < len(tif.fluorophores) else None for i in plans[0].indices]
+    channel = {"Name": names}
+    if all(fluors) and fluors != names:
+        channel["Fluor"] = fluors
+    metadata = {"axes": "CYX", "Channel": channel}
+    for n, plan in enumerate(plans):
+        first = plan.series.pages[plan.indices[0]]
+        args = plan.write_args()
+        args.update(_resolution(first, plan.width / plans[0].width))
+        if n == 0:
+            args.update(subifds=len(plans) - 1, metadata=metadata)
+        else:
+            args.update(subfiletype=1, metadata=None)
+        writer.write(plan.tiles(tif, plan.indices, report),
+                     shape=(len(plan.indices), plan.height, plan.width),
+                     maxworkers=maxworkers, **args)
+
+
+def _qpi_thumbnail(tif, plans: List[_LevelPlan]) -> Tuple[np.ndarray, Optional[str]]:
+    """Downsampled RGB rendering of the crop and the source thumbnail's description."""
+    plan = plans[-1]
+    step = max(1, -(-max(plan.width, plan.height) // _THUMBNAIL_SIZE))
+    rgb = np.zeros((-(-plan.height // step), -(-plan.width // step), 3), dtype=np.uint8)
+    for c, idx in enumerate(plan.indices[:3]):
+        layer = tif._read_single_layer(plan.series, idx, plan.y, plan.x, plan.height,
+                                       plan.width, plan.level)[::step, ::step]
+        high = float(np.percentile(layer, 99.5)) or 1.0
+        rgb[..., c] = np.clip(layer * (255.0 / high), 0, 255)
+    description = None
+    if len(tif.series) > 1 and tif.series[1].name == "Thumbnail":
+        description = tif.series[1].pages[0].description
+    return rgb, description
+
+
+def _write_qptiff(tif, writer, plans: List[_LevelPlan], report: ExportReport,
+                  maxworkers: int) -> None:
+    for n, plan in enumerate(plans):
+        if n == 1:
+            thumbnail, description = _qpi_thumbnail(tif, plans)
+            writer.write(thumbnail, photometric="rgb", subfiletype=1, description=description,
+                         software=tif.pages[0].software, metadata=None)
+        for idx in plan.indices:
+            # Pages carry their own descriptions and may differ in codec settings
+            page_plan = plan.page_plan(tif, idx)
+            page = plan.series.pages[idx]
+            args = page_plan.write_args()
+            args.update(_resolution(page, plan.width / plans[0].width))
+            writer.write(page_plan.tiles(tif, [idx], report), shape=(plan.height, plan.width),
+                         description=page.description, software=page.software,
+                         subfiletype=0 if n == 0 else 1, metadata=None,
+                         maxworkers=maxworkers, **args)
+
+
+def export_subset(tif, path, layers=None, pos: Optional[Tuple[int, int]] = None,
+                  shape: Optional[Tuple[int, int]] = None, levels: Optional[int] = None,
+                  layout: Optional[str] = None, bigtiff: Optional[bool] = None) -> ExportReport:
+    """Write a channel and region subset of *tif* to a new file; see MxTiffFile.export."""
+    import tifffile
+
+    start = time.perf_counter()
+    if layout is None:
+        layout = "qptiff" if tif.format_id == "qptiff" else "ome"
+    if layout not in ("ome", "qptiff"):
+        raise ValueError(f"Unknown export layout {layout!r}; expected 'ome' or 'qptiff'")
+    if layout == "qptiff" and tif.format_id != "qptiff":
+        raise ValueError("The 'qptiff' layout copies QPTIFF page descriptions; "
+                         "export other formats with layout='ome'")
+    _, selection, x, y, width, height = tif._resolve_region(layers, pos, shape, 0)
+    if not selection.indices:
+        raise ValueError("No layers selected for export")
+
+    plans = _plan_levels(tif, selection, x, y, width, height, levels,
+                         halving=layout == "qptiff")
+    names = _channel_names(tif, selection.indices)
+    report = ExportReport(os.fspath(path), layout, names,
+                          [(p.width, p.height) for p in plans],
+                          passthrough_levels=[p.passthrough for p in plans])
+    if bigtiff is None:
+        estimate = sum(sum(p.series.pages[i].databytecounts) for p in plans for i in p.indices)
+        bigtiff = tif.is_bigtiff or estimate > _BIGTIFF_BYTES
+
+    maxworkers = tif._max_workers
+    with tifffile.TiffWriter(os.fspath(path), bigtiff=bigtiff, ome=layout == "ome") as writer:
+        if layout == "ome":
+            _write_ome(tif, writer, plans, names, report, maxworkers)
+        else:
+            _write_qptiff(tif, writer, plans, report, maxworkers)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -5,6 +5,8 @@ import warnings
 import xml.etree.ElementTree as ET
 from typing import Any, Dict, List, Optional
 
+from .parsers import _empty_channel
+
 _OME_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
 
 ANCHOR_MARKER = "DAPI"
@@ -14,19 +16,6 @@ def _strip_comments(text: str) -> str:
     return _OME_COMMENT_RE.sub("", text).strip()
 
 
-def _empty_channel(index: int) -> Dict[str, Any]:
-    return {
-        "index": index,
-        "biomarker": None,
-        "fluorophore": None,
-        "display_name": None,
-        "description": None,
-        "exposure": None,
-        "wavelength": None,
-        "raw_xml": None,
-    }
-
-
 def _find_anchor_element(root: ET.Element, anchor: str) -> Optional[ET.Element]:
     """Return the first element whose text equals *anchor*."""
     for elem in root.iter():
@@ -94,8 +83,7 @@ def _per_page_heuristic(tif) -> Optional[List[Dict[str, Any]]]:
     results = []
     for idx, page in enumerate(pages):
         raw = getattr(page, "description", None)
-        ch = _empty_channel(idx)
-        ch["raw_xml"] = raw
+        ch = _empty_channel(idx, raw)
         if raw:
             try:
                 root = ET.fromstring(raw)
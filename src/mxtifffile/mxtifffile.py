@@ -1,10 +1,65 @@
+from __future__ import annotations
+
 from tifffile import TiffFile
+import mmap
 import os
+import sys
+import warnings
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Union, Iterable
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional, Union, Iterable
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
 import threading
+import time
+import weakref
+
+from .channel_index import ChannelIndex, LayerSelection
+from .buffers import BufferPool
+from .cache import TileCache, file_identity
+from .channel_table import ChannelTable
+from .exceptions import MxTiffCorruptTileError, MxTiffFormatError
+from .format_config import load_formats
+from .format_detector import detect_format
+from .parsers import parse_channels
+from . import heuristic
+
+if TYPE_CHECKING:
+    # Feature modules are imported by the methods using them, so opening a
+    # file does not load them (or hashlib, gzip, tempfile) up front
+    from .convert import ConvertReport
+    from .export import ExportReport
+    from .ngff import NgffReport
+    from .planner import ReadPlan
+    from .stats import ChannelStats
+    from .tissue import TissueMap
+    from .trace import TraceRecorder
+    from .verify import VerifyReport
+    from .warmup import WarmupJob
+
+
+# Compression values decoded directly by _read_tiled_region: none, LZW, Deflate
+_FAST_TILE_COMPRESSIONS = (1, 5, 8)
+
+_HAS_PREAD = hasattr(os, 'pread')
+_HAS_PREADV = hasattr(os, 'preadv')
+
+_NATIVE_BYTEORDER = '<' if sys.byteorder == 'little' else '>'
+
+# Memory budget of the private tile cache created when tile_cache is None
+_DEFAULT_CACHE_BYTES = 256 * 2**20
+
+
+@lru_cache(maxsize=None)
+def _load_imagecodecs():
+    """
+    Import imagecodecs once per process.
+
+    Returns the module, or None if it is not installed.
+    """
+    try:
+        import imagecodecs
+    except ImportError:
+        return None
+    return imagecodecs
 
 
 class MxTiffFile(TiffFile):
@@ -14,7 +69,9 @@ class MxTiffFile(TiffFile):
     """
 
     def __init__(self, file_path, *args, max_workers=4, enable_cache=True,
-                 formats_config=None, **kwargs):
+                 formats_config=None, case_sensitive=True, channel_aliases=None,
+                 tile_cache=None, executor=None, use_mmap=False, buffer_pool=None,
+                 disk_cache=None, **kwargs):
         """
         Initialize MxTiffFile by opening the file and extracting channel information.
 
@@ -28,26 +85,205 @@ class MxTiffFile(TiffFile):
             Enable LRU caching for page reads (default: True)
         formats_config : str or None
             Path to a custom formats.json, or None to use the bundled default
+        case_sensitive : bool
+            Match channel names exactly (default: True). If False, names are
+            compared case-insensitively.
+        channel_aliases : dict or None
+            Mapping of alternative names to channel names in this file,
+            e.g. {'Hoechst': 'DAPI'}
+        tile_cache : TileCache or None
+            Cache to store decoded tiles and regions in. Pass one instance to
+            several files to share a memory budget; None creates a private
+            cache of up to 256 MiB.
+        executor : concurrent.futures.Executor or None
+            Thread pool used for parallel reads. None creates a pool per call.
+        use_mmap : bool
+            Memory-map the file and serve uncompressed pages from the mapping
+            (default: False). Regions of contiguous pages are returned as
+            read-only views into the file without copying.
+        buffer_pool : BufferPool or None
+            Pool of reusable buffers for compressed and decoded tiles. Pass one
+            instance to several files to share it; None creates a private pool.
+        disk_cache : DiskTileCache, str or None
+            Persistent cache of decoded tiles below the in-memory tile cache,
+            or its directory (default: None, no disk cache). Tiles of
+            compressed, tiled pages found there are not decoded again, in
+            this or any later process. Requires enable_cache.
         *args, **kwargs :
             Additional arguments passed to TiffFile constructor
         """
         # Initialize the parent TiffFile class
         super().__init__(file_path, *args, **kwargs)
 
-        # Store the file path
+        # Store the file path and what is needed to reopen it after unpickling
         self.file_path = file_path
+        self._tiff_args = (args, kwargs)
+        self._formats_config = formats_config
+
+        self._setup(max_workers=max_workers, enable_cache=enable_cache,
+                    case_sensitive=case_sensitive, channel_aliases=channel_aliases,
+                    tile_cache=tile_cache, executor=executor, use_mmap=use_mmap,
+                    buffer_pool=buffer_pool, disk_cache=disk_cache)
 
+        # Run format detection pipeline
+        self._detect_and_parse(formats_config)
+
+    def _setup(self, max_workers=4, enable_cache=True, case_sensitive=True,
+               channel_aliases=None, tile_cache=None, executor=None, use_mmap=False,
+               buffer_pool=None, disk_cache=None) -> None:
+        """
+        Initialize the reader state that is not part of TiffFile: settings,
+        caches, locks and I/O handles. Shared by __init__ and unpickling.
+        """
         # Performance optimization settings
         self._max_workers = max_workers
         self._enable_cache = enable_cache
-        self._page_cache = {} if enable_cache else None
-        self._cache_lock = threading.Lock() if enable_cache else None
-        self._max_cache_size = 50  # Cache up to 50 pages
+        if enable_cache:
+            self._page_cache = tile_cache if tile_cache is not None else TileCache(
+                max_entries=None, max_bytes=_DEFAULT_CACHE_BYTES)
+        else:
+            self._page_cache = None
+        self._executor = executor
+        if isinstance(disk_cache, (str, os.PathLike)):
+            from .disk_cache import DiskTileCache
+
+            disk_cache = DiskTileCache(disk_cache)
+        self._disk_cache = disk_cache
+        self._disk_token = None  # file_fingerprint, computed on first disk cache use
+        self.buffer_pool = buffer_pool if buffer_pool is not None else BufferPool()
         self._file_io_lock = threading.Lock()  # Lock for thread-safe file I/O
         self._thread_local = threading.local()  # Thread-local storage for file handles
+        self._thread_handles = []  # Every handle opened by _get_thread_local_file_handle
+        self._thread_handles_lock = threading.Lock()
+        self._tiff_open_lock = threading.Lock()
+        self._fd = None  # Descriptor shared by all threads for os.pread
+        self._use_mmap = use_mmap
+        self._mmap = None
+        self._mmap_buffer = None  # uint8 view of self._mmap
+        try:
+            self._cache_token = file_identity(self.file_path)
+        except (TypeError, OSError):
+            # File-like objects have no stable identity; keep their entries private
+            self._cache_token = ('object', id(self))
+        self._case_sensitive = case_sensitive
+        self._channel_aliases = channel_aliases
+        self._selection_cache = {}
+        self._max_selection_cache_size = 256
+        self._tissue_maps = {}
+        self._stats_cache = {}
+        self._trace = None  # TraceRecorder while record_trace is active
+        self._last_read = 0.0  # time.monotonic() of the last foreground read
+        self._reads_in_flight = 0  # read_region/render calls running now
+        self._reads_lock = threading.Lock()
+        self._warmups = []  # background WarmupJobs to stop on close
+        self._pid = os.getpid()
+        _live_files.add(self)
+
+    def __reduce__(self):
+        """
+        Pickle to a light descriptor: path, open options, detected format and
+        channel table. The unpickled object reopens the file on first use
+        without re-running format detection.
+        """
+        if not isinstance(self.file_path, (str, os.PathLike)):
+            raise TypeError("Cannot pickle an MxTiffFile opened from a file object; "
+                            "open it by path instead")
+        state = {
+            'file_path': os.fspath(self.file_path),
+            'tiff_args': self._tiff_args,
+            'formats_config': self._formats_config,
+            'options': {
+                'max_workers': self._max_workers,
+                'enable_cache': self._enable_cache,
+                'case_sensitive': self._case_sensitive,
+                'channel_aliases': self._channel_aliases,
+                'use_mmap': self._use_mmap,
+                'disk_cache': self._disk_cache,
+            },
+            'cache_token': self._cache_token,
+            'format_id': self.format_id,
+            'channel_info': self._channel_table,
+        }
+        from .shm_cache import SharedTileCache
+
+        if isinstance(self._page_cache, SharedTileCache):
+            # Attach the receiving process to the same shared cache
+            state['options']['tile_cache'] = self._page_cache
+        return _restore_mxtifffile, (type(self), state)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found normally. An unpickled file
+        # has no TiffFile state yet; open it on first use.
+        state = self.__dict__.get('_tiff_state', 'open')
+        if (state == 'open' or name.startswith('__')
+                or self.__dict__.get('_tiff_opener') == threading.get_ident()):
+            # TiffFile resolves its is_* flags here
+            return super().__getattr__(name)
+        self._open_tiff()
+        return getattr(self, name)
+
+    def _open_tiff(self) -> None:
+        """Run TiffFile initialization for an unpickled file, once."""
+        with self._tiff_open_lock:
+            if self._tiff_state == 'open':
+                return
+            args, kwargs = self._tiff_args
+            # Attribute lookups inside TiffFile.__init__ must not recurse
+            self._tiff_opener = threading.get_ident()
+            try:
+                TiffFile.__init__(self, self.file_path, *args, **kwargs)
+            finally:
+                self._tiff_opener = None
+            self._tiff_state = 'open'
 
-        # Run format detection pipeline
-        self._detect_and_parse(formats_config)
+    def _check_fork(self) -> None:
+        """Reset process-local state if this object was inherited through a fork."""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Give a forked child its own locks, descriptors and file handle.
+
+        Locks may have been held by parent threads that do not exist in the
+        child, and inherited descriptors share file offsets with the parent.
+        Cached tiles stay valid and are kept; loads in flight in the parent
+        are forgotten.
+        """
+        self._pid = os.getpid()
+        self._file_io_lock = threading.Lock()
+        self._thread_handles_lock = threading.Lock()
+        self._tiff_open_lock = threading.Lock()
+        self._thread_local = threading.local()
+        handles, self._thread_handles = self._thread_handles, []
+        for fh in handles:
+            fh.close()
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        # The parent's pool, warm-up threads and reads do not exist in the child
+        self._executor = None
+        self._warmups = []
+        self._reads_lock = threading.Lock()
+        self._reads_in_flight = 0
+        if self._page_cache is not None:
+            self._page_cache._reset_after_fork()
+        if self._disk_cache is not None:
+            self._disk_cache._reset_after_fork()
+        self.buffer_pool._reset_after_fork()
+
+        if self.__dict__.get('_tiff_state', 'open') == 'open' and 'filehandle' in self.__dict__:
+            filehandle = self.filehandle
+            if isinstance(self.file_path, (str, os.PathLike)) and not filehandle.closed:
+                # Reopen so seeks no longer move the parent's file position
+                filehandle.close()
+                filehandle.open()
+            if filehandle.has_lock:
+                filehandle.set_lock(False)
+                filehandle.set_lock(True)
 
     def _get_thread_local_file_handle(self):
         """
@@ -55,26 +291,52 @@ class MxTiffFile(TiffFile):
         Each thread gets its own file handle to avoid race conditions.
         """
         if not hasattr(self._thread_local, 'file_handle') or self._thread_local.file_handle is None:
-            self._thread_local.file_handle = open(self.file_path, 'rb')
+            fh = open(self.file_path, 'rb')
+            with self._thread_handles_lock:
+                self._thread_handles.append(fh)
+            self._thread_local.file_handle = fh
         return self._thread_local.file_handle
 
+    def close(self) -> None:
+        """
+        Close the file, including the per-thread handles opened for parallel reads.
+        """
+        self.stop_trace()
+        for job in self._warmups:
+            job.cancel()
+        self._warmups = []
+        with self._thread_handles_lock:
+            handles, self._thread_handles = self._thread_handles, []
+        for fh in handles:
+            fh.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._mmap is not None:
+            self._mmap_buffer = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views returned to callers still reference the mapping; it is
+                # unmapped when the last of them is garbage collected
+                pass
+            self._mmap = None
+        self._thread_local = threading.local()
+        if self.__dict__.get('_tiff_state', 'open') == 'open':
+            super().close()
+
     def _detect_and_parse(self, formats_config=None) -> None:
         """
         Detect the file format and parse channel information using the config-driven pipeline.
         Sets self.format_id, self.channel_info, self.biomarkers, self.fluorophores.
         """
-        from .format_config import load_formats
-        from .format_detector import detect_format
-        from .parsers import PerPageParser, FileLevelParser, ImageJParser
-        from .heuristic import heuristic_detect
-        from .exceptions import MxTiffFormatError
-
         self.biomarkers = []
         self.fluorophores = []
-        self.channel_info = []
+        self._set_channel_table(ChannelTable())
         self.format_id: Optional[str] = None
 
         if not hasattr(self, 'series') or len(self.series) == 0 or len(self.series[0].pages) == 0:
+            self._build_channel_index()
             return
 
         configs = load_formats(formats_config)
@@ -82,16 +344,9 @@ class MxTiffFile(TiffFile):
 
         if fmt is not None:
             self.format_id = fmt.id
-            if fmt.metadata_scope == "per_page":
-                channel_data = PerPageParser(fmt, self).parse()
-            elif fmt.metadata_scope == "file_level":
-                channel_data = FileLevelParser(fmt, self).parse()
-            elif fmt.metadata_scope == "imagej":
-                channel_data = ImageJParser(fmt, self).parse()
-            else:
-                channel_data = []
+            channel_data = parse_channels(fmt, self)
         else:
-            channel_data = heuristic_detect(self)
+            channel_data = heuristic.heuristic_detect(self)
             if channel_data is not None:
                 self.format_id = "heuristic"
             else:
@@ -107,17 +362,88 @@ class MxTiffFile(TiffFile):
                 except Exception:
                     root_tag = "unknown"
 
-                from .heuristic import ANCHOR_MARKER as _anchor
                 raise MxTiffFormatError(
                     f"MxTiffFile: cannot detect format for '{self.file_path}'. "
                     f"Page 0 XML root tag: '{root_tag}'. "
                     f"Add a config entry in formats.json or set mxtifffile.ANCHOR_MARKER "
-                    f"(currently '{_anchor}') to a marker present in this file."
+                    f"(currently '{heuristic.ANCHOR_MARKER}') to a marker present in this file."
                 )
 
-        self.channel_info = channel_data or []
-        self.biomarkers = [ch.get("biomarker") for ch in self.channel_info]
-        self.fluorophores = [ch.get("fluorophore") for ch in self.channel_info]
+        self._set_channel_table(ChannelTable.from_dicts(channel_data or []))
+        self._build_channel_index()
+
+    def _set_channel_table(self, table: ChannelTable) -> None:
+        """Store parsed channel metadata and the name lists derived from it."""
+        self._channel_table = table
+        self._channel_dicts: Optional[List[Dict]] = None
+        self.biomarkers = table.column("biomarker")
+        self.fluorophores = table.column("fluorophore")
+
+    @property
+    def channel_info(self) -> List[Dict]:
+        """
+        Per-channel metadata as a list of plain dicts.
+
+        Built from the compact channel table on first access and kept, so
+        changes made by callers persist; files whose channel_info is never
+        read hold only the table.
+        """
+        if self._channel_dicts is None:
+            self._channel_dicts = self._channel_table.to_dicts()
+        return self._channel_dicts
+
+    @channel_info.setter
+    def channel_info(self, value) -> None:
+        table = value if isinstance(value, ChannelTable) else ChannelTable.from_dicts(value)
+        self._set_channel_table(table)
+        if not isinstance(value, ChannelTable):
+            self._channel_dicts = value
+
+    def _build_channel_index(self) -> None:
+        """
+        (Re)build the channel name index from self.channel_info and drop any
+        compiled layer selections that were resolved against the old index.
+        """
+        self.channel_index = ChannelIndex(self._channel_table,
+                                          case_sensitive=self._case_sensitive,
+                                          aliases=self._channel_aliases)
+        self._selection_cache = {}
+
+    def select(self, layers=None, level: int = 0) -> LayerSelection:
+        """
+        Resolve layer names/indices once into a reusable LayerSelection.
+
+        Parameters:
+        -----------
+        layers : str, Iterable[str], int, Iterable[int], or None
+            Layers to select, as accepted by read_region. None selects all layers.
+        level : int
+            Pyramid level used to validate layer indices (default: 0).
+
+        Returns:
+        --------
+        LayerSelection
+            Compiled selection that can be passed as ``layers`` to read_region
+        """
+        if isinstance(layers, LayerSelection):
+            return layers
+
+        n_pages = len(self.series[0].levels[level].pages)
+        if layers is not None and not isinstance(layers, (str, int)):
+            layers = tuple(layers)
+        key = (n_pages, layers)
+        try:
+            selection = self._selection_cache.get(key)
+        except TypeError:
+            # Unhashable identifiers; compile() reports them as errors
+            return self.channel_index.compile(layers, n_pages)
+
+        if selection is None:
+            selection = self.channel_index.compile(layers, n_pages)
+            if len(self._selection_cache) >= self._max_selection_cache_size:
+                self._selection_cache.clear()
+            self._selection_cache[key] = selection
+        return selection
 
     def _read_page_region_optimized(self, page, y: int, x: int, height: int, width: int) -> np.ndarray:
         """
@@ -137,36 +463,289 @@ class MxTiffFile(TiffFile):
         np.ndarray
             The requested region
         """
-        # Check if page is tiled
-        if hasattr(page, 'is_tiled') and page.is_tiled:
+        # TiffFrames (later pages of a series) share tile geometry and codec
+        # settings with their keyframe
+        if len(page.shape) == 2 and len(page.dataoffsets) > 0:
+            # Check if page is tiled
+            if self._is_fast_tiled(page):
+                try:
+                    # Use tile-based reading for better performance
+                    return self._read_tiled_region(page, y, x, height, width)
+                except NotImplementedError:
+                    # imagecodecs is missing: use the segment reader. Corrupt
+                    # tiles raise MxTiffCorruptTileError instead of falling back.
+                    pass
+
             try:
-                # Use tile-based reading for better performance
-                return self._read_tiled_region(page, y, x, height, width)
-            except Exception as e:
-                # Fall back to standard method if tiled reading fails
+                # Decode only the strips/tiles covering the region, without a lock
+                return self._read_segments_region(page, y, x, height, width)
+            except NotImplementedError:
+                # Fall back to standard method if segment decoding is not supported
                 pass
 
         # Final fallback: full page read with slicing
-        # Read full page and slice - this is what the original implementation does
         # Use lock to prevent race conditions when tifffile reads from disk
         with self._file_io_lock:
             full_page = page.asarray()
         return full_page[y:y + height, x:x + width].copy()
 
+    def _is_fast_tiled(self, page) -> bool:
+        """True if the page's tiles can be decoded directly by _decode_fast_tile."""
+        # TiffFrames (later pages of a series) share tile geometry and codec
+        # settings with their keyframe
+        key = page.keyframe
+        return (key.is_tiled and key.compression.value in _FAST_TILE_COMPRESSIONS
+                and key.predictor == 1 and self.byteorder == _NATIVE_BYTEORDER)
+
+    def _is_mmap_readable(self, page) -> bool:
+        """True if the page's samples can be viewed directly in the memory-mapped file."""
+        key = page.keyframe
+        return (len(page.shape) == 2 and key.compression.value == 1 and key.fillorder == 1
+                and key.bitspersample == page.dtype.itemsize * 8 and len(page.dataoffsets) > 0)
+
+    def _read_path(self, page) -> str:
+        """
+        Return the reader _get_cached_page_region uses for a page.
+
+        One of 'mmap', 'tile_cache' (tiles assembled through the tile cache),
+        'tiled' (direct tile decoding), 'segments' (tifffile decoding of the
+        intersecting tiles or strips) or 'full_page'. Readers may still fall
+        back to a later path if decoding fails.
+        """
+        if len(page.shape) != 2 or len(page.dataoffsets) == 0:
+            return 'full_page'
+        if self._use_mmap and self._is_mmap_readable(page):
+            return 'mmap'
+        if self._enable_cache and page.keyframe.is_tiled:
+            return 'tile_cache'
+        if self._is_fast_tiled(page):
+            return 'tiled'
+        return 'segments'
+
+    def _get_fd(self) -> int:
+        """
+        Return the read-only descriptor shared by all threads for positional reads.
+        """
+        self._check_fork()
+        fd = self._fd
+        if fd is None:
+            with self._thread_handles_lock:
+                if self._fd is None:
+                    self._fd = os.open(self.file_path, os.O_RDONLY)
+                fd = self._fd
+        return fd
+
+    def _pread(self, offset: int, bytecount: int) -> bytes:
+        """
+        Read *bytecount* bytes at *offset* without moving any shared file position.
+
+        Uses os.pread on a descriptor shared by all threads where available, and
+        a thread-local file handle otherwise. Safe to call from many threads.
+        """
+        if _HAS_PREAD:
+            return os.pread(self._get_fd(), bytecount, offset)
+
+        f = self._get_thread_local_file_handle()
+        f.seek(offset)
+        return f.read(bytecount)
+
+    def _pread_into(self, offset: int, out: np.ndarray) -> int:
+        """
+        Fill the uint8 buffer *out* with file bytes starting at *offset*.
+
+        Like _pread, but reads straight into an existing (pooled) buffer.
+        Returns the number of bytes read, which is less than out.nbytes only
+        at end of file.
+        """
+        if _HAS_PREADV:
+            return os.preadv(self._get_fd(), [out], offset)
+
+        f = self._get_thread_local_file_handle()
+        f.seek(offset)
+        return f.readinto(out)
+
+    def _segment_indices(self, page, y: int, x: int, height: int, width: int) -> List[int]:
+        """
+        Return the indices into page.dataoffsets of the tiles or strips that
+        intersect the region.
+        """
+        key = page.keyframe
+        if key.is_tiled:
+            tile_width = key.tilewidth
+            tile_height = key.tilelength
+            tiles_per_row = (page.shape[1] + tile_width - 1) // tile_width
+            return [tile_y * tiles_per_row + tile_x
+                    for tile_y in range(y // tile_height, (y + height - 1) // tile_height + 1)
+                    for tile_x in range(x // tile_width, (x + width - 1) // tile_width + 1)]
+
+        rowsperstrip = min(key.rowsperstrip or page.shape[0], page.shape[0])
+        return list(range(y // rowsperstrip, (y + height - 1) // rowsperstrip + 1))
+
+    def _read_segments_region(self, page, y: int, x: int, height: int, width: int) -> np.ndarray:
+        """
+        Read a region by positionally reading and decoding only the strips or
+        tiles that intersect it.
+
+        Decoding is delegated to tifffile's page.decode, so every compression,
+        predictor and bit depth tifffile supports works here. No lock is held,
+        so parallel reads of different layers scale with the number of threads.
+        """
+        output = np.zeros((height, width), dtype=page.dtype)
+
+        for index in self._segment_indices(page, y, x, height, width):
+            if index >= len(page.dataoffsets):
+                continue
+            segment, indices = self._decode_segment(page, index)
+            if segment is None:
+                # Empty segment: leave zeros
+                continue
+            segment = segment.reshape(segment.shape[-3], segment.shape[-2])
+            seg_y, seg_x = indices[-3], indices[-2]
+
+            y0 = max(y, seg_y)
+            x0 = max(x, seg_x)
+            y1 = min(y + height, seg_y + segment.shape[0])
+            x1 = min(x + width, seg_x + segment.shape[1])
+            if y1 <= y0 or x1 <= x0:
+                continue
+            output[y0 - y:y1 - y, x0 - x:x1 - x] = segment[y0 - seg_y:y1 - seg_y, x0 - seg_x:x1 - seg_x]
+
+        return output
+
+    def _decode_segment(self, page, index: int):
+        """
+        Read and decode one tile or strip with tifffile.
+
+        Returns (segment, indices) as page.decode does; segment is None for
+        empty segments. Raises NotImplementedError if tifffile cannot decode
+        the page at all, and MxTiffCorruptTileError if this segment's bytes
+        are missing or rejected by the codec.
+        """
+        key = page.keyframe
+        bytecount = page.databytecounts[index]
+        data = None
+        if bytecount:
+            data = self._pread(page.dataoffsets[index], bytecount)
+            if len(data) < bytecount:
+                raise self._segment_error(page, index, 'truncated',
+                                          f"{len(data)} of {bytecount} bytes before end of file")
+        try:
+            segment, indices, _ = key.decode(data, index, jpegtables=key.jpegtables)
+        except Exception as exc:
+            try:
+                # Decoders tifffile does not support raise for any input
+                key.decode(None, index, jpegtables=key.jpegtables)
+            except (ValueError, NotImplementedError):
+                raise NotImplementedError(str(exc)) from exc
+            raise self._segment_error(page, index, 'decode_error', str(exc)) from exc
+        return segment, indices
+
+    def _segment_error(self, page, index: int, reason: str, detail: str) -> MxTiffCorruptTileError:
+        """Build the error reporting a bad tile or strip with its location in the file."""
+        kind = 'tile' if page.keyframe.is_tiled else 'strip'
+        offset = page.dataoffsets[index]
+        bytecount = page.databytecounts[index]
+        return MxTiffCorruptTileError(
+            f"{self.file_path}: {kind} {index} of IFD {page.index} "
+            f"(offset {offset}, {bytecount} bytes) is {reason.replace('_', ' ')}: {detail}",
+            ifd=page.index, index=index, offset=offset, bytecount=bytecount, reason=reason)
+
+    def _get_mmap_buffer(self) -> np.ndarray:
+        """
+        Return a read-only uint8 array over the memory-mapped file, mapping it on first use.
+        """
+        if self._mmap_buffer is None:
+            with self._thread_handles_lock:
+                if self._mmap is None:
+                    with open(self.file_path, 'rb') as fh:
+                        self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._mmap_buffer is None:
+                    self._mmap_buffer = np.frombuffer(self._mmap, dtype=np.uint8)
+        return self._mmap_buffer
+
+    def _read_mmap_region(self, page, y: int, x: int, height: int, width: int) -> Optional[np.ndarray]:
+        """
+        Read a region of an uncompressed page from the memory-mapped file.
+
+        Regions of contiguous pages, and regions inside a single tile or strip,
+        are returned as strided, read-only views into the mapping. Other
+        regions are assembled with one slice copy per tile or strip, which
+        costs page-cache lookups but no read syscalls or intermediate buffers.
+
+        Returns None if the page is compressed, bit-packed or not 2-D, so the
+        caller can use the regular readers.
+        """
+        if not self._is_mmap_readable(page):
+            return None
+        key = page.keyframe
+
+        buffer = self._get_mmap_buffer()
+        dtype = page.dtype.newbyteorder(self.byteorder)
+        img_height, img_width = page.shape
+
+        # Older tifffile returns (offset, bytecount) or None, newer a bool
+        contiguous = page.is_contiguous
+        if contiguous and not key.is_tiled:
+            offset = contiguous[0] if isinstance(contiguous, tuple) else int(page.dataoffsets[0])
+            if offset + img_height * img_width * dtype.itemsize > len(buffer):
+                return None
+            full = np.ndarray((img_height, img_width), dtype=dtype, buffer=buffer, offset=offset)
+            region = full[y:y + height, x:x + width]
+            return region if dtype.isnative else region.astype(page.dtype)
+
+        if key.is_tiled:
+            seg_height, seg_width = key.tilelength, key.tilewidth
+            per_row = (img_width + seg_width - 1) // seg_width
+        else:
+            seg_height = min(key.rowsperstrip or img_height, img_height)
+            seg_width = img_width
+            per_row = 1
+
+        offsets = page.dataoffsets
+        indices = self._segment_indices(page, y, x, height, width)
+        single = len(indices) == 1 and dtype.isnative
+
+        output = np.zeros((height, width), dtype=page.dtype)
+        for index in indices:
+            if index >= len(offsets):
+                continue
+            seg_row, seg_col = divmod(index, per_row)
+            seg_y, seg_x = seg_row * seg_height, seg_col * seg_width
+            # Tiles are always full size; the last strip may be shorter
+            rows = seg_height if key.is_tiled else min(seg_height, img_height - seg_y)
+            offset = int(offsets[index])
+            if (page.databytecounts[index] < rows * seg_width * dtype.itemsize
+                    or offset + rows * seg_width * dtype.itemsize > len(buffer)):
+                return None
+            segment = np.ndarray((rows, seg_width), dtype=dtype, buffer=buffer, offset=offset)
+            if single:
+                # Region lies inside one segment: return a view, no copy
+                return segment[y - seg_y:y - seg_y + height, x - seg_x:x - seg_x + width]
+            y0, x0 = max(y, seg_y), max(x, seg_x)
+            y1 = min(y + height, seg_y + rows)
+            x1 = min(x + width, seg_x + seg_width)
+            if y1 > y0 and x1 > x0:
+                output[y0 - y:y1 - y, x0 - x:x1 - x] = \
+                    segment[y0 - seg_y:y1 - seg_y, x0 - seg_x:x1 - seg_x]
+        return output
+
     def _read_tiled_region(self, page, y: int, x: int, height: int, width: int) -> np.ndarray:
         """
         Read region using tile-based access for tiled TIFF pages.
         This is much more efficient than reading the entire page.
         Uses direct file I/O and decompression for only the needed tiles.
+
+        Compressed bytes are read into, and tiles decoded into, buffers from
+        self.buffer_pool, so no per-tile allocations are made.
         """
-        try:
-            import imagecodecs
-        except ImportError:
+        imagecodecs = _load_imagecodecs()
+        if imagecodecs is None:
             # Fallback to full page read if imagecodecs not available
-            raise Exception("imagecodecs not available for tile decoding")
+            raise NotImplementedError("imagecodecs not available for tile decoding")
 
-        tile_width = page.tilewidth
-        tile_height = page.tilelength
+        key = page.keyframe
+        tile_width = key.tilewidth
+        tile_height = key.tilelength
 
         # Calculate which tiles we need
         start_tile_x = x // tile_width
@@ -177,40 +756,24 @@ class MxTiffFile(TiffFile):
         # Calculate tiles per row
         tiles_per_row = (page.shape[1] + tile_width - 1) // tile_width
 
+        tile_indices = [tile_y * tiles_per_row + tile_x
+                        for tile_y in range(start_tile_y, end_tile_y + 1)
+                        for tile_x in range(start_tile_x, end_tile_x + 1)
+                        if tile_y * tiles_per_row + tile_x < len(page.dataoffsets)]
+
         # Allocate output array
         output = np.empty((height, width), dtype=page.dtype)
 
-        # Read only the required tiles
-        for tile_y in range(start_tile_y, end_tile_y + 1):
-            for tile_x in range(start_tile_x, end_tile_x + 1):
-                # Calculate tile index
-                tile_idx = tile_y * tiles_per_row + tile_x
-
-                if tile_idx >= len(page.dataoffsets):
-                    continue
-
-                # Read compressed tile data directly from file
-                offset = page.dataoffsets[tile_idx]
-                bytecount = page.databytecounts[tile_idx]
-
-                # Use thread-local file handle for safe parallel reading
-                f = self._get_thread_local_file_handle()
-                f.seek(offset)
-                compressed_data = f.read(bytecount)
-
-                # Decompress based on compression type
-                if page.compression.value == 5:  # LZW
-                    decompressed = imagecodecs.lzw_decode(compressed_data)
-                elif page.compression.value == 1:  # No compression
-                    decompressed = compressed_data
-                elif page.compression.value == 8:  # Deflate
-                    decompressed = imagecodecs.zlib_decode(compressed_data)
-                else:
-                    # Unsupported compression, fall back
-                    raise Exception(f"Unsupported compression: {page.compression}")
-
-                # Reshape to tile dimensions
-                tile_data = np.frombuffer(decompressed, dtype=page.dtype).reshape(tile_height, tile_width)
+        # One decode buffer and one compressed-bytes buffer serve all tiles
+        pool = self.buffer_pool
+        tile_buf = pool.acquire(tile_height * tile_width * page.dtype.itemsize)
+        max_bytecount = max((page.databytecounts[i] for i in tile_indices), default=0)
+        comp_buf = pool.acquire(max_bytecount)
+        try:
+            # Read only the required tiles
+            for tile_idx in tile_indices:
+                tile_data = self._decode_fast_tile(imagecodecs, page, tile_idx, tile_buf, comp_buf)
+                tile_y, tile_x = divmod(tile_idx, tiles_per_row)
 
                 # Calculate where this tile intersects with our region
                 tile_start_x = tile_x * tile_width
@@ -231,35 +794,157 @@ class MxTiffFile(TiffFile):
                 # Copy tile data to output
                 output[out_y0:out_y1, out_x0:out_x1] = \
                     tile_data[in_tile_y0:in_tile_y1, in_tile_x0:in_tile_x1]
+        finally:
+            pool.release(comp_buf)
+            pool.release(tile_buf)
 
         return output
 
-    def _read_striped_region(self, page, y: int, x: int, height: int, width: int) -> np.ndarray:
+    def _decode_fast_tile(self, imagecodecs, page, tile_idx: int,
+                          tile_buf: np.ndarray, comp_buf: np.ndarray) -> np.ndarray:
         """
-        Read region using strip-based access for striped TIFF pages.
+        Read and decode one uncompressed/LZW/Deflate tile into *tile_buf*.
+
+        Returns a (tilelength, tilewidth) array viewing *tile_buf*; it is only
+        valid until the buffer is reused.
         """
-        rowsperstrip = page.rowsperstrip if hasattr(page, 'rowsperstrip') else page.shape[0]
+        key = page.keyframe
+        tile_height, tile_width = key.tilelength, key.tilewidth
+        tile_nbytes = tile_height * tile_width * page.dtype.itemsize
+        offset = page.dataoffsets[tile_idx]
+        bytecount = page.databytecounts[tile_idx]
+        compression = key.compression.value
+
+        if compression not in _FAST_TILE_COMPRESSIONS:
+            raise NotImplementedError(f"Unsupported compression: {key.compression}")
+        if bytecount == 0:
+            # Sparse file: tiles never written read as zeros
+            tile_buf[:tile_nbytes] = 0
+            return tile_buf[:tile_nbytes].view(page.dtype).reshape(tile_height, tile_width)
+
+        # Decompress based on compression type
+        if compression == 1:  # No compression: read straight into the tile buffer
+            expected = min(bytecount, tile_nbytes)
+            nread = self._pread_into(offset, tile_buf[:expected])
+            decompressed = tile_buf[:nread]
+        else:
+            # Read compressed tile data directly from file
+            expected = bytecount
+            nread = self._pread_into(offset, comp_buf[:bytecount])
+            compressed_data = comp_buf[:nread]
+        if nread < expected:
+            raise self._segment_error(page, tile_idx, 'truncated',
+                                      f"{nread} of {expected} bytes before end of file")
+        if compression != 1:
+            codec = imagecodecs.lzw_decode if compression == 5 else imagecodecs.zlib_decode
+            try:
+                decompressed = codec(compressed_data, out=tile_buf)
+            except Exception as exc:
+                raise self._segment_error(page, tile_idx, 'decode_error', str(exc)) from exc
 
-        # Calculate which strips we need
-        start_strip = y // rowsperstrip
-        end_strip = (y + height - 1) // rowsperstrip
+        if len(decompressed) < tile_nbytes:
+            raise self._segment_error(page, tile_idx, 'decode_error',
+                                      f"decoded to {len(decompressed)} bytes, "
+                                      f"expected {tile_nbytes}")
 
-        # Read only required strips
-        strips = []
-        for strip_idx in range(start_strip, end_strip + 1):
-            strip_y0 = strip_idx * rowsperstrip
-            strip_y1 = min((strip_idx + 1) * rowsperstrip, page.shape[0])
+        # Reshape to tile dimensions
+        return tile_buf[:tile_nbytes].view(page.dtype).reshape(tile_height, tile_width)
 
-            # Read the strip
-            strip_data = page.asarray()[strip_y0:strip_y1, :]
-            strips.append(strip_data)
+    def _load_tile(self, page, tile_idx: int) -> np.ndarray:
+        """
+        Read and decode one whole tile into a new read-only (tilelength, tilewidth) array.
 
-        # Concatenate strips and extract region
-        full_strips = np.vstack(strips)
-        region_y0 = y - (start_strip * rowsperstrip)
-        region_y1 = region_y0 + height
+        Used to fill the tile cache, so unlike _decode_fast_tile the result owns
+        its memory; fast-path codecs decode straight into it.
+        """
+        key = page.keyframe
+        tile_shape = (key.tilelength, key.tilewidth)
+        bytecount = page.databytecounts[tile_idx]
+        imagecodecs = _load_imagecodecs()
+
+        if imagecodecs is not None and self._is_fast_tiled(page):
+            tile = np.empty(tile_shape, dtype=page.dtype)
+            with self.buffer_pool.borrow(bytecount) as comp_buf:
+                self._decode_fast_tile(imagecodecs, page, tile_idx,
+                                       tile.reshape(-1).view(np.uint8), comp_buf)
+        else:
+            segment, _ = self._decode_segment(page, tile_idx)
+            if segment is None:
+                tile = np.zeros(tile_shape, dtype=page.dtype)
+            else:
+                tile = segment.reshape(tile_shape)
 
-        return full_strips[region_y0:region_y1, x:x + width].copy()
+        tile.flags.writeable = False
+        return tile
+
+    def _load_tile_persistent(self, page_key: str, page, tile_idx: int) -> np.ndarray:
+        """
+        _load_tile through the disk cache, when one is set and the page is compressed.
+        """
+        disk = self._disk_cache
+        if (disk is None or page.keyframe.compression.value == 1
+                or not isinstance(self.file_path, (str, os.PathLike))):
+            # Uncompressed tiles are cheaper to read from the file itself, and
+            # file objects have no identity to key entries by
+            return self._load_tile(page, tile_idx)
+        token = self._disk_token
+        if token is None:
+            from .disk_cache import file_fingerprint
+
+            token = self._disk_token = file_fingerprint(self.file_path)
+        return disk.get_or_load((token, page_key, tile_idx),
+                                lambda: self._load_tile(page, tile_idx))
+
+    def _read_cached_tiles_region(self, page_key: str, page, y: int, x: int,
+                                  height: int, width: int) -> np.ndarray:
+        """
+        Assemble a region of a tiled page from decoded tiles in the tile cache.
+
+        Tiles are fetched through TileCache.get_or_load, so when several threads
+        need the same tile at once only the first decodes it and the others wait
+        for its result.
+        """
+        key = page.keyframe
+        tile_width = key.tilewidth
+        tile_height = key.tilelength
+        tiles_per_row = (page.shape[1] + tile_width - 1) // tile_width
+        output = np.zeros((height, width), dtype=page.dtype)
+
+        for tile_idx in self._segment_indices(page, y, x, height, width):
+            if tile_idx >= len(page.dataoffsets):
+                continue
+            tile = self._page_cache.get_or_load(
+                self._tile_cache_key(page_key, tile_idx),
+                lambda tile_idx=tile_idx: self._load_tile_persistent(page_key, page, tile_idx))
+
+            tile_y, tile_x = divmod(tile_idx, tiles_per_row)
+            tile_start_y = tile_y * tile_height
+            tile_start_x = tile_x * tile_width
+            y0 = max(y, tile_start_y)
+            x0 = max(x, tile_start_x)
+            y1 = min(y + height, tile_start_y + tile_height)
+            x1 = min(x + width, tile_start_x + tile_width)
+            output[y0 - y:y1 - y, x0 - x:x1 - x] = \
+                tile[y0 - tile_start_y:y1 - tile_start_y, x0 - tile_start_x:x1 - tile_start_x]
+
+        return output
+
+    @staticmethod
+    def _page_key(level: int, idx: int) -> str:
+        """Identifier of a page within the file used in cache keys."""
+        return f"L{level}_P{idx}"
+
+    def _tile_cache_key(self, page_key: str, tile_idx: int) -> tuple:
+        return (self._cache_token, page_key, 'tile', tile_idx)
+
+    def _region_cache_key(self, page_key: str, y: int, x: int, height: int, width: int) -> tuple:
+        return (self._cache_token, page_key, y, x, height, width)
+
+    def _read_striped_region(self, page, y: int, x: int, height: int, width: int) -> np.ndarray:
+        """
+        Read region using strip-based access for striped TIFF pages.
+        """
+        return self._read_segments_region(page, y, x, height, width)
 
     def _get_cached_page_region(self, page_key: str, page, y: int, x: int,
                                height: int, width: int) -> np.ndarray:
@@ -280,30 +965,31 @@ class MxTiffFile(TiffFile):
         np.ndarray
             The requested region
         """
+        path = self._read_path(page)
+        if path == 'mmap':
+            # Page-cache backed reads are cheaper than copying into our cache
+            region = self._read_mmap_region(page, y, x, height, width)
+            if region is not None:
+                return region
+
         if not self._enable_cache:
             return self._read_page_region_optimized(page, y, x, height, width)
 
-        cache_key = f"{page_key}_{y}_{x}_{height}_{width}"
-
-        # Check cache
-        with self._cache_lock:
-            if cache_key in self._page_cache:
-                return self._page_cache[cache_key].copy()
-
-        # Read the region
-        region = self._read_page_region_optimized(page, y, x, height, width)
-
-        # Store in cache
-        with self._cache_lock:
-            # Implement simple LRU by removing oldest entry if cache is full
-            if len(self._page_cache) >= self._max_cache_size:
-                # Remove first (oldest) entry
-                first_key = next(iter(self._page_cache))
-                del self._page_cache[first_key]
+        if path == 'tile_cache':
+            try:
+                # Cache whole decoded tiles so overlapping regions share them
+                return self._read_cached_tiles_region(page_key, page, y, x, height, width)
+            except NotImplementedError:
+                # Fall back to region caching if tile decoding is not supported
+                pass
 
-            self._page_cache[cache_key] = region.copy()
+        cache_key = self._region_cache_key(page_key, y, x, height, width)
 
-        return region
+        # Concurrent misses on the same region wait for one read; the cache
+        # evicts least-recently-used entries when full
+        region = self._page_cache.get_or_load(
+            cache_key, lambda: self._read_page_region_optimized(page, y, x, height, width))
+        return region.copy()
 
     def get_markers(self) -> List[str]:
         """
@@ -317,7 +1003,7 @@ class MxTiffFile(TiffFile):
         return self.biomarkers
 
     def read_region(self,
-                    layers: Union[str, Iterable[str], int, Iterable[int], None] = None,
+                    layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
                     pos: Union[Tuple[int, int], None] = None,
                     shape: Union[Tuple[int, int], None] = None,
                     level: int = 0,
@@ -327,9 +1013,9 @@ class MxTiffFile(TiffFile):
 
         Parameters:
         -----------
-        layers : str, Iterable[str], int, Iterable[int], or None
-            Layers to read, can be biomarker names or indices.
-            If None, all layers are read.
+        layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+            Layers to read, can be biomarker names or indices, or a selection
+            compiled with select(). If None, all layers are read.
         pos : Tuple[int, int] or None
             (x, y) starting position. If None, starts at (0, 0).
         shape : Tuple[int, int] or None
@@ -345,6 +1031,522 @@ class MxTiffFile(TiffFile):
             Array of shape (height, width) for a single layer or
             (height, width, num_layers) for multiple layers.
         """
+        self._check_fork()
+        self._begin_read()
+        try:
+            series, selection, x, y, width, height = self._resolve_region(layers, pos, shape,
+                                                                          level)
+            trace = self._trace
+            if trace is None:
+                return self._read_resolved(series, selection, x, y, width, height, level,
+                                           parallel)
+            with trace.record(self, 'read_region', series, selection, x, y, width, height,
+                              int(level), parallel):
+                return self._read_resolved(series, selection, x, y, width, height, level,
+                                           parallel)
+        finally:
+            self._end_read()
+
+    def _begin_read(self) -> None:
+        """
+        Mark a foreground read as running; background warm-ups back off meanwhile.
+
+        Called by read_region and render, and around the streaming readers
+        (channel_stats, quantify, export, convert, export_ngff and verify).
+        """
+        with self._reads_lock:
+            self._reads_in_flight += 1
+            self._last_read = time.monotonic()
+
+    def _end_read(self) -> None:
+        with self._reads_lock:
+            self._reads_in_flight -= 1
+            self._last_read = time.monotonic()
+
+    def _read_resolved(self, series, selection, x: int, y: int, width: int, height: int,
+                       level: int, parallel: bool):
+        """read_region for arguments already validated by _resolve_region."""
+        layer_indices = list(selection.indices)
+
+        # Read the requested regions for each layer
+        if parallel and len(layer_indices) > 1:
+            # Use parallel reading for multiple layers
+            result_layers = self._read_layers_parallel(series, layer_indices, y, x, height, width, level)
+        else:
+            # Sequential reading
+            result_layers = self._read_layers_sequential(series, layer_indices, y, x, height, width, level)
+
+        # Return result based on number of layers
+        if len(result_layers) == 1:
+            return result_layers[0]
+        else:
+            # Stack layers along a new axis
+            return np.stack(result_layers, axis=2)
+
+    def plan_read(self,
+                  layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+                  pos: Union[Tuple[int, int], None] = None,
+                  shape: Union[Tuple[int, int], None] = None,
+                  level: int = 0) -> ReadPlan:
+        """
+        Describe the work a read_region call with the same arguments would do,
+        without reading any pixel data.
+
+        The plan lists, per layer, the read path taken, the tiles or strips
+        touched, their compressed size, how many are already cached and an
+        estimated decode time. Call plan.explain() for a readable summary and
+        plan.execute() to perform the read.
+
+        Returns:
+        --------
+        ReadPlan
+        """
+        from .planner import build_plan
+
+        series, selection, x, y, width, height = self._resolve_region(layers, pos, shape, level)
+        return build_plan(self, series, selection, int(level), x, y, width, height)
+
+    def render(self,
+               layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+               colors=None, limits=None,
+               pos: Union[Tuple[int, int], None] = None,
+               shape: Union[Tuple[int, int], None] = None,
+               level: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Render layers as a pseudocolored, additively blended uint8 RGB image.
+
+        Windowing, color mapping and blending are done through per-layer
+        lookup tables into one integer accumulator. Layers without limits use
+        percentiles of their cached channel statistics. See
+        mxtifffile.render.render_composite for the parameters.
+
+        Returns:
+        --------
+        numpy.ndarray
+            (height, width, 3) uint8 array
+        """
+        from .render import render_composite
+
+        self._check_fork()
+        self._begin_read()
+        try:
+            trace = self._trace
+            if trace is None:
+                return render_composite(self, layers, colors, limits, pos, shape, level, out)
+            series, selection, x, y, width, height = self._resolve_region(layers, pos, shape,
+                                                                          level)
+            with trace.record(self, 'render', series, selection, x, y, width, height,
+                              int(level), False):
+                return render_composite(self, selection, colors, limits, (x, y),
+                                        (width, height), level, out)
+        finally:
+            self._end_read()
+
+    def record_trace(self, path) -> TraceRecorder:
+        """
+        Record every read_region and render call to a trace file until
+        stop_trace() is called or the returned recorder is closed.
+
+        The trace is JSON lines (gzip-compressed if path ends in '.gz'). Its
+        header records only the geometry of the file, not its path, channel
+        names or metadata, so traces of confidential slides can be shared and
+        replayed against synthetic data with mxtifffile.trace.replay_trace or
+        ``mxtifffile replay``.
+
+        Parameters:
+        -----------
+        path : str
+            Trace file to write
+
+        Returns:
+        --------
+        TraceRecorder
+            Context manager that stops recording on exit
+        """
+        from .trace import TraceRecorder
+
+        self.stop_trace()
+        self._trace = TraceRecorder(self, path)
+        return self._trace
+
+    def warm_cache(self, regions=None, layers=None, max_bytes: Optional[int] = None,
+                   max_seconds: Optional[float] = None, max_tiles: Optional[int] = None,
+                   background: bool = True, idle_seconds: float = 0.05,
+                   progress=None) -> WarmupJob:
+        """
+        Pre-populate the tile cache with hot regions, by default in a
+        low-priority background thread.
+
+        Regions are expanded into the tiles (or, for untiled pages, the exact
+        regions) that reads of them would cache, and loaded in order until a
+        budget is reached. Tiles already cached are skipped. The background
+        thread runs at the lowest CPU priority where supported and pauses
+        while any read (read_region, render, channel_stats, quantify, the
+        exports or verify) runs and for idle_seconds after it ends.
+
+        Parameters:
+        -----------
+        regions : Iterable of (layers, pos, shape, level) or None
+            Hot regions, most important first, e.g. from
+            mxtifffile.warmup.regions_from_trace. None warms whole levels
+            from the lowest resolution upward.
+        layers : str, Iterable[str], int, Iterable[int], or None
+            Layers for the default regions; None uses all layers
+        max_bytes : int or None
+            Decoded bytes to load; None uses half of a bounded tile cache
+        max_seconds, max_tiles : float, int or None
+            Further limits on time and number of loads
+        background : bool
+            Run in a daemon thread and return at once (default: True)
+        idle_seconds : float
+            Back-off window after foreground reads (default: 0.05)
+        progress : callable or None
+            Called with the WarmupJob every few tiles and when finished
+
+        Returns:
+        --------
+        WarmupJob
+            Progress counters, wait() and cancel()
+        """
+        from .warmup import warm_cache
+
+        return warm_cache(self, regions, layers, max_bytes, max_seconds, max_tiles,
+                          background, idle_seconds, progress)
+
+    def export(self, path,
+               layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+               pos: Union[Tuple[int, int], None] = None,
+               shape: Union[Tuple[int, int], None] = None,
+               levels: Optional[int] = None, layout: Optional[str] = None,
+               bigtiff: Optional[bool] = None) -> ExportReport:
+        """
+        Write a channel and region subset, with its pyramid, to a new file.
+
+        Where the region starts on the tile grid of a level, the compressed
+        tiles of that level are copied from the file without decoding; only
+        tiles crossing the right or bottom edge of the region are decoded,
+        cropped and re-encoded with the same codec and predictor; re-encoded
+        JPEG tiles use default quality and carry their own tables. Other
+        levels and striped pages are decoded and re-encoded.
+
+        Parameters:
+        -----------
+        path : str
+            Output file
+        layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+            Layers to export, in output order; None exports all layers
+        pos, shape : Tuple[int, int] or None
+            (x, y) and (width, height) of the region at level 0; None
+            exports the whole image
+        levels : int or None
+            Number of pyramid levels to write; None writes all
+        layout : str or None
+            'ome' writes an OME-TIFF with the pyramid in SubIFDs and channel
+            names in the OME-XML. 'qptiff' writes QPTIFF pages, keeping the
+            ImageDescription of every page. None uses 'qptiff' for QPTIFF
+            files and 'ome' otherwise.
+        bigtiff : bool or None
+            Write a BigTIFF; None decides from the size of the source tiles
+
+        Returns:
+        --------
+        ExportReport
+            Counts of copied and re-encoded tiles
+        """
+        from .export import export_subset
+
+        self._begin_read()
+        try:
+            return export_subset(self, path, layers, pos, shape, levels, layout, bigtiff)
+        finally:
+            self._end_read()
+
+    def convert(self, path,
+                layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+                tile: int = 512, compression: Optional[str] = 'zlib',
+                compressionargs: Optional[Dict] = None, predictor: Optional[bool] = None,
+                levels: Optional[int] = None, downsample: str = 'mean',
+                max_workers: Optional[int] = None, bigtiff: Optional[bool] = None,
+                temp_dir: Optional[str] = None) -> ConvertReport:
+        """
+        Convert to a tiled, pyramidal OME-TIFF, streaming with bounded memory.
+
+        Level 0 is decoded in bands of whole tile rows by a thread pool and
+        every pyramid level is built by 2x2 downsampling of the level above,
+        held until it is written in an uncompressed temporary file (a third
+        of the uncompressed size of level 0 at most). Tiles are compressed
+        in parallel by tifffile. Channel names, fluorophores, wavelengths,
+        exposure times and pixel size are written to the OME-XML.
+
+        The defaults (512x512 Deflate tiles without predictor) are decoded
+        by the fast tile path of MxTiffFile.
+
+        Parameters:
+        -----------
+        path : str
+            Output file
+        layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+            Layers to convert, in output order; None converts all layers
+        tile : int
+            Tile width and height, a multiple of 16 (default: 512)
+        compression, compressionargs, predictor
+            Codec of the output tiles, as accepted by tifffile (default: 'zlib')
+        levels : int or None
+            Number of levels; None halves until the image fits in one tile
+        downsample : str
+            'mean' (2x2 average) or 'nearest' (for label images)
+        max_workers : int or None
+            Decoding and compression threads; None uses max_workers of the file
+        bigtiff : bool or None
+            Write a BigTIFF; None decides from the uncompressed size
+        temp_dir : str or None
+            Directory of the temporary level files (default: system temp)
+
+        Returns:
+        --------
+        ConvertReport
+        """
+        from .convert import convert_to_ome_tiff
+
+        self._begin_read()
+        try:
+            return convert_to_ome_tiff(self, path, layers, tile, compression, compressionargs,
+                                       predictor, levels, downsample, max_workers, bigtiff,
+                                       temp_dir)
+        finally:
+            self._end_read()
+
+    def export_ngff(self, path,
+                    layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+                    chunk: Optional[Tuple[int, int]] = None, levels: Optional[int] = None,
+                    compressor: Optional[str] = 'default', max_workers: Optional[int] = None,
+                    overwrite: bool = False, skip_empty: bool = True) -> NgffReport:
+        """
+        Write the pyramid as an OME-NGFF 0.4 image in a Zarr v2 directory store.
+
+        Every level of series[0].levels becomes one (c, y, x) array. Chunks
+        are read through the tile fast path, compressed and written by a
+        pool of threads, with at most two chunks per thread in flight, so
+        memory use does not grow with the image. Chunks are renamed into
+        place when complete, and the multiscales and omero attributes
+        (channel labels from channel_info, pixel size in micrometers) are
+        written last. The zarr package is not needed.
+
+        Parameters:
+        -----------
+        path : str
+            Directory to create, e.g. 'slide.ome.zarr'
+        layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+            Layers to export, in output order; None exports all layers
+        chunk : Tuple[int, int] or None
+            (height, width) of chunks; None uses the tile size of the file
+            (512x512 for striped files)
+        levels : int or None
+            Number of levels to export; None exports all
+        compressor : str or None
+            'blosc' (LZ4 with byte shuffle), 'zstd', 'zlib' or None;
+            'default' uses blosc when imagecodecs provides it
+        max_workers : int or None
+            Threads reading and writing chunks; None uses max_workers of the file
+        overwrite : bool
+            Replace an existing Zarr group at path (default: False)
+        skip_empty : bool
+            Omit all-zero chunks, which readers fill with zeros (default: True)
+
+        Returns:
+        --------
+        NgffReport
+            Chunk counts and throughput
+        """
+        from .ngff import export_ngff
+
+        self._begin_read()
+        try:
+            return export_ngff(self, path, layers, chunk, levels, compressor, max_workers,
+                               overwrite, skip_empty)
+        finally:
+            self._end_read()
+
+    def verify(self, fast: bool = False, sample: Optional[int] = None,
+               levels: Optional[int] = None, max_workers: Optional[int] = None,
+               seed: Optional[int] = 0) -> VerifyReport:
+        """
+        Check every tile and strip of the file for truncation and corruption.
+
+        The offset and byte count of every segment of every page, in all
+        series and pyramid levels, are checked against the file size, then
+        the segments that lie inside the file are decoded by a pool of
+        threads. Bad segments are reported with their series, level, page
+        and pixel position rather than raised. Pages whose compression
+        tifffile cannot decode are listed as unsupported.
+
+        Parameters:
+        -----------
+        fast : bool
+            Check all offsets but decode only a sample of segments per page,
+            always including the last one written (default: False)
+        sample : int or None
+            Segments decoded per page in fast mode (default: 8)
+        levels : int or None
+            Number of pyramid levels to check per series; None checks all
+        max_workers : int or None
+            Decoding threads; None uses max_workers of the file
+        seed : int or None
+            Seed of the fast-mode sample, so repeated scans check the same tiles
+
+        Returns:
+        --------
+        VerifyReport
+            Problems found, with segment counts and timing
+        """
+        from .verify import verify
+
+        self._begin_read()
+        try:
+            return verify(self, fast, sample, levels, max_workers, seed)
+        finally:
+            self._end_read()
+
+    def stop_trace(self) -> None:
+        """Stop recording started by record_trace and close the trace file."""
+        if self._trace is not None:
+            self._trace.close()
+
+    def tissue_map(self, level: int = 0, layers=None, threshold: Optional[float] = None,
+                   refine_level: Optional[int] = None,
+                   refine_threshold: Optional[float] = None) -> TissueMap:
+        """
+        Return the per-tile tissue/background map of a level.
+
+        The map is built from compressed tile sizes in page.databytecounts,
+        so no pixel data is decoded unless refine_level is given. Results are
+        cached per argument set. See mxtifffile.tissue.build_tissue_map for
+        the parameters.
+
+        Returns:
+        --------
+        TissueMap
+        """
+        from .tissue import build_tissue_map
+
+        selection = self.select(layers, level)
+        key = (level, selection.indices, threshold, refine_level, refine_threshold)
+        tmap = self._tissue_maps.get(key)
+        if tmap is None:
+            tmap = build_tissue_map(self, level, selection, threshold,
+                                    refine_level, refine_threshold)
+            self._tissue_maps[key] = tmap
+        return tmap
+
+    def channel_stats(self, layers=None, level: int = 0, sample=None,
+                      tissue_only: bool = False, seed: int = 0,
+                      value_range: Optional[Tuple[float, float]] = None,
+                      parallel: bool = True, cache: bool = True,
+                      cache_dir: Optional[str] = None) -> List[ChannelStats]:
+        """
+        Return histograms, min/max, mean and std of layers without loading them whole.
+
+        Tiles are streamed in parallel with bounded memory. Use a low level
+        or sample (a fraction or number of tiles) for fast estimates. Results
+        are cached in memory and, when cache_dir is given and the file is on
+        disk, under cache_dir so later sessions reuse them. See
+        mxtifffile.stats.compute_channel_stats for the parameters.
+
+        Returns:
+        --------
+        list of ChannelStats
+            One entry per selected layer; e.g. stats[0].percentile([1, 99])
+        """
+        from .stats import compute_channel_stats
+
+        self._begin_read()
+        try:
+            return compute_channel_stats(self, layers, level, sample, tissue_only, seed,
+                                         value_range, parallel, cache, cache_dir)
+        finally:
+            self._end_read()
+
+    def quantify(self, labels, layers=None, stats: Iterable[str] = ("mean", "sum", "area"),
+                 level: int = 0, parallel: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Compute per-cell statistics of layers from a segmentation label image.
+
+        The label image and the layers are streamed tile by tile and reduced
+        with bincount, so neither the channel stack nor the mask has to be
+        loaded whole. See mxtifffile.quantify.quantify_labels for the
+        parameters.
+
+        Returns:
+        --------
+        dict of numpy.ndarray
+            'label', 'area' and '<stat>_<layer name>' columns, one row per label
+        """
+        from .quantify import quantify_labels
+
+        self._begin_read()
+        try:
+            return quantify_labels(self, labels, layers, stats, level, parallel)
+        finally:
+            self._end_read()
+
+    def iter_tiles(self,
+                   layers: Union[str, Iterable[str], int, Iterable[int], LayerSelection, None] = None,
+                   level: int = 0,
+                   tile_shape: Union[Tuple[int, int], None] = None,
+                   tissue_only: bool = False,
+                   tissue: Optional[TissueMap] = None,
+                   parallel: bool = False):
+        """
+        Iterate over a level in tiles, yielding ((x, y), region) pairs row by row.
+
+        Parameters:
+        -----------
+        layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+            Layers to read, as accepted by read_region
+        level : int
+            Pyramid level (default: 0)
+        tile_shape : Tuple[int, int] or None
+            (width, height) of the tiles. None uses the file's tile (or strip)
+            size, so each tile is decoded once.
+        tissue_only : bool
+            Skip tiles that the tissue map marks as background (default: False)
+        tissue : TissueMap or None
+            Map used with tissue_only; None uses tissue_map(level)
+        parallel : bool
+            Read the layers of each tile in parallel (default: False)
+
+        Yields:
+        -------
+        ((x, y), numpy.ndarray)
+            Tiles at the right and bottom edges are cropped to the image
+        """
+        selection = self.select(layers, level)
+        page = self.series[0].levels[level].pages[0]
+        img_height, img_width = page.shape[:2]
+        if tile_shape is None:
+            key = page.keyframe
+            if key.is_tiled:
+                tile_shape = (key.tilewidth, key.tilelength)
+            else:
+                tile_shape = (img_width, min(key.rowsperstrip or img_height, img_height))
+        tile_width, tile_height = tile_shape
+        if tissue_only and tissue is None:
+            tissue = self.tissue_map(level)
+
+        for y in range(0, img_height, tile_height):
+            height = min(tile_height, img_height - y)
+            for x in range(0, img_width, tile_width):
+                width = min(tile_width, img_width - x)
+                if tissue_only and not tissue.region_has_tissue(x, y, width, height):
+                    continue
+                yield (x, y), self.read_region(selection, pos=(x, y), shape=(width, height),
+                                               level=level, parallel=parallel)
+
+    def _resolve_region(self, layers, pos, shape, level):
+        """
+        Validate read_region arguments and return
+        (level series, LayerSelection, x, y, width, height).
+        """
         # Handle series selection
         if not isinstance(level, int):
             level = int(level)
@@ -376,49 +1578,10 @@ class MxTiffFile(TiffFile):
             raise ValueError(f"Requested region exceeds image dimensions: {img_width}x{img_height}")
 
         # Determine which layers to read
-        layer_indices = []
-
-        if layers is None:
-            # Read all layers
-            layer_indices = list(range(len(series.pages)))
-        else:
-            # Convert to list if single value
-            if isinstance(layers, (str, int)):
-                layers = [layers]
-
-            for layer in layers:
-                if isinstance(layer, int):
-                    if layer < 0 or layer >= len(series.pages):
-                        raise ValueError(f"Layer index {layer} out of range (max: {len(series.pages) - 1})")
-                    layer_indices.append(layer)
-                elif isinstance(layer, str):
-                    # Try to find biomarker by name
-                    if layer in self.biomarkers:
-                        # Find all occurrences (in case of duplicates)
-                        indices = [i for i, bm in enumerate(self.biomarkers) if bm == layer]
-                        layer_indices.extend(indices)
-                    else:
-                        raise ValueError(f"Biomarker '{layer}' not found in this file")
-                else:
-                    raise TypeError(f"Layer identifier must be string or int, got {type(layer)}")
-
-        # Remove duplicates while preserving order
-        layer_indices = list(dict.fromkeys(layer_indices))
-
-        # Read the requested regions for each layer
-        if parallel and len(layer_indices) > 1:
-            # Use parallel reading for multiple layers
-            result_layers = self._read_layers_parallel(series, layer_indices, y, x, height, width, level)
-        else:
-            # Sequential reading
-            result_layers = self._read_layers_sequential(series, layer_indices, y, x, height, width, level)
-
-        # Return result based on number of layers
-        if len(result_layers) == 1:
-            return result_layers[0]
-        else:
-            # Stack layers along a new axis
-            return np.stack(result_layers, axis=2)
+        selection = self.select(layers, level)
+        if selection.n_pages != len(series.pages):
+            selection = self.channel_index.compile(list(selection.indices), len(series.pages))
+        return series, selection, x, y, width, height
 
     def _read_single_layer(self, series, idx: int, y: int, x: int,
                           height: int, width: int, level: int) -> np.ndarray:
@@ -442,7 +1605,7 @@ class MxTiffFile(TiffFile):
             The requested region
         """
         page = series.pages[idx]
-        page_key = f"L{level}_P{idx}"
+        page_key = self._page_key(level, idx)
         return self._get_cached_page_region(page_key, page, y, x, height, width)
 
     def _read_layers_sequential(self, series, layer_indices: List[int],
@@ -464,6 +1627,12 @@ class MxTiffFile(TiffFile):
         def read_layer_wrapper(idx):
             return self._read_single_layer(series, idx, y, x, height, width, level)
 
+        if self._executor is not None:
+            futures = [self._executor.submit(read_layer_wrapper, idx) for idx in layer_indices]
+            return [future.result() for future in futures]
+
+        from concurrent.futures import ThreadPoolExecutor
+
         with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
             # Submit all read tasks
             futures = [executor.submit(read_layer_wrapper, idx) for idx in layer_indices]
@@ -491,7 +1660,7 @@ class MxTiffFile(TiffFile):
         Returns:
         --------
         List[Dict]
-            List of dictionaries with channel information
+            List of dictionaries containing channel information
         """
         return self.channel_info
 
@@ -500,12 +1669,12 @@ class MxTiffFile(TiffFile):
         Print a summary of channel information.
         """
         print(f"QPTIFF File: {os.path.basename(self.file_path)}")
-        print(f"Total Channels: {len(self.channel_info)}")
+        print(f"Total Channels: {len(self._channel_table)}")
         print("-" * 80)
         print(f"{'#':<3} {'Biomarker':<20} {'Fluorophore':<15} {'Description':<30}")
         print("-" * 80)
 
-        for i, channel in enumerate(self.channel_info, 1):
+        for i, channel in enumerate(self._channel_table, 1):
             biomarker = channel.get('biomarker', 'N/A')
             fluorophore = channel.get('fluorophore', 'N/A')
             description = channel.get('description', 'N/A')
@@ -515,3 +1684,48 @@ class MxTiffFile(TiffFile):
 
             print(f"{i:<3} {biomarker:<20} {fluorophore:<15} {description:<30}")
 
+
+def _restore_mxtifffile(cls, state):
+    """Unpickle an MxTiffFile from the descriptor built by MxTiffFile.__reduce__."""
+    self = cls.__new__(cls)
+    self._tiff_state = 'closed'
+    self._tiff_opener = None
+    self.file_path = state['file_path']
+    self._tiff_args = state['tiff_args']
+    self._formats_config = state['formats_config']
+    self._setup(**state['options'])
+
+    if self._cache_token != state['cache_token']:
+        # The file changed since it was pickled: parse it again
+        self._open_tiff()
+        self._detect_and_parse(self._formats_config)
+        return self
+
+    self.format_id = state['format_id']
+    self._set_channel_table(state['channel_info'])
+    self._build_channel_index()
+    return self
+
+
+def _reset_files_after_fork() -> None:
+    for tif in list(_live_files):
+        tif._reset_after_fork()
+
+
+# Open files are tracked so a forked child can reset them; the pid check in
+# _check_fork covers forks that bypass os.register_at_fork
+_live_files = weakref.WeakSet()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_files_after_fork)
+
+
+class QPTiffFile(MxTiffFile):
+    """Deprecated alias for MxTiffFile. Use MxTiffFile instead."""
+
+    def __init__(self, *args, **kwargs):
+        warnings.warn(
+            "QPTiffFile is deprecated, use MxTiffFile",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        super().__init__(*args, **kwargs)
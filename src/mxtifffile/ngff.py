@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .convert import physical_size
+from .parallel import QUEUE_PER_WORKER, bounded_map
+from .render import DEFAULT_COLORS, parse_color
+
+NGFF_VERSION = "0.4"
+# Chunk edge used when the source pages are striped
+_DEFAULT_CHUNK = 512
+
+
+@dataclass
+class NgffReport:
+    """Geometry, chunk counts and throughput of an export_ngff run."""
+
+    path: str
+    channels: List[str]
+    shapes: List[Tuple[int, int]]
+    chunk: Tuple[int, int]
+    compressor: Optional[str]
+    chunks_written: int = 0
+    chunks_empty: int = 0
+    decoded_bytes: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    level_seconds: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Decoded megabytes per second."""
+        return self.decoded_bytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "channels": list(self.channels),
+            "shapes": [list(s) for s in self.shapes],
+            "chunk": list(self.chunk),
+            "compressor": self.compressor,
+            "chunks_written": self.chunks_written,
+            "chunks_empty": self.chunks_empty,
+            "decoded_bytes": self.decoded_bytes,
+            "bytes_written": self.bytes_written,
+            "seconds": self.seconds,
+            "decoded_mb_per_second": self.throughput,
+        }
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        width, height = self.shapes[0]
+        return (f"{self.path}: {len(self.channels)} channels, {width}x{height}, "
+                f"{len(self.shapes)} levels, {self.chunk[1]}x{self.chunk[0]} chunks, "
+                f"{self.compressor or 'uncompressed'}\n"
+                f"chunks       {self.chunks_written} written, {self.chunks_empty} empty (omitted)\n"
+                f"written      {self.bytes_written / 2**20:.1f} MiB in {self.seconds:.3f} s "
+                f"({self.throughput:.1f} MB/s decoded)")
+
+
+def _compressor(name: Optional[str], dtype: np.dtype) -> Tuple[Optional[Dict[str, Any]],
+                                                                Callable[[np.ndarray], bytes]]:
+    """Return the .zarray compressor config and encoder of a numcodecs codec."""
+    if name is None or name == "none":
+        return None, lambda chunk: chunk.tobytes()
+    if name == "zlib":
+        return {"id": "zlib", "level": 1}, lambda chunk: zlib.compress(chunk, 1)
+    import imagecodecs
+
+    if name == "zstd":
+        return {"id": "zstd", "level": 1}, lambda chunk: imagecodecs.zstd_encode(chunk, level=1)
+    if name == "blosc":
+        config = {"id": "blosc", "cname": "lz4", "clevel": 5, "shuffle": 1, "blocksize": 0}
+        return config, lambda chunk: imagecodecs.blosc_encode(
+            chunk, level=5, compressor="lz4", shuffle=1, typesize=dtype.itemsize, numthreads=1)
+    raise ValueError(f"Unknown compressor {name!r}; expected 'blosc', 'zstd', 'zlib' or None")
+
+
+def _default_compressor() -> str:
+    try:
+        import imagecodecs
+    except ImportError:
+        return "zlib"
+    return "blosc" if imagecodecs.BLOSC.available else "zlib"
+
+
+def _write_json(path: str, value: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(value, fh, indent=2)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write a chunk under a temporary name and rename it, so readers never see a partial chunk."""
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _channel_label(tif, idx: int) -> str:
+    row = tif._channel_table[idx] if idx < len(tif._channel_table) else {}
+    return row.get("biomarker") or row.get("display_name") or f"Channel {idx}"
+
+
+def ngff_attrs(tif, indices, shapes: List[Tuple[int, int]], name: str) -> Dict[str, Any]:
+    """NGFF 0.4 multiscales and omero attributes of an exported image."""
+    size = physical_size(tif)
+    space_unit = {"unit": "micrometer"} if size is not None else {}
+    axes = [{"name": "c", "type": "channel"},
+            {"name": "y", "type": "space", **space_unit},
+            {"name": "x", "type": "space", **space_unit}]
+    pixel_x, pixel_y = size if size is not None else (1.0, 1.0)
+    full_height, full_width = shapes[0]
+    datasets = []
+    for level, (height, width) in enumerate(shapes):
+        scale = [1.0, pixel_y * full_height / height, pixel_x * full_width / width]
+        datasets.append({"path": str(level),
+                         "coordinateTransformations": [{"type": "scale", "scale": scale}]})
+
+    dtype = tif.series[0].levels[0].pages[indices[0]].dtype
+    if dtype.kind in "ui":
+        info = np.iinfo(dtype)
+        low, high = float(info.min), float(info.max)
+    else:
+        low, high = 0.0, 1.0
+    channels = []
+    for n, idx in enumerate(indices):
+        label = _channel_label(tif, idx)
+        r, g, b = parse_color(DEFAULT_COLORS[n % len(DEFAULT_COLORS)])
+        channels.append({"label": label, "color": f"{r:02X}{g:02X}{b:02X}", "active": True,
+                         "window": {"min": low, "max": high, "start": low, "end": high}})
+    return {
+        "multiscales": [{"version": NGFF_VERSION, "name": name, "axes": axes,
+                         "datasets": datasets}],
+        "omero": {"name": name, "version": NGFF_VERSION, "channels": channels,
+                  "rdefs": {"model": "color"}},
+    }
+
+
+def export_ngff(tif, path, layers=None, chunk: Optional[Tuple[int, int]] = None,
+                levels: Optional[int] = None, compressor: Optional[str] = "default",
+                max_workers: Optional[int] = None, overwrite: bool = False,
+                skip_empty: bool = True) -> NgffReport:
+    """Write *tif* as an OME-NGFF (Zarr v2) image; see MxTiffFile.export_ngff."""
+    start = time.perf_counter()
+    path = os.fspath(path)
+    if levels is not None and levels < 1:
+        raise ValueError(f"levels must be at least 1, got {levels}")
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(f"{path} exists; pass overwrite=True to replace it")
+        if not os.path.exists(os.path.join(path, ".zgroup")):
+            raise ValueError(f"Refusing to overwrite {path}: not a Zarr group")
+        shutil.rmtree(path)
+
+    selection = tif.select(layers, 0)
+    indices = list(selection.indices)
+    if not indices:
+        raise ValueError("No layers selected for export")
+    pyramid = tif.series[0].levels
+    pyramid = pyramid[:len(pyramid) if levels is None else levels]
+    page = pyramid[0].pages[indices[0]]
+    if len(page.shape) != 2:
+        raise ValueError(f"Only single-sample pages can be exported, got shape {page.shape}")
+    dtype = page.dtype
+    if chunk is None:
+        key = page.keyframe
+        # Chunks matching the source tiles are each decoded from one tile
+        chunk = (key.tilelength, key.tilewidth) if key.is_tiled else (_DEFAULT_CHUNK, _DEFAULT_CHUNK)
+    if compressor == "default":
+        compressor = _default_compressor()
+    config, encode = _compressor(compressor, dtype)
+
+    shapes = [tuple(level.pages[0].shape[:2]) for level in pyramid]
+    names = [_channel_label(tif, i) for i in indices]
+    report = NgffReport(path, names, [(w, h) for h, w in shapes], tuple(chunk), compressor)
+    name = os.path.splitext(os.path.basename(str(tif.file_path)))[0]
+
+    os.makedirs(path)
+    _write_json(os.path.join(path, ".zgroup"), {"zarr_format": 2})
+    chunk_h, chunk_w = chunk
+    lock = threading.Lock()
+
+    def write_chunk(level: int, c: int, row: int, col: int) -> None:
+        series = pyramid[level]
+        height, width = shapes[level]
+        y, x = row * chunk_h, col * chunk_w
+        h, w = min(chunk_h, height - y), min(chunk_w, width - x)
+        region = tif._read_page_region_optimized(series.pages[indices[c]], y, x, h, w)
+        written = 0
+        if not skip_empty or region.any():
+            if (h, w) != (chunk_h, chunk_w):
+                # Zarr v2 chunks are always whole; edges are padded with fill_value
+                padded = np.zeros((1, chunk_h, chunk_w), dtype=dtype)
+                padded[0, :h, :w] = region
+                region = padded
+            data = encode(np.ascontiguousarray(region, dtype=dtype))
+            _write_atomic(os.path.join(path, str(level), str(c), str(row), str(col)), data)
+            written = len(data)
+        with lock:
+            report.decoded_bytes += h * w * dtype.itemsize
+            if written:
+                report.chunks_written += 1
+                report.bytes_written += written
+            else:
+                report.chunks_empty += 1
+
+    workers = max(1, max_workers or tif._max_workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for level, (height, width) in enumerate(shapes):
+            level_start = time.perf_counter()
+            array_dir = os.path.join(path, str(level))
+            rows, cols = -(-height // chunk_h), -(-width // chunk_w)
+            os.makedirs(array_dir)
+            _write_json(os.path.join(array_dir, ".zarray"), {
+                "zarr_format": 2, "shape": [len(indices), height, width],
+                "chunks": [1, chunk_h, chunk_w], "dtype": dtype.str, "compressor": config,
+                "fill_value": 0, "order": "C", "filters": None, "dimension_separator": "/"})
+            for c in range(len(indices)):
+                for row in range(rows):
+                    os.makedirs(os.path.join(array_dir, str(c), str(row)))
+
+            chunks = ((level, c, row, col) for c in range(len(indices))
+                      for row in range(rows) for col in range(cols))
+            for _ in bounded_map(pool, lambda task: write_chunk(*task), chunks,
+                                 workers * QUEUE_PER_WORKER):
+                pass
+            report.level_seconds.append(time.perf_counter() - level_start)
+
+    _write_json(os.path.join(path, ".zattrs"), ngff_attrs(tif, indices, shapes, name))
+    report.seconds = time.perf_counter() - start
+    return report
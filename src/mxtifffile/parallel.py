@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Tasks queued per worker thread by the streaming writers; bounds the
+# decoded tiles, chunks or bands held in memory
+QUEUE_PER_WORKER = 2
+
+
+def bounded_map(pool, func: Callable[[T], R], items: Iterable[T], ahead: int) -> Iterator[R]:
+    """
+    Yield func(item) for each item in order, computed in *pool*.
+
+    At most *ahead* tasks are submitted but not yet consumed, so items are
+    drawn lazily and results do not pile up when the consumer is slower
+    than the pool. Exceptions are raised when their result is reached.
+    """
+    ahead = max(1, ahead)
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -4,6 +4,7 @@ import re
 import xml.etree.ElementTree as ET
 from typing import Any, Dict, List, Optional
 
+from .channel_table import CHANNEL_FIELDS
 from .format_config import FormatConfig
 
 _OME_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
@@ -16,16 +17,10 @@ def _strip_xml_comments(text: str) -> str:
 
 
 def _empty_channel(index: int, raw_xml: Optional[str] = None) -> Dict[str, Any]:
-    return {
-        "index": index,
-        "biomarker": None,
-        "fluorophore": None,
-        "display_name": None,
-        "description": None,
-        "exposure": None,
-        "wavelength": None,
-        "raw_xml": raw_xml,
-    }
+    ch: Dict[str, Any] = dict.fromkeys(CHANNEL_FIELDS)
+    ch["index"] = index
+    ch["raw_xml"] = raw_xml
+    return ch
 
 
 class PerPageParser:
@@ -166,3 +161,18 @@ class ImageJParser:
         if isinstance(value, (list, tuple)):
             return [str(v).strip() for v in value if str(v).strip()]
         return []
+
+
+_PARSERS = {
+    "per_page": PerPageParser,
+    "file_level": FileLevelParser,
+    "imagej": ImageJParser,
+}
+
+
+def parse_channels(config: FormatConfig, tif) -> List[Dict[str, Any]]:
+    """Run the parser matching *config*.metadata_scope; unknown scopes yield no channels."""
+    parser_cls = _PARSERS.get(config.metadata_scope)
+    if parser_cls is None:
+        return []
+    return parser_cls(config, tif).parse()
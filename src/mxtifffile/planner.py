@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough single-thread decode throughput in MB/s of decoded output, keyed by
+# TIFF compression value. Used only for estimates; adjust for your hardware.
+DECODE_THROUGHPUT: Dict[int, float] = {
+    1: 4000.0,       # none (memory copy)
+    5: 250.0,        # LZW
+    7: 150.0,        # JPEG
+    8: 500.0,        # Adobe Deflate
+    32773: 1000.0,   # PackBits
+    32946: 500.0,    # Deflate
+    33003: 40.0,     # JPEG 2000 (Aperio)
+    33005: 40.0,     # JPEG 2000 (Aperio)
+    34712: 40.0,     # JPEG 2000
+    34933: 200.0,    # PNG
+    22610: 80.0,     # JPEG XR
+    50000: 1200.0,   # Zstandard
+    50001: 100.0,    # WebP
+    50002: 60.0,     # JPEG XL
+}
+_DEFAULT_THROUGHPUT = 150.0
+# Undoing a horizontal or floating-point predictor costs an extra pass
+_PREDICTOR_FACTOR = 1.15
+
+
+@dataclass
+class LayerPlan:
+    """Work needed to read one layer of a region."""
+
+    index: int
+    name: Optional[str]
+    path: str
+    compression: str
+    segments: int
+    cached_segments: int
+    compressed_bytes: int
+    decoded_bytes: int
+    est_decode_seconds: float
+
+
+@dataclass
+class ReadPlan:
+    """
+    Inspectable description of a read_region call, built by MxTiffFile.plan_read.
+
+    ``est_decode_seconds`` is single-thread CPU time for the segments that are
+    not cached; a parallel read spreads it across threads.
+    """
+
+    level: int
+    pos: Tuple[int, int]
+    shape: Tuple[int, int]
+    dtype: Any
+    layers: List[LayerPlan]
+    _tif: Any = field(default=None, repr=False, compare=False)
+    _selection: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def segments(self) -> int:
+        return sum(layer.segments for layer in self.layers)
+
+    @property
+    def cached_segments(self) -> int:
+        return sum(layer.cached_segments for layer in self.layers)
+
+    @property
+    def compressed_bytes(self) -> int:
+        return sum(layer.compressed_bytes for layer in self.layers)
+
+    @property
+    def decoded_bytes(self) -> int:
+        return sum(layer.decoded_bytes for layer in self.layers)
+
+    @property
+    def est_decode_seconds(self) -> float:
+        return sum(layer.est_decode_seconds for layer in self.layers)
+
+    @property
+    def output_bytes(self) -> int:
+        width, height = self.shape
+        return width * height * len(self.layers) * self.dtype.itemsize
+
+    @property
+    def full_page_fallback(self) -> bool:
+        """True if any layer will be read by decoding its whole page."""
+        return any(layer.path == "full_page" for layer in self.layers)
+
+    def execute(self, parallel: bool = False):
+        """Perform the planned read; equivalent to the read_region call it describes."""
+        if self._tif is None:
+            raise ValueError("This plan is not attached to an open file")
+        return self._tif.read_region(self._selection, pos=self.pos, shape=self.shape,
+                                     level=self.level, parallel=parallel)
+
+    def explain(self) -> str:
+        """Return a table of the per-layer read paths and costs."""
+        width, height = self.shape
+        lines = [
+            f"read level {self.level} pos {self.pos} shape {width}x{height}: "
+            f"{len(self.layers)} layer(s) of {self.dtype}, output {_format_bytes(self.output_bytes)}",
+            f"  {'page':>4}  {'name':<16} {'path':<10} {'codec':<14} {'segments':>8} "
+            f"{'cached':>6} {'compressed':>11} {'decoded':>11} {'est. decode':>11}",
+        ]
+        for layer in self.layers:
+            lines.append(
+                f"  {layer.index:>4}  {str(layer.name or '-'):<16.16} {layer.path:<10} "
+                f"{layer.compression:<14.14} {layer.segments:>8} {layer.cached_segments:>6} "
+                f"{_format_bytes(layer.compressed_bytes):>11} {_format_bytes(layer.decoded_bytes):>11} "
+                f"{layer.est_decode_seconds * 1e3:>8.2f} ms")
+        lines.append(
+            f"  {'':>4}  {'total':<16} {'':<10} {'':<14} {self.segments:>8} {self.cached_segments:>6} "
+            f"{_format_bytes(self.compressed_bytes):>11} {_format_bytes(self.decoded_bytes):>11} "
+            f"{self.est_decode_seconds * 1e3:>8.2f} ms")
+        if self.full_page_fallback:
+            lines.append("  note: full_page layers decode the entire page")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.explain()
+
+
+def _format_bytes(nbytes: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if nbytes < 1024:
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f} GiB"
+
+
+def _segment_bytes(page, index: int) -> int:
+    """Decoded size of tile or strip *index* of a page."""
+    key = page.keyframe
+    itemsize = page.dtype.itemsize
+    if key.is_tiled:
+        return key.tilelength * key.tilewidth * itemsize
+    height, width = page.shape[:2]
+    rows = min(key.rowsperstrip or height, height)
+    return min(rows, height - index * rows) * width * itemsize
+
+
+def plan_layer(tif, page, level: int, idx: int, name: Optional[str],
+               y: int, x: int, height: int, width: int) -> LayerPlan:
+    """Plan the read of one page region along the path tif._get_cached_page_region takes."""
+    key = page.keyframe
+    path = tif._read_path(page)
+    n_offsets = len(page.dataoffsets)
+    if path == "full_page":
+        indices = list(range(n_offsets))
+    else:
+        indices = [i for i in tif._segment_indices(page, y, x, height, width) if i < n_offsets]
+
+    cache = tif._page_cache
+    page_key = tif._page_key(level, idx)
+    if cache is None or path == "mmap":
+        cached = [False] * len(indices)
+    elif path == "tile_cache":
+        cached = [tif._tile_cache_key(page_key, i) in cache for i in indices]
+    else:
+        hit = tif._region_cache_key(page_key, y, x, height, width) in cache
+        cached = [hit] * len(indices)
+
+    compression = key.compression.value
+    throughput = DECODE_THROUGHPUT.get(compression, _DEFAULT_THROUGHPUT) * 1e6
+    if path != "mmap" and key.predictor != 1:
+        throughput /= _PREDICTOR_FACTOR
+
+    decoded_bytes = 0
+    pending_bytes = 0
+    for i, is_cached in zip(indices, cached):
+        nbytes = _segment_bytes(page, i)
+        decoded_bytes += nbytes
+        if not is_cached:
+            pending_bytes += nbytes
+
+    return LayerPlan(
+        index=idx,
+        name=name,
+        path=path,
+        compression=key.compression.name,
+        segments=len(indices),
+        cached_segments=sum(cached),
+        compressed_bytes=int(sum(int(page.databytecounts[i]) for i in indices)),
+        decoded_bytes=decoded_bytes,
+        est_decode_seconds=pending_bytes / throughput,
+    )
+
+
+def build_plan(tif, series, selection, level: int, x: int, y: int,
+               width: int, height: int) -> ReadPlan:
+    """Build the ReadPlan for an already validated region; see MxTiffFile.plan_read."""
+    layers = [plan_layer(tif, series.pages[idx], level, idx, name, y, x, height, width)
+              for idx, name in zip(selection.indices, selection.names)]
+    return ReadPlan(level=level, pos=(x, y), shape=(width, height),
+                    dtype=series.pages[0].dtype, layers=layers,
+                    _tif=tif, _selection=selection)
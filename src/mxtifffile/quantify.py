@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .stats import _map_partitions, _tile_positions
+
+SUPPORTED_STATS = ("area", "sum", "mean", "std", "min", "max")
+
+
+class _LabelAccumulator:
+    """
+    Per-label sums in compact slots, one per distinct label seen, so memory
+    follows the number of labels rather than their largest value.
+    """
+
+    def __init__(self, n_layers: int, stats: Sequence[str]) -> None:
+        self.n_layers = n_layers
+        self.need_sum = bool({"sum", "mean", "std"} & set(stats))
+        self.need_sumsq = "std" in stats
+        self.need_min = "min" in stats
+        self.need_max = "max" in stats
+        self._slots: Dict[int, int] = {}  # label -> row of the arrays below
+        self.labels = np.zeros(0, dtype=np.int64)
+        self.area = np.zeros(0, dtype=np.int64)
+        self.sum = np.zeros((0, n_layers))
+        self.sumsq = np.zeros((0, n_layers))
+        self.min = np.zeros((0, n_layers))
+        self.max = np.zeros((0, n_layers))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _reserve(self, count: int) -> None:
+        size = self.area.size
+        if count <= size:
+            return
+        new_size = max(count, 2 * size)
+
+        def grown(array, fill):
+            out = np.full((new_size,) + array.shape[1:], fill, dtype=array.dtype)
+            out[:size] = array
+            return out
+
+        self.labels = grown(self.labels, 0)
+        self.area = grown(self.area, 0)
+        if self.need_sum:
+            self.sum = grown(self.sum, 0.0)
+        if self.need_sumsq:
+            self.sumsq = grown(self.sumsq, 0.0)
+        if self.need_min:
+            self.min = grown(self.min, np.inf)
+        if self.need_max:
+            self.max = grown(self.max, -np.inf)
+
+    def _slots_for(self, ids: np.ndarray) -> np.ndarray:
+        """Rows of distinct labels *ids*, assigning new rows to labels not seen before."""
+        slots = np.empty(ids.size, dtype=np.intp)
+        known = len(self._slots)
+        for k, label in enumerate(ids.tolist()):
+            slot = self._slots.get(label)
+            if slot is None:
+                slot = self._slots[label] = len(self._slots)
+            slots[k] = slot
+        if len(self._slots) > known:
+            self._reserve(len(self._slots))
+            new = slots >= known
+            self.labels[slots[new]] = ids[new]
+        return slots
+
+    def add_tile(self, labels: np.ndarray, read_layer) -> None:
+        """Accumulate one tile; read_layer(i) returns layer i of the same tile."""
+        flat = labels.ravel()
+        foreground = flat > 0
+        if not foreground.any():
+            return
+        ids, inverse = np.unique(flat[foreground], return_inverse=True)
+        counts = np.bincount(inverse, minlength=ids.size)
+        ids = self._slots_for(ids)
+        self.area[ids] += counts
+
+        if self.need_min or self.need_max:
+            order = np.argsort(inverse, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        for i in range(self.n_layers):
+            values = read_layer(i).ravel()[foreground].astype(np.float64)
+            if self.need_sum:
+                self.sum[ids, i] += np.bincount(inverse, weights=values, minlength=ids.size)
+            if self.need_sumsq:
+                self.sumsq[ids, i] += np.bincount(inverse, weights=values * values,
+                                                  minlength=ids.size)
+            if self.need_min or self.need_max:
+                ordered = values[order]
+                if self.need_min:
+                    self.min[ids, i] = np.minimum(self.min[ids, i],
+                                                  np.minimum.reduceat(ordered, starts))
+                if self.need_max:
+                    self.max[ids, i] = np.maximum(self.max[ids, i],
+                                                  np.maximum.reduceat(ordered, starts))
+
+    def merge(self, other: "_LabelAccumulator") -> "_LabelAccumulator":
+        n = len(other)
+        slots = self._slots_for(other.labels[:n])
+        self.area[slots] += other.area[:n]
+        if self.need_sum:
+            self.sum[slots] += other.sum[:n]
+        if self.need_sumsq:
+            self.sumsq[slots] += other.sumsq[:n]
+        if self.need_min:
+            self.min[slots] = np.minimum(self.min[slots], other.min[:n])
+        if self.need_max:
+            self.max[slots] = np.maximum(self.max[slots], other.max[:n])
+        return self
+
+
+def quantify_labels(tif, labels, layers=None, stats: Iterable[str] = ("mean", "sum", "area"),
+                    level: int = 0, parallel: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Compute per-label intensity statistics of layers under a label image.
+
+    The label image and all layers are streamed tile by tile on the file's
+    tile grid; tiles without labels are not read. Per-label sums are
+    accumulated with bincount reductions over compact per-label rows by one
+    accumulator per worker thread, so memory grows with the number of
+    labels, not the slide size or the largest label value.
+
+    Parameters:
+    -----------
+    tif : MxTiffFile
+        Open file
+    labels : array-like
+        2-D integer label image with the shape of the level; 0 is background.
+        Anything supporting 2-D slicing works, e.g. a numpy memmap or
+        tifffile.memmap, so the mask itself need not fit in memory.
+    layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+        Layers to quantify; None quantifies all layers
+    stats : Iterable[str]
+        Any of 'area', 'sum', 'mean', 'std', 'min', 'max'
+    level : int
+        Pyramid level the label image belongs to (default: 0)
+    parallel : bool
+        Process tiles in a thread pool (default: True)
+
+    Returns:
+    --------
+    dict of numpy.ndarray
+        Columns keyed 'label', 'area' and '<stat>_<layer name>', one row per
+        label present, in the layout of skimage's regionprops_table, so
+        ``pandas.DataFrame(result)`` gives one row per cell. Layers sharing a
+        name are keyed '<stat>_<layer name>_<page index>'.
+    """
+    stats = tuple(stats)
+    unknown = [s for s in stats if s not in SUPPORTED_STATS]
+    if unknown:
+        raise ValueError(f"Unsupported statistics {unknown}; choose from {SUPPORTED_STATS}")
+
+    series = tif.series[0].levels[level]
+    selection = tif.select(layers, level)
+    if selection.n_pages != len(series.pages):
+        selection = tif.channel_index.compile(list(selection.indices), len(series.pages))
+    pages = [series.pages[idx] for idx in selection.indices]
+    if tuple(labels.shape) != tuple(pages[0].shape[:2]):
+        raise ValueError(f"Label image shape {tuple(labels.shape)} does not match "
+                         f"level {level} shape {tuple(pages[0].shape[:2])}")
+
+    def accumulate(chunk):
+        acc = _LabelAccumulator(len(pages), stats)
+        for x, y, width, height in chunk:
+            tile_labels = np.asarray(labels[y:y + height, x:x + width])
+            acc.add_tile(tile_labels, lambda i: tif._read_page_region_optimized(
+                pages[i], y, x, height, width))
+        return acc
+
+    positions = _tile_positions(pages[0], None, 0)
+    total = _LabelAccumulator(len(pages), stats)
+    for partial in _map_partitions(tif, accumulate, positions, parallel):
+        total.merge(partial)
+
+    # Rows are in order of first appearance; report them by label value
+    present = np.argsort(total.labels[:len(total)], kind="stable")
+    area = total.area[present]
+    result: Dict[str, np.ndarray] = {"label": total.labels[present]}
+    if "area" in stats:
+        result["area"] = area
+    names: List[str] = [name if name else str(idx)
+                        for idx, name in zip(selection.indices, selection.names)]
+    # Layers sharing a name are told apart by page index
+    names = [f"{name}_{idx}" if names.count(name) > 1 else name
+             for idx, name in zip(selection.indices, names)]
+    for stat in stats:
+        if stat == "area":
+            continue
+        if stat == "sum":
+            values = total.sum[present]
+        elif stat == "mean":
+            values = total.sum[present] / area[:, None]
+        elif stat == "std":
+            mean = total.sum[present] / area[:, None]
+            values = np.sqrt(np.maximum(total.sumsq[present] / area[:, None] - mean * mean, 0.0))
+        elif stat == "min":
+            values = total.min[present]
+        else:
+            values = total.max[present]
+        for i, name in enumerate(names):
+            result[f"{stat}_{name}"] = values[:, i]
+    return result
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ColorSpec = Union[str, Sequence[float]]
+
+NAMED_COLORS = {
+    "red": (255, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+    "yellow": (255, 255, 0),
+    "orange": (255, 128, 0),
+    "white": (255, 255, 255),
+    "gray": (255, 255, 255),
+    "grey": (255, 255, 255),
+}
+# Colors used, in order, when render() is called without colors
+DEFAULT_COLORS = ("blue", "green", "red", "cyan", "magenta", "yellow", "orange", "white")
+# Percentiles of the channel histogram used as default display limits
+DEFAULT_PERCENTILES = (0.5, 99.5)
+# Display levels for data without a lookup table per value (floats, 32-bit ints)
+_QUANTIZED_LEVELS = 4096
+
+
+def parse_color(color: ColorSpec) -> Tuple[int, int, int]:
+    """Return an (r, g, b) tuple of 0-255 ints for a color name, '#rrggbb' or RGB sequence."""
+    if isinstance(color, str):
+        name = color.lower()
+        if name in NAMED_COLORS:
+            return NAMED_COLORS[name]
+        if name.startswith("#") and len(name) == 7:
+            return tuple(int(name[i:i + 2], 16) for i in (1, 3, 5))
+        raise ValueError(f"Unknown color {color!r}")
+    rgb = tuple(color)
+    if len(rgb) != 3:
+        raise ValueError(f"Color must have 3 components, got {color!r}")
+    if all(isinstance(c, float) for c in rgb) and max(rgb) <= 1.0:
+        rgb = tuple(c * 255 for c in rgb)
+    return tuple(int(round(min(max(c, 0), 255))) for c in rgb)
+
+
+def _window(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    if high > low:
+        return np.clip((values - low) / (high - low), 0.0, 1.0)
+    return (values >= high).astype(np.float64)
+
+
+@lru_cache(maxsize=128)
+def _value_lut(dtype_str: str, low: float, high: float, color: Tuple[int, int, int],
+               acc_str: str) -> np.ndarray:
+    """Lookup table from every raw value of an 8/16-bit integer dtype to its RGB contribution."""
+    dtype = np.dtype(dtype_str)
+    values = np.arange(2 ** (8 * dtype.itemsize), dtype=f"u{dtype.itemsize}").view(dtype)
+    scale = _window(values.astype(np.float64), low, high)
+    lut = np.rint(scale[:, None] * np.asarray(color, dtype=np.float64)).astype(acc_str)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=128)
+def _quantized_lut(color: Tuple[int, int, int], acc_str: str) -> np.ndarray:
+    """Lookup table from a display level in [0, _QUANTIZED_LEVELS) to its RGB contribution."""
+    scale = np.arange(_QUANTIZED_LEVELS, dtype=np.float64) / (_QUANTIZED_LEVELS - 1)
+    lut = np.rint(scale[:, None] * np.asarray(color, dtype=np.float64)).astype(acc_str)
+    lut.flags.writeable = False
+    return lut
+
+
+def _lut_and_index(data: np.ndarray, low: float, high: float, color, acc_dtype):
+    """Return (lut, index array) so that lut[index] is the channel's RGB contribution."""
+    dtype = data.dtype
+    if dtype.kind in "ui" and dtype.itemsize <= 2:
+        # Signed values are looked up through their unsigned bit pattern
+        return (_value_lut(dtype.str, float(low), float(high), color, acc_dtype.str),
+                data.view(f"u{dtype.itemsize}"))
+
+    scaled = data.astype(np.float32)
+    if high > low:
+        scaled -= low
+        scaled *= (_QUANTIZED_LEVELS - 1) / (high - low)
+    else:
+        scaled = np.where(scaled >= high, _QUANTIZED_LEVELS - 1, 0).astype(np.float32)
+    np.nan_to_num(scaled, copy=False, nan=0.0)
+    np.clip(scaled, 0, _QUANTIZED_LEVELS - 1, out=scaled)
+    index = np.rint(scaled, out=scaled).astype(np.uint16)
+    return _quantized_lut(color, acc_dtype.str), index
+
+
+def default_limits(tif, selection, percentiles: Tuple[float, float] = DEFAULT_PERCENTILES):
+    """
+    Display limits from channel_stats of the lowest pyramid level, which are
+    cached per file, so only the first render of a file computes them.
+    """
+    level = len(tif.series[0].levels) - 1
+    stats = tif.channel_stats(selection, level=level)
+    return [tuple(float(v) for v in st.percentile(list(percentiles))) for st in stats]
+
+
+def render_composite(tif, layers=None, colors: Optional[Sequence[ColorSpec]] = None,
+                     limits: Optional[Sequence[Optional[Tuple[float, float]]]] = None,
+                     pos: Optional[Tuple[int, int]] = None,
+                     shape: Optional[Tuple[int, int]] = None,
+                     level: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Render layers as an additively blended, pseudocolored uint8 RGB image.
+
+    Each decoded layer is mapped through a cached lookup table that combines
+    windowing to its limits with its color, and added into one integer
+    accumulator, which is saturated into the output. No float image is
+    created for 8/16-bit data, and the channel stack is never materialized.
+
+    Parameters:
+    -----------
+    tif : MxTiffFile
+        Open file
+    layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+        Layers to render, as accepted by read_region
+    colors : sequence or None
+        One color per layer: a name ('red', 'cyan', ...), '#rrggbb', or an
+        RGB sequence of 0-255 ints or 0-1 floats. None uses DEFAULT_COLORS.
+    limits : sequence or None
+        One (low, high) display range per layer; None, or None entries, use
+        the DEFAULT_PERCENTILES of the layer's cached channel statistics
+    pos, shape, level :
+        Region, as for read_region
+    out : numpy.ndarray or None
+        Optional (height, width, 3) uint8 array to render into
+
+    Returns:
+    --------
+    numpy.ndarray
+        (height, width, 3) uint8 RGB image
+    """
+    series, selection, x, y, width, height = tif._resolve_region(layers, pos, shape, level)
+    n = len(selection)
+    if not n:
+        raise ValueError("No layers selected for rendering")
+
+    if colors is None:
+        colors = [DEFAULT_COLORS[i % len(DEFAULT_COLORS)] for i in range(n)]
+    elif isinstance(colors, str):
+        colors = [colors]
+    if len(colors) != n:
+        raise ValueError(f"Got {len(colors)} colors for {n} layers")
+    rgb = [parse_color(c) for c in colors]
+
+    if limits is None:
+        limits = [None] * n
+    elif len(limits) == 2 and n == 1 and not isinstance(limits[0], (tuple, list, type(None))):
+        limits = [limits]
+    if len(limits) != n:
+        raise ValueError(f"Got {len(limits)} limits for {n} layers")
+    if any(lim is None for lim in limits):
+        defaults = default_limits(tif, selection)
+        limits = [lim if lim is not None else default for lim, default in zip(limits, defaults)]
+
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    elif out.shape != (height, width, 3) or out.dtype != np.uint8:
+        raise ValueError(f"out must be a ({height}, {width}, 3) uint8 array")
+
+    # 255 * 257 still fits in uint16
+    acc_dtype = np.dtype(np.uint16 if n <= 257 else np.uint32)
+    acc = np.empty((height, width, 3), dtype=acc_dtype)
+    contribution = np.empty_like(acc) if n > 1 else None
+    for i, idx in enumerate(selection.indices):
+        data = tif._read_single_layer(series, idx, y, x, height, width, level)
+        low, high = limits[i]
+        lut, index = _lut_and_index(data, low, high, rgb[i], acc_dtype)
+        if i == 0:
+            np.take(lut, index, axis=0, out=acc)
+        else:
+            np.take(lut, index, axis=0, out=contribution)
+            acc += contribution
+
+    if n > 1:
+        np.minimum(acc, 255, out=acc)
+    np.copyto(out, acc, casting="unsafe")
+    return out
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .tissue import TissueMap, _segment_grid
+
+# Candidate positions drawn per wanted patch when rejecting background patches
+_TISSUE_ATTEMPTS = 4
+
+
+@dataclass
+class _FileLayout:
+    """Tile grid and sampling candidates of one file, built once per process."""
+
+    series: object
+    selection: object
+    dtype: np.dtype
+    image_shape: Tuple[int, int]
+    tile_shape: Tuple[int, int]
+    window_shape: Tuple[int, int]
+    grid: Tuple[int, int]
+    candidates: np.ndarray
+    tissue: Optional[TissueMap]
+
+
+class PatchSampler:
+    """
+    Iterable of batches of random fixed-size patches, for training models.
+
+    Patches are drawn in groups: a window of whole file tiles, large enough
+    to hold a patch at any offset, is decoded once, and patches_per_window
+    patch positions are drawn inside it. A patch straddling tile boundaries
+    therefore costs no extra decoding, and each decoded tile serves many
+    patches. With the tile cache enabled the window's tiles are decoded into
+    the cache and patches are copied from them directly.
+
+    Windows are placed at random, in proportion to the candidate area of
+    each file, and the patches of all windows in a batch are shuffled
+    together.
+
+    The sampler pickles to its settings and reopens files by path, so it can
+    be handed to worker processes; when iterated inside a PyTorch DataLoader
+    worker, each worker draws its own share of the batches with its own
+    random stream.
+
+    Parameters:
+    -----------
+    files : path, MxTiffFile, or sequence of them
+        Files to sample from. Paths are opened lazily in each process.
+    layers : str, Iterable[str], int, Iterable[int], or None
+        Layers of each patch, as accepted by read_region; None reads all
+    patch_size : int or Tuple[int, int]
+        Patch (width, height), or one edge length for square patches
+    batch_size : int
+        Patches per batch (default: 32)
+    level : int
+        Pyramid level to sample from (default: 0)
+    tissue_only : bool
+        Place windows on tissue tiles of tissue_map(level) and reject patches
+        that do not overlap tissue (default: False)
+    patches_per_window : int
+        Patches drawn from each decoded window (default: 8). Higher values
+        decode less per patch; lower values give more varied batches.
+    num_batches : int or None
+        Batches per iteration, split between workers; None iterates forever
+    seed : int or None
+        Base seed; iterations differ by set_epoch() and worker id
+    threads : int or None
+        Threads decoding the windows of a batch; None uses min(4, CPUs)
+    open_kwargs : dict or None
+        Keyword arguments for MxTiffFile when opening paths
+    """
+
+    def __init__(self, files, layers=None, patch_size: Union[int, Tuple[int, int]] = 256,
+                 batch_size: int = 32, level: int = 0, tissue_only: bool = False,
+                 patches_per_window: int = 8, num_batches: Optional[int] = None,
+                 seed: Optional[int] = None, threads: Optional[int] = None,
+                 open_kwargs: Optional[dict] = None) -> None:
+        from .mxtifffile import MxTiffFile
+
+        if isinstance(files, (str, os.PathLike, MxTiffFile)):
+            files = [files]
+        self.files = list(files)
+        if not self.files:
+            raise ValueError("PatchSampler needs at least one file")
+        if isinstance(patch_size, int):
+            patch_size = (patch_size, patch_size)
+        self.patch_size = tuple(int(v) for v in patch_size)
+        if min(self.patch_size) <= 0 or batch_size <= 0 or patches_per_window <= 0:
+            raise ValueError("patch_size, batch_size and patches_per_window must be positive")
+        self.layers = layers
+        self.batch_size = batch_size
+        self.level = level
+        self.tissue_only = tissue_only
+        self.patches_per_window = patches_per_window
+        self.num_batches = num_batches
+        self.seed = seed
+        self.threads = threads if threads is not None else min(4, os.cpu_count() or 1)
+        self.open_kwargs = dict(open_kwargs or {})
+        self.epoch = 0
+        self._opened: Dict[int, object] = {}
+        self._layouts: Dict[int, _FileLayout] = {}
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Files opened from paths are reopened by each process
+        state["_opened"] = {}
+        state["_layouts"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        if self.num_batches is None:
+            raise TypeError("PatchSampler without num_batches has no length")
+        return self.num_batches
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        return self.iter_batches()
+
+    def __enter__(self) -> "PatchSampler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def set_epoch(self, epoch: int) -> None:
+        """Change the random stream of later iterations when a seed is set."""
+        self.epoch = epoch
+
+    def close(self) -> None:
+        """Close the files this sampler opened from paths."""
+        for tif in self._opened.values():
+            tif.close()
+        self._opened = {}
+        self._layouts = {}
+
+    def _file(self, index: int):
+        from .mxtifffile import MxTiffFile
+
+        if self._pid != os.getpid():
+            # Inherited through fork: descriptors belong to the parent's objects
+            self._opened = {}
+            self._layouts = {}
+            self._pid = os.getpid()
+        source = self.files[index]
+        if isinstance(source, MxTiffFile):
+            return source
+        tif = self._opened.get(index)
+        if tif is None:
+            tif = self._opened[index] = MxTiffFile(source, **self.open_kwargs)
+        return tif
+
+    def _layout(self, index: int) -> _FileLayout:
+        layout = self._layouts.get(index)
+        if layout is not None:
+            return layout
+        tif = self._file(index)
+        series, selection, _, _, _, _ = tif._resolve_region(self.layers, None, None, self.level)
+        page = series.pages[selection.indices[0]]
+        img_height, img_width = page.shape[:2]
+        patch_width, patch_height = self.patch_size
+        if patch_width > img_width or patch_height > img_height:
+            raise ValueError(f"Patch size {self.patch_size} exceeds level {self.level} "
+                             f"of {self.files[index]} ({img_width}, {img_height})")
+        (tile_height, tile_width), (rows, cols) = _segment_grid(page)
+        # One tile more than the patch, so a patch fits at every offset
+        window_shape = (min((math.ceil(patch_height / tile_height) + 1) * tile_height, img_height),
+                        min((math.ceil(patch_width / tile_width) + 1) * tile_width, img_width))
+
+        tissue = None
+        if self.tissue_only:
+            tissue = tif.tissue_map(self.level)
+            candidates = np.flatnonzero(tissue.mask)
+        else:
+            candidates = np.arange(rows * cols)
+        layout = _FileLayout(series=series, selection=selection, dtype=page.dtype,
+                             image_shape=(img_height, img_width),
+                             tile_shape=(tile_height, tile_width), window_shape=window_shape,
+                             grid=(rows, cols), candidates=candidates, tissue=tissue)
+        self._layouts[index] = layout
+        return layout
+
+    def _rng(self, worker_id: int) -> np.random.Generator:
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, self.epoch, worker_id])
+
+    def _place_window(self, rng, layout: _FileLayout) -> Tuple[int, int, int, int]:
+        """Return (x, y, width, height) of a window containing a random candidate tile."""
+        rows, cols = layout.grid
+        tile_height, tile_width = layout.tile_shape
+        window_height, window_width = layout.window_shape
+        img_height, img_width = layout.image_shape
+        row, col = divmod(int(rng.choice(layout.candidates)), cols)
+        span_rows = window_height // tile_height
+        span_cols = window_width // tile_width
+        row0 = max(0, row - int(rng.integers(0, max(span_rows, 1))))
+        col0 = max(0, col - int(rng.integers(0, max(span_cols, 1))))
+        y = min(row0 * tile_height, img_height - window_height)
+        x = min(col0 * tile_width, img_width - window_width)
+        return x, y, window_width, window_height
+
+    def _draw_patches(self, rng, layout: _FileLayout, window, n: int) -> List[Tuple[int, int]]:
+        """Return up to n (x, y) patch origins inside the window, in image coordinates."""
+        x0, y0, width, height = window
+        patch_width, patch_height = self.patch_size
+        attempts = n * _TISSUE_ATTEMPTS if layout.tissue is not None else n
+        xs = x0 + rng.integers(0, width - patch_width + 1, attempts)
+        ys = y0 + rng.integers(0, height - patch_height + 1, attempts)
+        origins = [(int(x), int(y)) for x, y in zip(xs, ys)]
+        if layout.tissue is None:
+            return origins
+        kept = [(x, y) for x, y in origins
+                if layout.tissue.region_has_tissue(x, y, patch_width, patch_height)]
+        if not kept:
+            # The window contains a tissue tile; fall back to the patch on its centre
+            kept = [(x0 + (width - patch_width) // 2, y0 + (height - patch_height) // 2)]
+        return kept[:n]
+
+    def _fill(self, index: int, window, origins, slots, out: np.ndarray) -> None:
+        """Decode one window and copy its patches into out at slots."""
+        tif = self._file(index)
+        layout = self._layout(index)
+        x0, y0, width, height = window
+        patch_width, patch_height = self.patch_size
+        indices = layout.selection.indices
+        if tif._read_path(layout.series.pages[indices[0]]) == "tile_cache":
+            # Tiles are decoded once into the shared cache; copy each patch
+            # straight from them instead of assembling the whole window
+            for slot, (x, y) in zip(slots, origins):
+                for i, idx in enumerate(indices):
+                    out[slot, i] = tif._read_single_layer(layout.series, idx, y, x,
+                                                          patch_height, patch_width, self.level)
+            return
+        data = np.empty((len(indices), height, width), dtype=layout.dtype)
+        for i, idx in enumerate(indices):
+            data[i] = tif._read_single_layer(layout.series, idx, y0, x0, height, width,
+                                             self.level)
+        for slot, (x, y) in zip(slots, origins):
+            out[slot] = data[:, y - y0:y - y0 + patch_height, x - x0:x - x0 + patch_width]
+
+    def _worker_share(self, worker_id: Optional[int],
+                      num_workers: Optional[int]) -> Tuple[int, int, Optional[int]]:
+        if worker_id is None:
+            worker_id, num_workers = 0, 1
+            torch = sys.modules.get("torch")
+            if torch is not None:
+                info = torch.utils.data.get_worker_info()
+                if info is not None:
+                    worker_id, num_workers = info.id, info.num_workers
+        if not 0 <= worker_id < num_workers:
+            raise ValueError(f"worker_id {worker_id} is not in [0, {num_workers})")
+        if self.num_batches is None:
+            return worker_id, num_workers, None
+        share, extra = divmod(self.num_batches, num_workers)
+        return worker_id, num_workers, share + (1 if worker_id < extra else 0)
+
+    def iter_batches(self, worker_id: Optional[int] = None,
+                     num_workers: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield batches of patches.
+
+        Parameters:
+        -----------
+        worker_id, num_workers : int or None
+            Shard of the batches to draw, for processes not managed by a
+            PyTorch DataLoader. None detects DataLoader workers, or draws all.
+
+        Yields:
+        -------
+        (numpy.ndarray, numpy.ndarray)
+            Patches as a (batch_size, channels, height, width) array, and a
+            (batch_size, 3) int64 array of (file index, x, y) patch origins in
+            pixels of the sampled level
+        """
+        worker_id, num_workers, count = self._worker_share(worker_id, num_workers)
+        rng = self._rng(worker_id)
+        layouts = [self._layout(i) for i in range(len(self.files))]
+        channels = {len(layout.selection.indices) for layout in layouts}
+        dtypes = {layout.dtype for layout in layouts}
+        if len(channels) != 1 or len(dtypes) != 1:
+            raise ValueError("All files must have the same number of selected layers and dtype")
+        n_channels, dtype = channels.pop(), dtypes.pop()
+        weights = np.array([layout.candidates.size * layout.tile_shape[0] * layout.tile_shape[1]
+                            for layout in layouts], dtype=np.float64)
+        if weights.sum() == 0:
+            raise ValueError("No tissue tiles to sample from")
+        weights /= weights.sum()
+        patch_width, patch_height = self.patch_size
+
+        executor = ThreadPoolExecutor(self.threads) if self.threads > 1 else None
+        try:
+            produced = 0
+            while count is None or produced < count:
+                out = np.empty((self.batch_size, n_channels, patch_height, patch_width), dtype=dtype)
+                locations = np.empty((self.batch_size, 3), dtype=np.int64)
+                slots = rng.permutation(self.batch_size)
+                jobs = []
+                filled = 0
+                while filled < self.batch_size:
+                    index = int(rng.choice(len(layouts), p=weights))
+                    window = self._place_window(rng, layouts[index])
+                    wanted = min(self.patches_per_window, self.batch_size - filled)
+                    origins = self._draw_patches(rng, layouts[index], window, wanted)
+                    window_slots = slots[filled:filled + len(origins)]
+                    for slot, (x, y) in zip(window_slots, origins):
+                        locations[slot] = (index, x, y)
+                    jobs.append((index, window, origins, window_slots))
+                    filled += len(origins)
+
+                if executor is None:
+                    for job in jobs:
+                        self._fill(*job, out)
+                else:
+                    for future in [executor.submit(self._fill, *job, out) for job in jobs]:
+                        future.result()
+                produced += 1
+                yield out, locations
+        finally:
+            if executor is not None:
+                executor.shutdown()
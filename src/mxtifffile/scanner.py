@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .format_config import load_formats
+from .format_detector import detect_format
+from .heuristic import heuristic_detect
+from .parsers import parse_channels
+
+TIFF_PATTERNS = ("*.tif", "*.tiff", "*.qptiff", "*.btf")
+
+
+def iter_tiff_paths(roots: Iterable[str], patterns: Sequence[str] = TIFF_PATTERNS) -> Iterator[str]:
+    """Yield files under *roots* (files or directories, walked recursively) matching *patterns*."""
+    for root in roots:
+        root = os.fspath(root)
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                lower = name.lower()
+                if any(fnmatch.fnmatch(lower, pattern) for pattern in patterns):
+                    yield os.path.join(dirpath, name)
+
+
+def scan_file(path: str, formats_config: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Collect format, channel and pyramid metadata for one file without creating an MxTiffFile.
+
+    Only the IFDs of the first page of each pyramid level and the descriptions
+    used by format detection are read. Failures are reported in the ``error``
+    field instead of being raised, so one bad file does not stop a bulk scan.
+    """
+    from tifffile import TiffFile
+
+    st = os.stat(path)
+    record: Dict[str, Any] = {
+        "path": path,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "format_id": None,
+        "biomarkers": [],
+        "fluorophores": [],
+        "level_shapes": [],
+        "levels": [],
+        "error": None,
+    }
+    try:
+        # _multifile=False keeps OME companion files closed
+        with TiffFile(path, _multifile=False) as tif:
+            if not tif.series or not tif.series[0].pages:
+                record["error"] = "no image series"
+                return record
+
+            fmt = detect_format(tif, load_formats(formats_config))
+            if fmt is not None:
+                record["format_id"] = fmt.id
+                channels = parse_channels(fmt, tif)
+            else:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    channels = heuristic_detect(tif)
+                if channels is None:
+                    record["error"] = "format not recognized"
+                    channels = []
+                else:
+                    record["format_id"] = "heuristic"
+            record["biomarkers"] = [ch.get("biomarker") for ch in channels]
+            record["fluorophores"] = [ch.get("fluorophore") for ch in channels]
+
+            for level in tif.series[0].levels:
+                page = level.pages[0]
+                record["level_shapes"].append(list(page.shape))
+                record["levels"].append({
+                    "shape": list(page.shape),
+                    "pages": len(level.pages),
+                    "dtype": str(page.dtype),
+                    "tile": [page.tilelength, page.tilewidth] if page.is_tiled else None,
+                    "compression": page.compression.name,
+                })
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    return record
+
+
+def load_scan_cache(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read a JSON-lines scan output into a {path: record} dict; a missing file yields {}."""
+    cache: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return cache
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written last line after a crash
+                continue
+            cache[record["path"]] = record
+    return cache
+
+
+def _is_fresh(record: Optional[Dict[str, Any]], path: str) -> bool:
+    if record is None or record.get("error"):
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return record.get("size") == st.st_size and record.get("mtime_ns") == st.st_mtime_ns
+
+
+def scan_paths(paths: Iterable[str],
+               max_workers: Optional[int] = None,
+               formats_config: Optional[str] = None,
+               cache: Optional[Dict[str, Dict[str, Any]]] = None,
+               max_pending: Optional[int] = None,
+               skip_cached: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Scan files in a process pool and yield one record per file as it completes.
+
+    Parameters:
+    -----------
+    paths : Iterable[str]
+        Files to scan (see iter_tiff_paths for walking directories)
+    max_workers : int or None
+        Number of worker processes (default: os.cpu_count())
+    formats_config : str or None
+        Path to a custom formats.json
+    cache : dict or None
+        Previous records keyed by path (see load_scan_cache). Files whose size
+        and mtime match their cached record are yielded from the cache without
+        being opened.
+    max_pending : int or None
+        Maximum number of submitted but unfinished files (default: 4 * max_workers)
+    skip_cached : bool
+        Do not yield records for files answered from *cache* (default: False)
+
+    Yields:
+    -------
+    dict
+        Record with path, size, mtime_ns, format_id, biomarkers, fluorophores,
+        level_shapes, levels (shape, pages, dtype, tile, compression) and error
+    """
+    cache = cache or {}
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * max_workers
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for path in paths:
+            path = os.fspath(path)
+            cached = cache.get(path)
+            if _is_fresh(cached, path):
+                if not skip_cached:
+                    yield cached
+                continue
+            pending.add(executor.submit(scan_file, path, formats_config))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], fh) -> int:
+    """Write records to the text stream *fh* as JSON lines, flushing each line. Returns the count."""
+    count = 0
+    for record in records:
+        fh.write(json.dumps(record) + "\n")
+        fh.flush()
+        count += 1
+    return count
+
+
+def write_parquet(records: Iterable[Dict[str, Any]], path: str, batch_size: int = 1000) -> int:
+    """
+    Write records to a Parquet file in batches. Requires pyarrow.
+
+    List-valued fields (biomarkers, fluorophores, level_shapes, levels) are
+    stored as JSON strings so the schema stays flat. Returns the count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        ("path", pa.string()), ("size", pa.int64()), ("mtime_ns", pa.int64()),
+        ("format_id", pa.string()), ("biomarkers", pa.string()),
+        ("fluorophores", pa.string()), ("level_shapes", pa.string()),
+        ("levels", pa.string()), ("error", pa.string()),
+    ])
+    json_fields = ("biomarkers", "fluorophores", "level_shapes", "levels")
+
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(path, schema) as writer:
+        def flush():
+            rows = [{k: (json.dumps(r[k]) if k in json_fields else r.get(k))
+                     for k in schema.names} for r in batch]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            batch.clear()
+
+        for record in records:
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    return count
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import TileCache
+from .dataset import MxTiffDataset
+from .exceptions import MxTiffCorruptTileError
+from .render import DEFAULT_COLORS, NAMED_COLORS, default_limits, parse_color
+
+_TILE_RE = re.compile(r"^/slides/(\d+)/tiles/(\d+)/(\d+)/(\d+)\.(png|jpg|jpeg)$")
+_INFO_RE = re.compile(r"^/slides/(\d+)/info\.json$")
+_HEX_RE = re.compile(r"^[0-9a-fA-F]{6}$")
+_CONTENT_TYPES = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
+
+
+class HTTPError(Exception):
+    """Raised by request handling code to send an error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles connections in a fixed-size thread pool."""
+
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers: int) -> None:
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mxtifffile-http")
+
+    def process_request(self, request, client_address) -> None:
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class _TileRequestHandler(BaseHTTPRequestHandler):
+    server_version = "mxtifffile"
+
+    def do_GET(self) -> None:
+        app: TileServer = self.server.app
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            match = _TILE_RE.match(url.path)
+            if match:
+                slide, level, col, row = (int(g) for g in match.groups()[:4])
+                fmt = match.group(5)
+                key, etag = app.tile_key(slide, level, col, row, fmt, query)
+                if etag in _split_etags(self.headers.get("If-None-Match")):
+                    app.count("not_modified")
+                    self._send(304, None, None, etag)
+                    return
+                body = app.encoded_cache.get_or_load(
+                    key, lambda: app.encode_tile(slide, level, col, row, fmt, query))
+                self._send(200, body, _CONTENT_TYPES[fmt], etag)
+                return
+
+            match = _INFO_RE.match(url.path)
+            if match:
+                self._send_json(app.slide_info(int(match.group(1))))
+            elif url.path in ("/", "/slides"):
+                self._send_json(app.slides())
+            else:
+                raise HTTPError(404, f"Not found: {url.path}")
+        except HTTPError as exc:
+            self._send_json({"error": str(exc)}, exc.status)
+        except MxTiffCorruptTileError as exc:
+            # A damaged file is a server fault; its message names the file on disk
+            app.count("errors")
+            self.log_error("%s", exc)
+            self._send_json({"error": "Slide data is corrupt or truncated"}, 500)
+        except (ValueError, TypeError) as exc:
+            self._send_json({"error": str(exc)}, 400)
+        except Exception as exc:
+            app.count("errors")
+            self.log_error("%s: %s", type(exc).__name__, exc)
+            self._send_json({"error": "Internal server error"}, 500)
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", None)
+
+    def _send(self, status: int, body: Optional[bytes], content_type: Optional[str],
+              etag: Optional[str]) -> None:
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, max-age=3600")
+        if body is not None:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.app.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format: str, *args) -> None:
+        # Errors are logged even when requests are not
+        super().log_message(format, *args)
+
+
+def _split_etags(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip() for tag in header.split(",")]
+
+
+def _parse_color_token(token: str):
+    if token.lower() not in NAMED_COLORS and _HEX_RE.match(token):
+        token = "#" + token
+    return parse_color(token)
+
+
+class TileServer:
+    """
+    HTTP server for rendered tiles of the native pyramid levels of many files.
+
+    Endpoints:
+
+    - ``/slides``: id, name and channels of every file
+    - ``/slides/{id}/info.json``: levels, tile grid and channels of one file
+    - ``/slides/{id}/tiles/{level}/{col}/{row}.{png|jpg}``: one tile of a
+      native pyramid level (level 0 is full resolution). Query parameters:
+      ``channels`` (comma-separated names or indices, default: first
+      channel), ``colors`` (names or rrggbb hex), ``limits`` (``low:high``
+      per channel, ``auto`` for cached percentiles) and ``quality`` (JPEG).
+
+    Files are opened through one MxTiffDataset, so decoded tiles share one
+    cache and at most max_open files are open. Encoded tiles are cached
+    separately and served with ETags; concurrent requests for the same tile
+    are rendered once. Connections are handled by a pool of *workers*
+    threads.
+
+    Parameters:
+    -----------
+    paths : Iterable[str]
+        Files to serve; ids are their positions in this list
+    host, port : str, int
+        Address to listen on; port 0 picks a free port
+    tile_size : int
+        Edge length of served tiles in pixels (default: 256)
+    workers : int
+        Number of request handler threads (default: 8)
+    max_open : int
+        Maximum number of open files (default: 32)
+    tile_cache : TileCache or None
+        Cache for decoded tiles; None lets the dataset create one
+    encoded_cache_bytes : int
+        Memory budget for encoded PNG/JPEG tiles (default: 128 MiB)
+    verbose : bool
+        Log every request to stderr (default: False)
+    """
+
+    def __init__(self, paths: Iterable[str], host: str = "127.0.0.1", port: int = 8000,
+                 tile_size: int = 256, workers: int = 8, max_open: int = 32,
+                 tile_cache: Optional[TileCache] = None,
+                 encoded_cache_bytes: int = 128 * 2**20, verbose: bool = False) -> None:
+        from .mxtifffile import _load_imagecodecs
+
+        self.imagecodecs = _load_imagecodecs()
+        if self.imagecodecs is None:
+            raise ImportError("The tile server requires imagecodecs: pip install imagecodecs")
+        if tile_size < 1:
+            raise ValueError(f"tile_size must be positive, got {tile_size}")
+        self.tile_size = tile_size
+        self.verbose = verbose
+        self.dataset = MxTiffDataset(paths, max_open=max_open, tile_cache=tile_cache)
+        self.encoded_cache = TileCache(max_entries=None, max_bytes=encoded_cache_bytes)
+        # Default display limits per (file, channels); computed once
+        self._limits = TileCache(max_entries=1024)
+        self.counters: Dict[str, int] = {"rendered": 0, "not_modified": 0}
+        self._counter_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = _PooledHTTPServer((host, port), _TileRequestHandler, workers)
+        self.httpd.app = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def serve_forever(self) -> None:
+        """Serve requests until shutdown() is called from another thread."""
+        self.httpd.serve_forever()
+
+    def start(self) -> "TileServer":
+        """Serve requests from a background thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mxtifffile-server",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving, wait for running requests and close all files."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+        self.dataset.close()
+
+    def __enter__(self) -> "TileServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _path(self, slide: int) -> str:
+        if not 0 <= slide < len(self.dataset):
+            raise HTTPError(404, f"No slide {slide}")
+        return self.dataset.paths[slide]
+
+    def slides(self) -> List[Dict[str, Any]]:
+        return [{"id": i, "name": os.path.basename(path),
+                 "channels": self.dataset.catalog.get(path, {}).get("biomarkers")}
+                for i, path in enumerate(self.dataset.paths)]
+
+    def slide_info(self, slide: int) -> Dict[str, Any]:
+        path = self._path(slide)
+        with self.dataset.open(path) as tif:
+            levels = tif.series[0].levels
+            full_height, full_width = levels[0].pages[0].shape[:2]
+            return {
+                "id": slide,
+                "name": os.path.basename(path),
+                "format_id": tif.format_id,
+                "channels": list(tif.biomarkers),
+                "dtype": str(levels[0].pages[0].dtype),
+                "tile_size": self.tile_size,
+                "levels": [{
+                    "level": i,
+                    "width": level.pages[0].shape[1],
+                    "height": level.pages[0].shape[0],
+                    "downsample": full_width / level.pages[0].shape[1],
+                    "tiles_x": -(-level.pages[0].shape[1] // self.tile_size),
+                    "tiles_y": -(-level.pages[0].shape[0] // self.tile_size),
+                } for i, level in enumerate(levels)],
+                "tile_url": f"/slides/{slide}/tiles/{{level}}/{{col}}/{{row}}.png",
+            }
+
+    def _render_params(self, tif, query: Dict[str, str]):
+        """Resolve query parameters into (selection, colors, limits, quality)."""
+        tokens = [t for t in query.get("channels", "").split(",") if t]
+        layers = tif.channel_index.parse_tokens(tokens) or [0]
+        selection = tif.select(layers)
+        n = len(selection)
+
+        color_tokens = [t for t in query.get("colors", "").split(",") if t]
+        if color_tokens:
+            colors = tuple(_parse_color_token(t) for t in color_tokens)
+        elif n == 1:
+            colors = (NAMED_COLORS["white"],)
+        else:
+            colors = tuple(parse_color(DEFAULT_COLORS[i % len(DEFAULT_COLORS)]) for i in range(n))
+        if len(colors) != n:
+            raise ValueError(f"Got {len(colors)} colors for {n} channels")
+
+        limit_tokens = [t for t in query.get("limits", "").split(",") if t]
+        if limit_tokens and len(limit_tokens) != n:
+            raise ValueError(f"Got {len(limit_tokens)} limits for {n} channels")
+        limits = []
+        for token in limit_tokens or ["auto"] * n:
+            if token == "auto":
+                limits.append(None)
+            else:
+                low, _, high = token.partition(":")
+                limits.append((float(low), float(high)))
+        if any(lim is None for lim in limits):
+            defaults = self._limits.get_or_load(
+                (tif._cache_token, selection.indices), lambda: default_limits(tif, selection))
+            limits = [lim if lim is not None else d for lim, d in zip(limits, defaults)]
+
+        quality = int(query.get("quality", 90))
+        return selection, colors, tuple(limits), quality
+
+    def _tile_region(self, tif, level: int, col: int, row: int) -> Tuple[int, int, int, int]:
+        if not 0 <= level < len(tif.series[0].levels):
+            raise HTTPError(404, f"No level {level}")
+        height, width = tif.series[0].levels[level].pages[0].shape[:2]
+        x, y = col * self.tile_size, row * self.tile_size
+        if x >= width or y >= height:
+            raise HTTPError(404, f"Tile {col}/{row} is outside level {level}")
+        return x, y, min(self.tile_size, width - x), min(self.tile_size, height - y)
+
+    def tile_key(self, slide: int, level: int, col: int, row: int, fmt: str,
+                 query: Dict[str, str]) -> Tuple[tuple, str]:
+        """Return the encoded-cache key and ETag of a tile, without rendering it."""
+        with self.dataset.open(self._path(slide)) as tif:
+            self._tile_region(tif, level, col, row)
+            selection, colors, limits, quality = self._render_params(tif, query)
+            key = (tif._cache_token, level, col, row, "jpg" if fmt == "jpeg" else fmt,
+                   quality if fmt != "png" else None, selection.indices, colors, limits,
+                   self.tile_size)
+        etag = '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20] + '"'
+        return key, etag
+
+    def encode_tile(self, slide: int, level: int, col: int, row: int, fmt: str,
+                    query: Dict[str, str]) -> bytes:
+        """Render and encode one tile."""
+        with self.dataset.open(self._path(slide)) as tif:
+            x, y, width, height = self._tile_region(tif, level, col, row)
+            selection, colors, limits, quality = self._render_params(tif, query)
+            rgb = tif.render(selection, colors=colors, limits=limits, pos=(x, y),
+                             shape=(width, height), level=level)
+        self.count("rendered")
+        if fmt == "png":
+            return bytes(self.imagecodecs.png_encode(rgb))
+        return bytes(self.imagecodecs.jpeg8_encode(rgb, level=quality))
+
+
+def serve(paths: Iterable[str], host: str = "127.0.0.1", port: int = 8000, **kwargs) -> None:
+    """Run a TileServer in the foreground until interrupted."""
+    server = TileServer(paths, host=host, port=port, **kwargs)
+    print(f"Serving {len(server.dataset)} files at {server.url}/slides")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+from .cache import _Flight
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_MAGIC = 0x4D5854494C45  # "MXTILE"
+_VERSION = 1
+_HEADER_BYTES = 64
+_MAX_NDIM = 4
+# Seqlock reads retried this often before a busy slot counts as a miss
+_READ_RETRIES = 3
+# Seconds an attaching process waits for the creator to initialize the header
+_ATTACH_TIMEOUT = 5.0
+
+_SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),        # odd while a writer is updating the slot
+    ("access", "<u8"),     # CLOCK_MONOTONIC ns of the last hit or write
+    ("key", "<u8", (2,)),  # 128-bit digest of the cache key
+    ("used", "<u8"),
+    ("nbytes", "<u8"),
+    ("ndim", "<u8"),
+    ("shape", "<u8", (_MAX_NDIM,)),
+    ("dtype", "S8"),
+])
+
+
+def _key_digest(key: Hashable) -> np.ndarray:
+    """Digest a cache key identically in every process (repr, not hash())."""
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+    return np.frombuffer(digest, dtype="<u8")
+
+
+def _open_segment(name: str, size: int):
+    """Create or attach the named segment; return (SharedMemory, created)."""
+    kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size, **kwargs)
+        created = True
+    except FileExistsError:
+        deadline = time.monotonic() + _ATTACH_TIMEOUT
+        while True:
+            try:
+                shm = shared_memory.SharedMemory(name=name, **kwargs)
+                break
+            except ValueError:
+                # Created but not yet sized by its creator
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+        created = False
+    if not kwargs:
+        # The segment outlives this process; stop the resource tracker from
+        # unlinking it when the process that happened to create it exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, created
+
+
+class SharedTileCache:
+    """
+    Tile cache in POSIX shared memory, shared by every process on the host.
+
+    Pass it as ``tile_cache`` to MxTiffFile (or MxTiffDataset, TileServer,
+    PatchSampler ``open_kwargs``). Keys carry the file identity, so all
+    processes attached to the same *name* reuse each other's decoded tiles.
+
+    The segment is a set-associative table of fixed-size slots: a key can
+    only live in the *ways* slots of the set its digest selects, and a full
+    set evicts its least recently used slot, by access times all processes
+    update. Reads take no lock: each slot carries a sequence counter that
+    writers make odd while updating, and a reader copies the slot and retries
+    if the counter changed meanwhile. Writers to a set serialize with an
+    fcntl range lock on a lock file plus a lock within the process.
+
+    Values are numpy arrays of at most *slot_bytes* bytes; larger or other
+    values are returned uncached. Hits return read-only copies. Concurrent
+    misses for a key are coalesced within a process, not across processes.
+
+    The segment persists after all processes exit, until unlink() is called.
+
+    Parameters:
+    -----------
+    name : str
+        Segment name; processes using the same name share the cache
+    max_bytes : int
+        Size of the data area (default: 1 GiB)
+    slot_bytes : int
+        Capacity of one slot, the largest cacheable value (default: 2 MiB,
+        a 1024x1024 uint16 tile)
+    ways : int
+        Slots per set (default: 8)
+    lock_dir : str or None
+        Directory of the writers' lock file; None uses the temp directory
+    """
+
+    def __init__(self, name: str = "mxtifffile-tiles", max_bytes: int = 2**30,
+                 slot_bytes: int = 2 * 2**20, ways: int = 8,
+                 lock_dir: Optional[str] = None) -> None:
+        if fcntl is None:
+            raise NotImplementedError("SharedTileCache requires a POSIX system")
+        n_sets = max_bytes // (slot_bytes * ways)
+        if n_sets < 1:
+            raise ValueError(f"max_bytes {max_bytes} holds no set of {ways} "
+                             f"slots of {slot_bytes} bytes")
+        self.name = name
+        self.slot_bytes = slot_bytes
+        self.ways = ways
+        self.n_sets = n_sets
+        self.n_slots = n_sets * ways
+        self.max_bytes = self.n_slots * slot_bytes
+        self.lock_dir = lock_dir
+
+        meta_bytes = self.n_slots * _SLOT_DTYPE.itemsize
+        self._data_offset = _HEADER_BYTES + -(-meta_bytes // 64) * 64
+        size = self._data_offset + self.max_bytes
+        self._shm, created = _open_segment(name, size)
+        buf = self._shm.buf
+        header = np.ndarray((5,), dtype="<u8", buffer=buf)
+        if created:
+            header[1:] = (_VERSION, self.n_slots, slot_bytes, ways)
+            header[0] = _MAGIC  # written last: attachers wait for it
+        else:
+            deadline = time.monotonic() + _ATTACH_TIMEOUT
+            while header[0] != _MAGIC and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if tuple(header) != (_MAGIC, _VERSION, self.n_slots, slot_bytes, ways):
+                self._shm.close()
+                raise ValueError(f"Shared cache {name!r} exists with a different layout; "
+                                 f"use the same max_bytes, slot_bytes and ways, or another name")
+        self._header = header
+        slots = np.ndarray((self.n_slots,), dtype=_SLOT_DTYPE, buffer=buf, offset=_HEADER_BYTES)
+        # Views of each field into the shared segment
+        self._seq = slots["seq"]
+        self._access = slots["access"]
+        self._key = slots["key"]
+        self._used = slots["used"]
+        self._nbytes = slots["nbytes"]
+        self._ndim = slots["ndim"]
+        self._shape = slots["shape"]
+        self._dtype = slots["dtype"]
+        self._data = np.ndarray((self.n_slots, slot_bytes), dtype=np.uint8, buffer=buf,
+                                offset=self._data_offset)
+
+        lock_path = os.path.join(lock_dir or tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.uncacheable = 0
+
+    def __reduce__(self):
+        # Attach to the same segment in the receiving process
+        return SharedTileCache, (self.name, self.max_bytes, self.slot_bytes, self.ways,
+                                 self.lock_dir)
+
+    def _set_slots(self, digest: np.ndarray) -> slice:
+        start = int(digest[0] % self.n_sets) * self.ways
+        return slice(start, start + self.ways)
+
+    def _find(self, digest: np.ndarray, slots: slice) -> np.ndarray:
+        """Slot numbers in the set whose key matches, unvalidated."""
+        keys = self._key[slots]
+        match = (self._used[slots] != 0) & (keys[:, 0] == digest[0]) & (keys[:, 1] == digest[1])
+        return slots.start + np.flatnonzero(match)
+
+    def _read(self, digest: np.ndarray) -> Optional[np.ndarray]:
+        slots = self._set_slots(digest)
+        for _ in range(_READ_RETRIES):
+            busy = False
+            for slot in self._find(digest, slots):
+                seq = int(self._seq[slot])
+                if seq & 1:
+                    busy = True
+                    continue
+                ndim = int(self._ndim[slot])
+                shape = tuple(int(v) for v in self._shape[slot, :ndim])
+                dtype = self._dtype[slot]
+                nbytes = int(self._nbytes[slot])
+                key = self._key[slot].copy()
+                value = self._data[slot, :nbytes].copy()
+                # Valid only if no writer touched the slot while it was copied
+                if int(self._seq[slot]) != seq or not np.array_equal(key, digest):
+                    busy = True
+                    continue
+                self._access[slot] = time.monotonic_ns()
+                value = value.view(np.dtype(dtype.decode("ascii"))).reshape(shape)
+                value.flags.writeable = False
+                return value
+            if not busy:
+                return None
+        return None
+
+    def _write(self, digest: np.ndarray, value: np.ndarray) -> None:
+        slots = self._set_slots(digest)
+        with self._lock, self._set_locked(slots.start // self.ways):
+            existing = self._find(digest, slots)
+            if existing.size:
+                slot = int(existing[0])
+            else:
+                free = np.flatnonzero(self._used[slots] == 0)
+                offset = free[0] if free.size else np.argmin(self._access[slots])
+                slot = slots.start + int(offset)
+            # Set the parity explicitly: a writer that died mid-write leaves
+            # the sequence odd, and incrementing would keep the slot unreadable
+            seq = int(self._seq[slot]) | 1
+            self._seq[slot] = seq
+            self._used[slot] = 1
+            self._key[slot] = digest
+            self._nbytes[slot] = value.nbytes
+            self._ndim[slot] = value.ndim
+            self._shape[slot] = 0
+            self._shape[slot, :value.ndim] = value.shape
+            self._dtype[slot] = value.dtype.str.encode("ascii")
+            self._data[slot, :value.nbytes] = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+            self._access[slot] = time.monotonic_ns()
+            self._seq[slot] = seq + 1
+
+    @contextmanager
+    def _set_locked(self, set_index: int):
+        """Hold the writers' lock of one set across processes."""
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, set_index)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, set_index)
+
+    def _cacheable(self, value: Any) -> bool:
+        return (isinstance(value, np.ndarray) and value.nbytes <= self.slot_bytes
+                and value.ndim <= _MAX_NDIM and not value.dtype.hasobject
+                and len(value.dtype.str) <= 8)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._used))
+
+    def __contains__(self, key: Hashable) -> bool:
+        digest = _key_digest(key)
+        return self._find(digest, self._set_slots(digest)).size > 0
+
+    @property
+    def nbytes(self) -> int:
+        """Total size in bytes of the cached values."""
+        return int(self._nbytes[self._used != 0].sum())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._read(_key_digest(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self._cacheable(value):
+            self.uncacheable += 1
+            return
+        self._write(_key_digest(key), value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for *key*, calling *loader* on a miss.
+
+        Threads of this process missing the same key wait for one load, as
+        with TileCache.get_or_load; other processes may load it concurrently.
+        """
+        digest = _key_digest(key)
+        value = self._read(digest)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.put(key, flight.value)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+        return flight.value
+
+    def _reset_after_fork(self) -> None:
+        # The mapping is inherited; process-local locks and loads are not.
+        # fcntl locks are never inherited across fork.
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def clear(self) -> None:
+        """Empty the cache for every attached process."""
+        for set_index in range(self.n_sets):
+            slots = slice(set_index * self.ways, (set_index + 1) * self.ways)
+            with self._lock, self._set_locked(set_index):
+                # Force odd first, as in _write, so every slot ends even
+                self._seq[slots] |= 1
+                self._used[slots] = 0
+                self._seq[slots] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return this process's hit/miss counters and the shared size."""
+        return {
+            "entries": len(self),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "uncacheable": self.uncacheable,
+        }
+
+    def close(self) -> None:
+        """Detach this process; the shared segment and its entries remain."""
+        # Drop every view first: the mapping cannot close while they exist
+        self._header = self._data = None
+        self._seq = self._access = self._key = self._used = None
+        self._nbytes = self._ndim = self._shape = self._dtype = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def unlink(self) -> None:
+        """Remove the segment from the system; attached processes keep their mapping."""
+        shm = self._shm
+        if shm is None:
+            kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+            shm = shared_memory.SharedMemory(name=self.name, **kwargs)
+        elif sys.version_info < (3, 13):
+            # SharedMemory.unlink unregisters from the tracker; pair it up
+            resource_tracker.register(shm._name, "shared_memory")
+        try:
+            shm.unlink()
+        finally:
+            if shm is not self._shm:
+                shm.close()
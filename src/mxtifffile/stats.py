@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .tissue import _segment_grid
+
+# Bins used for dtypes that are not histogrammed one bin per value
+DEFAULT_BINS = 4096
+# Bumped whenever the on-disk format changes so stale files are ignored
+_CACHE_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    """Suggested directory for persistent caches: $MXTIFFFILE_CACHE_DIR or ~/.cache/mxtifffile."""
+    return os.environ.get("MXTIFFFILE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "mxtifffile")
+
+
+class ChannelStats:
+    """
+    Mergeable histogram and moments of one channel.
+
+    Bin ``i`` covers ``[bin_start + i * bin_width, bin_start + (i + 1) * bin_width)``.
+    8- and 16-bit integer data use one bin per value, so percentiles, min,
+    max, mean and std are exact; other dtypes use DEFAULT_BINS bins over a
+    fixed range, with values outside it counted in the end bins.
+    """
+
+    __slots__ = ("name", "index", "level", "hist", "bin_start", "bin_width", "exact",
+                 "_count", "_min", "_max", "_sum", "_sumsq")
+
+    def __init__(self, bin_start: float, bin_width: float, nbins: int, exact: bool = False,
+                 name: Optional[str] = None, index: Optional[int] = None, level: int = 0) -> None:
+        self.name = name
+        self.index = index
+        self.level = level
+        self.hist = np.zeros(nbins, dtype=np.int64)
+        self.bin_start = bin_start
+        self.bin_width = bin_width
+        self.exact = exact
+        # Tracked directly only for binned histograms; exact ones derive them
+        self._count = 0
+        self._min = np.inf
+        self._max = -np.inf
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    @classmethod
+    def for_dtype(cls, dtype, value_range: Optional[Tuple[float, float]] = None,
+                  **kwargs) -> "ChannelStats":
+        """Create empty statistics suited to *dtype*; value_range is required for binned dtypes."""
+        dtype = np.dtype(dtype)
+        if dtype.kind in "ui" and dtype.itemsize <= 2:
+            info = np.iinfo(dtype)
+            return cls(float(info.min), 1.0, int(info.max) - int(info.min) + 1, exact=True, **kwargs)
+        if value_range is None:
+            raise ValueError(f"value_range is required for {dtype} data")
+        low, high = map(float, value_range)
+        width = (high - low) / DEFAULT_BINS if high > low else 1.0
+        return cls(low, width, DEFAULT_BINS, **kwargs)
+
+    def update(self, values: np.ndarray) -> "ChannelStats":
+        """Add the samples in *values* (any shape); NaNs are ignored."""
+        values = np.asarray(values).ravel()
+        if values.dtype.kind == "f":
+            values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        if self.exact:
+            if self.bin_start:
+                values = values.astype(np.int32) - int(self.bin_start)
+            self.hist += np.bincount(values, minlength=self.hist.size)
+            return self
+
+        as_float = values.astype(np.float64, copy=False)
+        self._count += values.size
+        self._min = min(self._min, float(as_float.min()))
+        self._max = max(self._max, float(as_float.max()))
+        self._sum += float(as_float.sum())
+        self._sumsq += float(np.dot(as_float, as_float))
+        bins = ((as_float - self.bin_start) / self.bin_width).astype(np.int64)
+        np.clip(bins, 0, self.hist.size - 1, out=bins)
+        self.hist += np.bincount(bins, minlength=self.hist.size)
+        return self
+
+    def merge(self, other: "ChannelStats") -> "ChannelStats":
+        """Add the samples counted in *other*, which must use the same bins."""
+        if (other.hist.size != self.hist.size or other.bin_start != self.bin_start
+                or other.bin_width != self.bin_width):
+            raise ValueError("Cannot merge statistics with different bins")
+        self.hist += other.hist
+        self._count += other._count
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._sum += other._sum
+        self._sumsq += other._sumsq
+        return self
+
+    def copy(self) -> "ChannelStats":
+        """Independent copy, safe to update or merge into."""
+        other = ChannelStats(self.bin_start, self.bin_width, 0, exact=self.exact,
+                             name=self.name, index=self.index, level=self.level)
+        other.hist = self.hist.copy()
+        other._count, other._min, other._max = self._count, self._min, self._max
+        other._sum, other._sumsq = self._sum, self._sumsq
+        return other
+
+    def _values(self) -> np.ndarray:
+        return self.bin_start + np.arange(self.hist.size) * self.bin_width
+
+    @property
+    def count(self) -> int:
+        return int(self.hist.sum()) if self.exact else self._count
+
+    @property
+    def min(self) -> float:
+        if self.exact:
+            nonzero = np.flatnonzero(self.hist)
+            return float(self.bin_start + nonzero[0]) if nonzero.size else float("nan")
+        return self._min if self._count else float("nan")
+
+    @property
+    def max(self) -> float:
+        if self.exact:
+            nonzero = np.flatnonzero(self.hist)
+            return float(self.bin_start + nonzero[-1]) if nonzero.size else float("nan")
+        return self._max if self._count else float("nan")
+
+    @property
+    def sum(self) -> float:
+        if self.exact:
+            return float(np.dot(self.hist, self._values()))
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self.sum / count if count else float("nan")
+
+    @property
+    def std(self) -> float:
+        count = self.count
+        if not count:
+            return float("nan")
+        if self.exact:
+            deviation = self._values() - self.mean
+            return float(np.sqrt(np.dot(self.hist, deviation * deviation) / count))
+        return float(np.sqrt(max(self._sumsq / count - self.mean ** 2, 0.0)))
+
+    def percentile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        """
+        Return the q-th percentile(s), 0 <= q <= 100, from the histogram.
+
+        One-bin-per-value histograms give the same result as
+        ``np.percentile(data, q, method='lower')``; binned histograms are
+        interpolated within the bin.
+        """
+        q_arr = np.asarray(q, dtype=np.float64)
+        count = self.count
+        if not count:
+            result = np.full(q_arr.shape, np.nan)
+        else:
+            cdf = np.cumsum(self.hist)
+            rank = np.clip(q_arr / 100.0, 0.0, 1.0) * (count - 1)
+            idx = np.searchsorted(cdf, rank, side="right")
+            if self.exact:
+                result = self.bin_start + idx.astype(np.float64)
+            else:
+                below = np.where(idx > 0, cdf[np.maximum(idx - 1, 0)], 0)
+                frac = (rank - below + 0.5) / np.maximum(self.hist[idx], 1)
+                result = self.bin_start + (idx + np.clip(frac, 0.0, 1.0)) * self.bin_width
+                result = np.clip(result, self.min, self.max)
+        return float(result) if result.ndim == 0 else result
+
+    def __repr__(self) -> str:
+        return (f"ChannelStats(name={self.name!r}, count={self.count}, min={self.min:g}, "
+                f"max={self.max:g}, mean={self.mean:g}, std={self.std:g})")
+
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "version": np.array(_CACHE_VERSION),
+            "hist": self.hist,
+            "scalars": np.array([self.bin_start, self.bin_width, self._count, self._min,
+                                 self._max, self._sum, self._sumsq], dtype=np.float64),
+            "exact": np.array(self.exact),
+        }
+
+    @classmethod
+    def _from_arrays(cls, arrays, **kwargs) -> "ChannelStats":
+        bin_start, bin_width, count, vmin, vmax, total, sumsq = arrays["scalars"].tolist()
+        stats = cls(bin_start, bin_width, arrays["hist"].size, exact=bool(arrays["exact"]), **kwargs)
+        stats.hist[:] = arrays["hist"]
+        stats._count, stats._min, stats._max = int(count), vmin, vmax
+        stats._sum, stats._sumsq = total, sumsq
+        return stats
+
+
+def _tile_positions(page, sample, seed: int, tissue=None) -> List[Tuple[int, int, int, int]]:
+    """Return (x, y, width, height) of the native tiles to visit, optionally sampled."""
+    (tile_height, tile_width), (rows, cols) = _segment_grid(page)
+    img_height, img_width = page.shape[:2]
+    positions = []
+    for row in range(rows):
+        y = row * tile_height
+        height = min(tile_height, img_height - y)
+        for col in range(cols):
+            x = col * tile_width
+            if tissue is not None and not tissue.mask[row, col]:
+                continue
+            positions.append((x, y, min(tile_width, img_width - x), height))
+
+    if sample is not None:
+        if isinstance(sample, float):
+            if not 0 < sample <= 1:
+                raise ValueError(f"Sample fraction must be in (0, 1], got {sample}")
+            n = max(1, round(sample * len(positions)))
+        else:
+            n = int(sample)
+            if n < 1:
+                raise ValueError(f"Sample must be at least 1 tile, got {sample}")
+        if n < len(positions):
+            chosen = np.random.default_rng(seed).choice(len(positions), n, replace=False)
+            positions = [positions[i] for i in sorted(chosen)]
+    return positions
+
+
+def _map_partitions(tif, func, items: list, parallel: bool = True) -> list:
+    """
+    Split *items* into one interleaved partition per worker, call func(partition)
+    for each in tif's thread pool, and return the results.
+    """
+    n_workers = max(1, tif._max_workers if parallel else 1)
+    chunks = [items[k::n_workers] for k in range(n_workers) if items[k::n_workers]]
+    if len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    if tif._executor is not None:
+        return [f.result() for f in [tif._executor.submit(func, c) for c in chunks]]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        return list(executor.map(func, chunks))
+
+
+def _cache_path(cache_dir: str, token, key) -> str:
+    digest = hashlib.sha1(repr((token, key)).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "stats", digest + ".npz")
+
+
+def _load_cached(path: str, **kwargs) -> Optional[ChannelStats]:
+    try:
+        with np.load(path) as arrays:
+            if int(arrays["version"]) != _CACHE_VERSION:
+                return None
+            return ChannelStats._from_arrays(arrays, **kwargs)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_cached(path: str, stats: ChannelStats) -> None:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, **stats._to_arrays())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        # A read-only or full cache directory only costs a recomputation
+        pass
+
+
+def compute_channel_stats(tif, layers=None, level: int = 0, sample=None,
+                          tissue_only: bool = False, seed: int = 0,
+                          value_range: Optional[Tuple[float, float]] = None,
+                          parallel: bool = True, cache: bool = True,
+                          cache_dir: Optional[str] = None) -> List[ChannelStats]:
+    """
+    Compute per-channel histograms and moments by streaming tiles.
+
+    Tiles are read straight from the file (bypassing the tile cache) by up to
+    max_workers threads, each accumulating its own partial statistics, so
+    memory is bounded by one tile per layer per thread plus the histograms.
+
+    Parameters:
+    -----------
+    tif : MxTiffFile
+        Open file
+    layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+        Layers to summarize; None summarizes all layers
+    level : int
+        Pyramid level to read; a low level gives fast approximate statistics
+    sample : float, int or None
+        Fraction (float) or number (int) of tiles to visit, chosen at random
+        with *seed*; None visits every tile
+    tissue_only : bool
+        Skip tiles marked as background by tif.tissue_map(level)
+    seed : int
+        Random seed for tile sampling
+    value_range : (float, float) or None
+        Histogram range for dtypes wider than 16 bits or floating point; None
+        uses the min/max of the lowest pyramid level
+    parallel : bool
+        Read tiles in a thread pool (default: True)
+    cache : bool
+        Reuse results from memory and from *cache_dir* (default: True)
+    cache_dir : str or None
+        Directory for persistent results, e.g. default_cache_dir(); None
+        caches in memory only
+
+    Returns:
+    --------
+    list of ChannelStats
+        One entry per selected layer, in selection order; copies of cached
+        results, so callers may update or merge into them
+    """
+    series = tif.series[0].levels[level]
+    selection = tif.select(layers, level)
+    if selection.n_pages != len(series.pages):
+        selection = tif.channel_index.compile(list(selection.indices), len(series.pages))
+    pages = [series.pages[idx] for idx in selection.indices]
+    dtype = pages[0].dtype
+
+    if value_range is None and not (dtype.kind in "ui" and dtype.itemsize <= 2):
+        lowest = tif.read_region(list(selection.indices), level=len(tif.series[0].levels) - 1)
+        value_range = (float(np.nanmin(lowest)), float(np.nanmax(lowest)))
+
+    params = (level, sample, bool(tissue_only), seed, value_range)
+    persistent = cache and cache_dir is not None and tif._cache_token[0] != "object"
+
+    results: List[Optional[ChannelStats]] = [None] * len(pages)
+    for i, (idx, name) in enumerate(zip(selection.indices, selection.names)):
+        if not cache:
+            break
+        key = params + (idx,)
+        cached = tif._stats_cache.get(key)
+        if cached is None and persistent:
+            cached = _load_cached(_cache_path(cache_dir, tif._cache_token, key),
+                                  name=name, index=idx, level=level)
+            if cached is not None:
+                tif._stats_cache[key] = cached
+        results[i] = None if cached is None else cached.copy()
+
+    todo = [i for i, stats in enumerate(results) if stats is None]
+    if not todo:
+        return results
+
+    tissue = tif.tissue_map(level) if tissue_only else None
+    positions = _tile_positions(pages[0], sample, seed, tissue)
+
+    def new_stats(i):
+        return ChannelStats.for_dtype(dtype, value_range, name=selection.names[i],
+                                      index=selection.indices[i], level=level)
+
+    def accumulate(chunk):
+        partial = {i: new_stats(i) for i in todo}
+        for x, y, width, height in chunk:
+            for i in todo:
+                region = tif._read_page_region_optimized(pages[i], y, x, height, width)
+                partial[i].update(region)
+        return partial
+
+    partials = _map_partitions(tif, accumulate, positions, parallel)
+
+    for i in todo:
+        stats = new_stats(i)
+        for partial in partials:
+            stats.merge(partial[i])
+        results[i] = stats
+        if cache:
+            key = params + (selection.indices[i],)
+            tif._stats_cache[key] = stats.copy()
+            if persistent:
+                _save_cached(_cache_path(cache_dir, tif._cache_token, key), stats)
+    return results
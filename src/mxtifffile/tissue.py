@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Byte counts spread over less than this ratio carry no tissue/glass signal
+_MIN_BYTE_RATIO = 1.5
+# With refinement, tiles whose byte count is within this factor of the
+# threshold are decided from the decoded low-resolution level
+_AMBIGUOUS_FACTOR = 2.0
+
+
+@dataclass
+class TissueMap:
+    """
+    Per-tile tissue/background mask of one pyramid level.
+
+    ``mask[row, col]`` is True for tiles (or strips, with one column) that
+    contain tissue. ``bytecounts`` holds the compressed tile sizes summed over
+    the layers the map was built from.
+    """
+
+    level: int
+    image_shape: Tuple[int, int]
+    tile_shape: Tuple[int, int]
+    mask: np.ndarray
+    bytecounts: np.ndarray
+    threshold: float
+    refined: bool = False
+
+    @property
+    def fraction(self) -> float:
+        """Fraction of tiles marked as tissue."""
+        return float(self.mask.mean()) if self.mask.size else 0.0
+
+    def tile_positions(self) -> Iterator[Tuple[int, int]]:
+        """Yield the (x, y) pixel origin of every tissue tile, row by row."""
+        tile_height, tile_width = self.tile_shape
+        for row, col in zip(*np.nonzero(self.mask)):
+            yield int(col) * tile_width, int(row) * tile_height
+
+    def region_has_tissue(self, x: int, y: int, width: int, height: int) -> bool:
+        """True if any tile intersecting the region is marked as tissue."""
+        if width <= 0 or height <= 0:
+            return False
+        tile_height, tile_width = self.tile_shape
+        rows = slice(y // tile_height, (y + height - 1) // tile_height + 1)
+        cols = slice(x // tile_width, (x + width - 1) // tile_width + 1)
+        return bool(self.mask[rows, cols].any())
+
+
+def _otsu_threshold(values: np.ndarray, bins: int = 64) -> float:
+    """Return the Otsu threshold of a 1-D sample."""
+    hist, edges = np.histogram(values, bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight0 = np.cumsum(hist)
+    weight1 = weight0[-1] - weight0
+    mass0 = np.cumsum(hist * centers)
+    mean0 = mass0 / np.maximum(weight0, 1)
+    mean1 = (mass0[-1] - mass0) / np.maximum(weight1, 1)
+    between = weight0 * weight1 * (mean0 - mean1) ** 2
+    return float(edges[int(np.argmax(between[:-1])) + 1])
+
+
+def _byte_threshold(bytecounts: np.ndarray) -> float:
+    """Choose the tissue threshold in bytes from the distribution of tile sizes."""
+    nonzero = bytecounts[bytecounts > 0]
+    if nonzero.size == 0:
+        return 1.0
+    logs = np.log(nonzero.astype(np.float64))
+    if logs.max() - logs.min() < math.log(_MIN_BYTE_RATIO):
+        # No separation: treat every stored tile as tissue
+        return 1.0
+    # Cut in the middle of the gap around Otsu's split, not at its edge
+    split = _otsu_threshold(logs)
+    below = logs[logs < split]
+    above = logs[logs >= split]
+    if below.size == 0 or above.size == 0:
+        return math.exp(split)
+    return math.exp((below.max() + above.min()) / 2)
+
+
+def _segment_grid(page) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Return ((tile_height, tile_width), (rows, cols)) of a page's tiles or strips."""
+    key = page.keyframe
+    height, width = page.shape[:2]
+    if key.is_tiled:
+        tile_shape = (key.tilelength, key.tilewidth)
+    else:
+        tile_shape = (min(key.rowsperstrip or height, height), width)
+    grid = (-(-height // tile_shape[0]), -(-width // tile_shape[1]))
+    return tile_shape, grid
+
+
+def _refine(tif, tmap: TissueMap, selection, refine_level: int,
+            refine_threshold: Optional[float]) -> np.ndarray:
+    """Decide ambiguous tiles from a decoded low-resolution level."""
+    ratio_bytes = np.where(tmap.bytecounts > 0, tmap.bytecounts, 1) / tmap.threshold
+    ambiguous = (ratio_bytes > 1 / _AMBIGUOUS_FACTOR) & (ratio_bytes < _AMBIGUOUS_FACTOR)
+    if not ambiguous.any():
+        return tmap.mask
+
+    low = tif.read_region(list(selection.indices), level=refine_level)
+    if low.ndim == 3:
+        low = low.astype(np.float64).sum(axis=2)
+    signal = np.log1p(low.astype(np.float64))
+    if refine_threshold is None:
+        threshold = _otsu_threshold(signal.ravel()) if signal.max() > signal.min() else np.inf
+    else:
+        threshold = math.log1p(refine_threshold)
+    foreground = signal > threshold
+
+    scale_y = low.shape[0] / tmap.image_shape[0]
+    scale_x = low.shape[1] / tmap.image_shape[1]
+    tile_height, tile_width = tmap.tile_shape
+    mask = tmap.mask.copy()
+    for row, col in zip(*np.nonzero(ambiguous)):
+        y0 = int(row * tile_height * scale_y)
+        x0 = int(col * tile_width * scale_x)
+        y1 = max(y0 + 1, math.ceil((row + 1) * tile_height * scale_y))
+        x1 = max(x0 + 1, math.ceil((col + 1) * tile_width * scale_x))
+        mask[row, col] = bool(foreground[y0:y1, x0:x1].any())
+    return mask
+
+
+def build_tissue_map(tif, level: int = 0, layers=None, threshold: Optional[float] = None,
+                     refine_level: Optional[int] = None,
+                     refine_threshold: Optional[float] = None) -> TissueMap:
+    """
+    Build a tissue map of one level from compressed tile sizes, without decoding.
+
+    Background (glass) tiles compress to far fewer bytes than tissue tiles.
+    Byte counts of the selected layers are summed per tile and split with
+    Otsu's method on their logarithm, unless *threshold* (in bytes) is given.
+
+    Parameters:
+    -----------
+    tif : MxTiffFile
+        Open file
+    level : int
+        Pyramid level to map (default: 0)
+    layers : str, Iterable[str], int, Iterable[int], LayerSelection, or None
+        Layers whose byte counts are combined. None uses all layers.
+    threshold : float or None
+        Minimum summed tile size in bytes for a tissue tile
+    refine_level : int or None
+        If set, decode this (low-resolution) level and decide tiles whose byte
+        count is close to the threshold from its intensities
+    refine_threshold : float or None
+        Intensity (summed over layers) above which a refine_level pixel is
+        tissue; None uses Otsu's method
+
+    Returns:
+    --------
+    TissueMap
+    """
+    series = tif.series[0].levels[level]
+    selection = tif.select(layers, level)
+    pages = [series.pages[idx] for idx in selection.indices]
+    tile_shape, grid = _segment_grid(pages[0])
+
+    bytecounts = np.zeros(grid[0] * grid[1], dtype=np.int64)
+    for page in pages:
+        counts = np.asarray(page.databytecounts, dtype=np.int64)[:bytecounts.size]
+        bytecounts[:counts.size] += counts
+    bytecounts = bytecounts.reshape(grid)
+
+    if threshold is None:
+        threshold = _byte_threshold(bytecounts)
+    tmap = TissueMap(level=level, image_shape=tuple(pages[0].shape[:2]), tile_shape=tile_shape,
+                     mask=bytecounts >= threshold, bytecounts=bytecounts, threshold=float(threshold))
+
+    if refine_level is not None:
+        tmap.mask = _refine(tif, tmap, selection, refine_level, refine_threshold)
+        tmap.refined = True
+    return tmap
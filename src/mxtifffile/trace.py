@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .planner import build_plan
+
+TRACE_VERSION = 1
+# Compressions the synthetic replay file can be written with; others use zlib
+_SYNTHETIC_COMPRESSIONS = {"NONE": None, "LZW": "lzw", "JPEG": "jpeg", "ADOBE_DEFLATE": "zlib",
+                           "DEFLATE": "zlib", "ZSTD": "zstd", "PACKBITS": "packbits",
+                           "JPEG2000": "jpeg2000", "WEBP": "webp"}
+
+
+def _open_text(path: str, mode: str):
+    if os.fspath(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def trace_header(tif) -> Dict[str, Any]:
+    """
+    Describe the geometry of a file for a trace: pyramid shapes, tiling,
+    dtype, compression and layer count, but no path, names or metadata.
+    """
+    levels = []
+    for level in tif.series[0].levels:
+        key = level.pages[0].keyframe
+        levels.append({
+            "shape": list(level.pages[0].shape[:2]),
+            "tile": [key.tilelength, key.tilewidth] if key.is_tiled else None,
+            "rowsperstrip": None if key.is_tiled else key.rowsperstrip,
+            "compression": key.compression.name,
+        })
+    return {
+        "type": "header",
+        "version": TRACE_VERSION,
+        "format_id": tif.format_id,
+        "dtype": np.dtype(tif.series[0].levels[0].pages[0].dtype).str,
+        "layers": len(tif.series[0].levels[0].pages),
+        "levels": levels,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+class TraceRecorder:
+    """
+    Writes one JSON line per read of an MxTiffFile; see MxTiffFile.record_trace.
+
+    Each record holds the operation, layer indices, position, shape, level,
+    parallel flag, start offset ``t`` and duration ``dur`` in seconds, and the
+    tiles or strips the read touched (``segments``) and found cached
+    (``cached``) just before it ran.
+    """
+
+    def __init__(self, tif, path) -> None:
+        self.path = os.fspath(path)
+        self._fh = _open_text(self.path, "w")
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._threads: Dict[int, int] = {}
+        self.count = 0
+        self._tif = tif
+        self._write(trace_header(tif))
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            if self._fh is not None:
+                self._fh.write(line + "\n")
+
+    @contextmanager
+    def record(self, tif, op: str, series, selection, x: int, y: int, width: int,
+               height: int, level: int, parallel: bool) -> Iterator[None]:
+        """Time the read run inside the block and write its record."""
+        plan = build_plan(tif, series, selection, level, x, y, width, height)
+        started = time.perf_counter()
+        yield
+        duration = time.perf_counter() - started
+        thread = threading.get_ident()
+        with self._lock:
+            thread_index = self._threads.setdefault(thread, len(self._threads))
+            self.count += 1
+        self._write({
+            "t": round(started - self._start, 6),
+            "th": thread_index,
+            "op": op,
+            "layers": [int(i) for i in selection.indices],
+            "pos": [x, y],
+            "shape": [width, height],
+            "level": level,
+            "parallel": parallel,
+            "dur": round(duration, 6),
+            "segments": plan.segments,
+            "cached": plan.cached_segments,
+        })
+
+    def close(self) -> None:
+        """Stop recording and close the trace file."""
+        with self._lock:
+            fh, self._fh = self._fh, None
+        if fh is not None:
+            fh.close()
+        if self._tif is not None and self._tif._trace is self:
+            self._tif._trace = None
+        self._tif = None
+
+
+def load_trace(path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return the (header, records) of a trace file."""
+    with _open_text(path, "r") as fh:
+        lines = [json.loads(line) for line in fh if line.strip()]
+    if not lines or lines[0].get("type") != "header":
+        raise ValueError(f"{path} is not an mxtifffile trace")
+    header = lines[0]
+    if header.get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version {header.get('version')}")
+    return header, lines[1:]
+
+
+def _synthetic_tiles(shape, tile, layers: int, dtype, seed: int):
+    """Yield smooth-noise tiles of every layer, in TiffWriter tile order."""
+    height, width = shape
+    tile_height, tile_width = tile
+    info = np.iinfo(dtype) if dtype.kind in "ui" else None
+    high = min(info.max, 4000) if info is not None else 1.0
+    for layer in range(layers):
+        rng = np.random.default_rng([seed, layer])
+        for y in range(0, height, tile_height):
+            for x in range(0, width, tile_width):
+                coarse = rng.uniform(0, high * 0.9, (tile_height // 16 + 1, tile_width // 16 + 1))
+                data = np.repeat(np.repeat(coarse, 16, axis=0), 16, axis=1)
+                data = data[:tile_height, :tile_width] + rng.uniform(0, high * 0.1, (tile_height, tile_width))
+                yield data.astype(dtype)
+
+
+def synthesize_file(header: Dict[str, Any], path: Optional[str] = None, seed: int = 0) -> str:
+    """
+    Write a pyramidal OME-TIFF with the geometry in a trace header and return its path.
+
+    Pixel data is smooth noise, so tiles compress to realistic sizes. Levels
+    without tiles are written with 256x256 tiles; compressions that cannot
+    be written are replaced by zlib.
+    """
+    import tifffile
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="mxtiff-replay-"), "synthetic.ome.tif")
+    dtype = np.dtype(header["dtype"])
+    layers = int(header["layers"])
+    names = [f"Layer{i}" for i in range(layers)]
+    levels = header["levels"]
+    with tifffile.TiffWriter(path, ome=True, bigtiff=True) as writer:
+        for index, level in enumerate(levels):
+            shape = tuple(level["shape"])
+            tile = tuple(level["tile"] or (256, 256))
+            compression = _SYNTHETIC_COMPRESSIONS.get(level["compression"], "zlib")
+            if compression in ("jpeg", "webp") and dtype != np.uint8:
+                compression = "zlib"
+            kwargs = {"tile": tile, "compression": compression, "shape": (layers,) + shape,
+                      "dtype": dtype}
+            if index == 0:
+                kwargs["subifds"] = len(levels) - 1
+                kwargs["metadata"] = {"axes": "CYX", "Channel": {"Name": names}}
+            else:
+                kwargs["subfiletype"] = 1
+            writer.write(_synthetic_tiles(shape, tile, layers, dtype, seed + index), **kwargs)
+    return path
+
+
+@dataclass
+class ReplayReport:
+    """Latency, throughput and cache statistics of a trace replay."""
+
+    requests: int
+    errors: int
+    wall_seconds: float
+    concurrency: int
+    latencies: np.ndarray = field(repr=False)
+    recorded_latencies: np.ndarray = field(repr=False)
+    decoded_bytes: int
+    segments: int
+    cached_segments: int
+    recorded_hit_rate: Optional[float]
+    cache_stats: Dict[str, int]
+
+    @property
+    def throughput(self) -> float:
+        """Requests per second."""
+        return self.requests / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Fraction of touched tiles or strips that were cached during the replay."""
+        return self.cached_segments / self.segments if self.segments else None
+
+    def percentiles(self, q=(50, 90, 99), recorded: bool = False) -> Dict[str, float]:
+        """Latency percentiles in seconds, of the replay or of the recorded trace."""
+        values = self.recorded_latencies if recorded else self.latencies
+        if values.size == 0:
+            return {}
+        result = {f"p{p:g}": float(v) for p, v in zip(q, np.percentile(values, q))}
+        result["max"] = float(values.max())
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "wall_seconds": self.wall_seconds,
+            "throughput": self.throughput,
+            "decoded_mb_per_second": self.decoded_bytes / 1e6 / self.wall_seconds
+            if self.wall_seconds > 0 else 0.0,
+            "latency": self.percentiles(),
+            "recorded_latency": self.percentiles(recorded=True),
+            "hit_rate": self.hit_rate,
+            "recorded_hit_rate": self.recorded_hit_rate,
+            "cache": self.cache_stats,
+        }
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        def fmt(stats):
+            return "  ".join(f"{k} {v * 1000:.2f} ms" for k, v in stats.items()) or "-"
+
+        def rate(value):
+            return "-" if value is None else f"{value:.1%}"
+
+        lines = [
+            f"requests     {self.requests} ({self.errors} errors), concurrency {self.concurrency}",
+            f"wall time    {self.wall_seconds:.3f} s",
+            f"throughput   {self.throughput:.1f} req/s, "
+            f"{self.decoded_bytes / 1e6 / max(self.wall_seconds, 1e-9):.1f} MB/s decoded",
+            f"latency      {fmt(self.percentiles())}",
+            f"recorded     {fmt(self.percentiles(recorded=True))}",
+            f"hit rate     {rate(self.hit_rate)} (recorded {rate(self.recorded_hit_rate)})",
+        ]
+        if self.cache_stats:
+            lines.append("cache        " + ", ".join(f"{k} {v}" for k, v in self.cache_stats.items()))
+        return "\n".join(lines)
+
+
+def _cache_counters(tif) -> Dict[str, int]:
+    cache = tif._page_cache
+    if cache is None:
+        return {}
+    return {k: v for k, v in cache.stats().items() if k in ("hits", "misses", "coalesced")}
+
+
+def replay_trace(trace, tif=None, concurrency: int = 1, speed: Optional[float] = None,
+                 repeat: int = 1, parallel: Optional[bool] = None,
+                 **open_kwargs) -> ReplayReport:
+    """
+    Run the reads of a trace and measure them.
+
+    Parameters:
+    -----------
+    trace : str or (header, records)
+        Trace file written by MxTiffFile.record_trace, or load_trace output
+    tif : MxTiffFile, str or None
+        File to replay against; None writes a synthetic file with the
+        geometry recorded in the trace header
+    concurrency : int
+        Threads issuing requests (default: 1)
+    speed : float or None
+        Issue requests at their recorded times scaled by 1/speed (1.0 is
+        real time); None issues them as fast as the threads allow
+    repeat : int
+        Times to run the trace; later passes see a warm cache (default: 1)
+    parallel : bool or None
+        Override the recorded per-request parallel flag
+    **open_kwargs :
+        Arguments for MxTiffFile when tif is a path or None, e.g.
+        enable_cache, tile_cache or disk_cache
+
+    Returns:
+    --------
+    ReplayReport
+    """
+    from .mxtifffile import MxTiffFile
+
+    header, records = load_trace(trace) if isinstance(trace, (str, os.PathLike)) else trace
+    owned = not isinstance(tif, MxTiffFile)
+    if owned:
+        tif = MxTiffFile(tif if tif is not None else synthesize_file(header), **open_kwargs)
+    try:
+        n_layers = len(tif.series[0].levels[0].pages)
+        n_levels = len(tif.series[0].levels)
+        if int(header["layers"]) > n_layers or len(header["levels"]) > n_levels:
+            raise ValueError("The file has fewer layers or levels than the trace")
+
+        latencies = []
+        segments = [0, 0]
+        decoded = [0]
+        errors = [0]
+        lock = threading.Lock()
+
+        def run(record):
+            level = int(record["level"])
+            x, y = record["pos"]
+            width, height = record["shape"]
+            series = tif.series[0].levels[level]
+            selection = tif.channel_index.compile(record["layers"], len(series.pages))
+            plan = build_plan(tif, series, selection, level, x, y, width, height)
+            use_parallel = record.get("parallel", False) if parallel is None else parallel
+            started = time.perf_counter()
+            try:
+                if record.get("op") == "render":
+                    tif.render(selection, pos=(x, y), shape=(width, height), level=level)
+                else:
+                    tif.read_region(selection, pos=(x, y), shape=(width, height), level=level,
+                                    parallel=use_parallel)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                return
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                segments[0] += plan.segments
+                segments[1] += plan.cached_segments
+                decoded[0] += width * height * len(selection) * series.pages[0].dtype.itemsize
+
+        before = _cache_counters(tif)
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for _ in range(repeat):
+                pass_start = time.perf_counter()
+                futures = []
+                for record in records:
+                    if speed is not None:
+                        delay = record["t"] / speed - (time.perf_counter() - pass_start)
+                        if delay > 0:
+                            time.sleep(delay)
+                    futures.append(pool.submit(run, record))
+                for future in futures:
+                    future.result()
+        wall = time.perf_counter() - wall_start
+        after = _cache_counters(tif)
+    finally:
+        if owned:
+            tif.close()
+
+    recorded_segments = sum(r.get("segments", 0) for r in records)
+    recorded_cached = sum(r.get("cached", 0) for r in records)
+    return ReplayReport(
+        requests=len(latencies) + errors[0],
+        errors=errors[0],
+        wall_seconds=wall,
+        concurrency=concurrency,
+        latencies=np.asarray(latencies),
+        recorded_latencies=np.asarray([r["dur"] for r in records]),
+        decoded_bytes=decoded[0],
+        segments=segments[0],
+        cached_segments=segments[1],
+        recorded_hit_rate=recorded_cached / recorded_segments if recorded_segments else None,
+        cache_stats={k: after[k] - before.get(k, 0) for k in after},
+    )
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .exceptions import MxTiffCorruptTileError
+from .parallel import QUEUE_PER_WORKER, bounded_map
+
+# Tiles decoded per page in fast mode
+_DEFAULT_SAMPLE = 8
+# Segments decoded per task; amortizes scheduling over small tiles
+_BATCH = 32
+
+
+@dataclass
+class TileProblem:
+    """A tile or strip that cannot be read, located by series, level, page and pixel."""
+
+    series: int
+    level: int
+    page: int
+    ifd: int
+    index: int
+    y: int
+    x: int
+    offset: int
+    bytecount: int
+    reason: str  # 'out_of_bounds', 'truncated', 'missing' or 'decode_error'
+    message: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "series": self.series,
+            "level": self.level,
+            "page": self.page,
+            "ifd": self.ifd,
+            "index": self.index,
+            "y": self.y,
+            "x": self.x,
+            "offset": self.offset,
+            "bytecount": self.bytecount,
+            "reason": self.reason,
+            "message": self.message,
+        }
+
+    def describe(self) -> str:
+        return (f"series {self.series} level {self.level} page {self.page} "
+                f"segment {self.index} at y={self.y} x={self.x} "
+                f"(offset {self.offset}, {self.bytecount} bytes): {self.reason}"
+                + (f" - {self.message}" if self.message else ""))
+
+
+@dataclass
+class VerifyReport:
+    """Outcome of an integrity scan by verify()."""
+
+    path: str
+    file_size: int
+    mode: str
+    pages: int = 0
+    segments: int = 0
+    segments_decoded: int = 0
+    problems: List[TileProblem] = field(default_factory=list)
+    unsupported_pages: List[Tuple[int, int, int]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "file_size": self.file_size,
+            "mode": self.mode,
+            "ok": self.ok,
+            "pages": self.pages,
+            "segments": self.segments,
+            "segments_decoded": self.segments_decoded,
+            "problems": [p.to_dict() for p in self.problems],
+            "unsupported_pages": [list(p) for p in self.unsupported_pages],
+            "seconds": self.seconds,
+        }
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        status = "OK" if self.ok else f"{len(self.problems)} bad segments"
+        lines = [f"{self.path}: {status} ({self.mode} scan)",
+                 f"checked      {self.segments} segments in {self.pages} pages, "
+                 f"{self.segments_decoded} decoded in {self.seconds:.3f} s"]
+        if self.unsupported_pages:
+            lines.append(f"not decoded  {len(self.unsupported_pages)} pages with "
+                         f"unsupported compression")
+        lines.extend("  " + p.describe() for p in self.problems)
+        return "\n".join(lines)
+
+
+def _segment_origin(page, index: int) -> Tuple[int, int]:
+    """Pixel (y, x) of the top-left corner of a tile or strip."""
+    key = page.keyframe
+    if key.is_tiled:
+        cols = -(-key.imagewidth // key.tilewidth)
+        rows = -(-key.imagelength // key.tilelength)
+        index %= rows * cols  # planes of planar-separate pages repeat the grid
+        return (index // cols) * key.tilelength, (index % cols) * key.tilewidth
+    rows_per_strip = min(key.rowsperstrip or key.imagelength, key.imagelength)
+    strips = -(-key.imagelength // rows_per_strip)
+    return (index % strips) * rows_per_strip, 0
+
+
+def _pages(tif, levels: Optional[int]):
+    """Yield (series, level, page, TiffPage) of every distinct page of the file."""
+    seen = set()
+    for s, series in enumerate(tif.series):
+        pyramid = series.levels
+        for level, entry in enumerate(pyramid[:levels]):
+            for p, page in enumerate(entry.pages):
+                if page is None or page.offset in seen:
+                    continue
+                seen.add(page.offset)
+                yield s, level, p, page
+
+
+def _check_offsets(page, file_size: int, where: Tuple[int, int, int]) -> Tuple[List[TileProblem],
+                                                                                 np.ndarray]:
+    """Check segment extents against the file; return problems and indices safe to decode."""
+    key = page.keyframe
+    offsets = np.asarray(page.dataoffsets, dtype=np.int64)
+    counts = np.asarray(page.databytecounts, dtype=np.int64)
+    expected = int(np.prod(key.chunked))
+    problems = []
+
+    def problem(index, reason, message, offset=0, bytecount=0):
+        y, x = _segment_origin(page, index)
+        problems.append(TileProblem(*where, page.index, int(index), int(y), int(x),
+                                    int(offset), int(bytecount), reason, message))
+
+    for index in range(len(offsets), expected):
+        problem(index, "missing", f"page has {len(offsets)} of {expected} segments")
+    n = min(len(offsets), len(counts), expected)
+    offsets, counts = offsets[:n], counts[:n]
+    written = counts > 0
+    beyond = written & (offsets >= file_size)
+    short = written & ~beyond & (offsets + counts > file_size)
+    for index in np.flatnonzero(beyond):
+        problem(index, "out_of_bounds", f"starts after end of file ({file_size} bytes)",
+                offsets[index], counts[index])
+    for index in np.flatnonzero(short):
+        problem(index, "truncated",
+                f"{offsets[index] + counts[index] - file_size} bytes past end of file",
+                offsets[index], counts[index])
+    return problems, np.flatnonzero(written & ~beyond & ~short)
+
+
+def verify(tif, fast: bool = False, sample: Optional[int] = None, levels: Optional[int] = None,
+           max_workers: Optional[int] = None, seed: Optional[int] = 0) -> VerifyReport:
+    """Check the tiles and strips of *tif* for corruption; see MxTiffFile.verify."""
+    start = time.perf_counter()
+    file_size = tif.filehandle.size
+    report = VerifyReport(str(tif.file_path), file_size, "fast" if fast else "full")
+    if sample is None:
+        sample = _DEFAULT_SAMPLE
+    rng = random.Random(seed)
+
+    tasks = []
+    for s, level, p, page in _pages(tif, levels):
+        where = (s, level, p)
+        report.pages += 1
+        problems, valid = _check_offsets(page, file_size, where)
+        report.segments += len(page.dataoffsets)
+        report.problems.extend(problems)
+        if fast and len(valid) > sample:
+            # Truncated writes show first in the segment stored last in the
+            # file, which need not have the highest index
+            offsets = np.asarray(page.dataoffsets, dtype=np.int64)[valid]
+            last = int(np.argmax(offsets))
+            others = [i for i in range(len(valid)) if i != last]
+            chosen = rng.sample(others, max(0, sample - 1)) + [last]
+            valid = [valid[i] for i in sorted(chosen)]
+        valid = [int(i) for i in valid]
+        for i in range(0, len(valid), _BATCH):
+            tasks.append((where, page, valid[i:i + _BATCH]))
+
+    lock = threading.Lock()
+    unsupported = set()
+
+    def decode_batch(where, page, indices) -> None:
+        decoded = 0
+        problems = []
+        for index in indices:
+            if where in unsupported:
+                break
+            try:
+                tif._decode_segment(page, index)
+            except NotImplementedError:
+                with lock:
+                    unsupported.add(where)
+                break
+            except MxTiffCorruptTileError as exc:
+                y, x = _segment_origin(page, index)
+                problems.append(TileProblem(*where, exc.ifd, exc.index, y, x, exc.offset,
+                                            exc.bytecount, exc.reason, str(exc.__cause__ or exc)))
+            else:
+                decoded += 1
+        with lock:
+            report.segments_decoded += decoded
+            report.problems.extend(problems)
+
+    workers = max(1, max_workers or tif._max_workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in bounded_map(pool, lambda task: decode_batch(*task), tasks,
+                             workers * QUEUE_PER_WORKER):
+            pass
+
+    report.problems.sort(key=lambda p: (p.series, p.level, p.page, p.index))
+    report.unsupported_pages = sorted(unsupported)
+    report.seconds = time.perf_counter() - start
+    return report
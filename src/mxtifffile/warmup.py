@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Fraction of a bounded tile cache filled by default, leaving room for traffic
+_DEFAULT_BUDGET_FRACTION = 0.5
+# Niceness of the warm-up thread where threads can be reprioritized (Linux)
+_BACKGROUND_NICE = 19
+# Tiles loaded between progress callbacks
+_PROGRESS_EVERY = 16
+
+Region = Tuple[Any, Tuple[int, int], Tuple[int, int], int]
+
+
+class WarmupJob:
+    """
+    Handle of a cache warm-up started by MxTiffFile.warm_cache.
+
+    Counters are updated as the warm-up runs: ``loaded`` tiles were decoded
+    into the cache, ``skipped`` were cached already, ``failed`` could not be
+    decoded. ``stop_reason`` is None while running, then 'done', 'budget',
+    'timeout', 'cancelled' or 'error'.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.loaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.stop_reason: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def fraction(self) -> float:
+        """Fraction of the planned tiles handled so far."""
+        if not self.total:
+            return 1.0
+        return (self.loaded + self.skipped + self.failed) / self.total
+
+    def progress(self) -> Dict[str, Any]:
+        """Snapshot of the counters."""
+        end = self.finished if self.finished is not None else time.monotonic()
+        return {
+            "total": self.total,
+            "loaded": self.loaded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "fraction": self.fraction,
+            "seconds": end - self.started,
+            "stop_reason": self.stop_reason,
+        }
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the warm-up to finish; return True if it did."""
+        return self._done.wait(timeout)
+
+    def cancel(self, wait: bool = True) -> None:
+        """Stop after the tile being loaded."""
+        self._cancel.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __repr__(self) -> str:
+        return (f"WarmupJob({self.loaded + self.skipped + self.failed}/{self.total} tiles, "
+                f"{self.bytes / 2**20:.1f} MiB, {self.stop_reason or 'running'})")
+
+
+def regions_from_trace(trace, top: Optional[int] = None) -> List[Region]:
+    """
+    Return the regions read in a trace, most frequently read first.
+
+    Parameters:
+    -----------
+    trace : str or (header, records)
+        Trace written by MxTiffFile.record_trace, or load_trace output
+    top : int or None
+        Keep only this many distinct regions
+    """
+    from .trace import load_trace
+
+    _, records = load_trace(trace) if isinstance(trace, (str, os.PathLike)) else trace
+    counts = Counter((tuple(r["layers"]), tuple(r["pos"]), tuple(r["shape"]), int(r["level"]))
+                     for r in records)
+    return [(list(layers), pos, shape, level)
+            for (layers, pos, shape, level), _ in counts.most_common(top)]
+
+
+def overview_regions(tif, layers=None, levels: Optional[int] = None) -> List[Region]:
+    """
+    Return whole-level regions from the lowest resolution level upward, the
+    order in which viewers request a slide. *levels* limits how many levels.
+    """
+    pyramid = tif.series[0].levels
+    order = list(range(len(pyramid) - 1, -1, -1))[:levels]
+    regions = []
+    for level in order:
+        height, width = pyramid[level].pages[0].shape[:2]
+        regions.append((layers, (0, 0), (width, height), level))
+    return regions
+
+
+def _plan_tasks(tif, regions: Iterable[Region]) -> List[tuple]:
+    """Expand regions into distinct cache loads, in order of first appearance."""
+    tasks: Dict[Any, tuple] = {}
+    for layers, pos, shape, level in regions:
+        series, selection, x, y, width, height = tif._resolve_region(layers, pos, shape, level)
+        for idx in selection.indices:
+            page = series.pages[idx]
+            page_key = tif._page_key(level, idx)
+            path = tif._read_path(page)
+            if path == "tile_cache":
+                n_offsets = len(page.dataoffsets)
+                for tile_idx in tif._segment_indices(page, y, x, height, width):
+                    if tile_idx < n_offsets:
+                        key = tif._tile_cache_key(page_key, tile_idx)
+                        tasks.setdefault(key, ("tile", key, page_key, page, tile_idx))
+            elif path != "mmap":
+                # Regions of untiled pages are cached whole, by their exact extent
+                key = tif._region_cache_key(page_key, y, x, height, width)
+                tasks.setdefault(key, ("region", key, page_key, page, (y, x, height, width)))
+    return list(tasks.values())
+
+
+def _lower_priority() -> None:
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _BACKGROUND_NICE)
+    except (AttributeError, OSError):
+        # Only Linux reprioritizes single threads; elsewhere rely on yielding
+        pass
+
+
+def warm_cache(tif, regions: Optional[Iterable[Region]] = None, layers=None,
+               max_bytes: Optional[int] = None, max_seconds: Optional[float] = None,
+               max_tiles: Optional[int] = None, background: bool = True,
+               idle_seconds: float = 0.05,
+               progress: Optional[Callable[[WarmupJob], None]] = None) -> WarmupJob:
+    """Fill the tile cache of *tif* with regions; see MxTiffFile.warm_cache."""
+    cache = tif._page_cache
+    if cache is None:
+        raise ValueError("warm_cache needs enable_cache=True")
+    if regions is None:
+        regions = overview_regions(tif, layers)
+    if max_bytes is None and getattr(cache, "max_bytes", None) is not None:
+        max_bytes = int(cache.max_bytes * _DEFAULT_BUDGET_FRACTION)
+
+    tasks = _plan_tasks(tif, regions)
+    if max_tiles is not None:
+        tasks = tasks[:max_tiles]
+    job = WarmupJob(len(tasks))
+
+    def run():
+        if background:
+            _lower_priority()
+        deadline = None if max_seconds is None else job.started + max_seconds
+        reason = "done"
+        try:
+            for count, (kind, key, page_key, page, where) in enumerate(tasks, 1):
+                if job._cancel.is_set():
+                    reason = "cancelled"
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    reason = "timeout"
+                    break
+                if max_bytes is not None and job.bytes >= max_bytes:
+                    reason = "budget"
+                    break
+                # Back off while foreground reads run, and for idle_seconds after
+                while (background and not job._cancel.is_set()
+                       and (tif._reads_in_flight > 0
+                            or time.monotonic() - tif._last_read < idle_seconds)):
+                    job._cancel.wait(idle_seconds)
+
+                if key in cache:
+                    job.skipped += 1
+                else:
+                    try:
+                        if kind == "tile":
+                            value = cache.get_or_load(
+                                key, lambda: tif._load_tile_persistent(page_key, page, where))
+                        else:
+                            value = cache.get_or_load(
+                                key, lambda: tif._read_page_region_optimized(page, *where))
+                    except Exception:
+                        job.failed += 1
+                    else:
+                        job.loaded += 1
+                        job.bytes += int(getattr(value, "nbytes", 0))
+                if progress is not None and count % _PROGRESS_EVERY == 0:
+                    progress(job)
+        except BaseException as exc:
+            reason = "error"
+            job.error = exc
+        finally:
+            job.stop_reason = reason
+            job.finished = time.monotonic()
+            job._done.set()
+            if progress is not None:
+                progress(job)
+
+    if not background:
+        run()
+        return job
+    job._thread = threading.Thread(target=run, name="mxtifffile-warmup", daemon=True)
+    tif._warmups = [j for j in tif._warmups if not j.done] + [job]
+    job._thread.start()
+    return job
@@ -26,3 +26,32 @@ def ome_tiff_path_2():
     if not path.exists():
         pytest.skip(f"Test data not found: {path}")
     return path
+
+
+SYNTHETIC_CHANNELS = ["DAPI", "CD8", "PanCK", "Ki67"]
+
+
+def write_synthetic_ome(path, shape=(300, 400), tile=(64, 64), levels=2,
+                        compression="zlib", channels=SYNTHETIC_CHANNELS, seed=0):
+    """Write a small tiled pyramidal OME-TIFF and return the level 0 data."""
+    import numpy as np
+    import tifffile
+
+    rng = np.random.default_rng(seed)
+    data = rng.integers(0, 4000, (len(channels),) + tuple(shape)).astype("uint16")
+    with tifffile.TiffWriter(str(path), ome=True) as writer:
+        writer.write(data, tile=tile, compression=compression, subifds=levels - 1,
+                     metadata={"axes": "CYX", "Channel": {"Name": list(channels)}})
+        for level in range(1, levels):
+            step = 2 ** level
+            writer.write(data[:, ::step, ::step], tile=tile, compression=compression,
+                         subfiletype=1)
+    return data
+
+
+@pytest.fixture
+def synthetic_ome(tmp_path):
+    """Path and level 0 pixel data of a generated 4-channel tiled OME-TIFF."""
+    path = tmp_path / "synthetic.ome.tif"
+    data = write_synthetic_ome(path)
+    return path, data
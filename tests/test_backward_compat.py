@@ -28,3 +28,35 @@ def test_qptifffile_is_mxtifffile_instance(qptiff_path):
         tif = QPTiffFile(str(qptiff_path))
     assert isinstance(tif, MxTiffFile)
     tif.close()
+
+
+def test_package_import_is_lazy():
+    import subprocess
+    import sys
+    code = ("import sys, mxtifffile; "
+            "print('tifffile' in sys.modules, 'concurrent.futures' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True)
+    assert out.stdout.strip() == "False False"
+
+
+def test_reader_import_skips_feature_modules():
+    import subprocess
+    import sys
+    # tifffile itself imports concurrent.futures, so only our own heavy
+    # modules and their stdlib dependencies are checked here
+    lazy = ["gzip", "hashlib", "mxtifffile.convert", "mxtifffile.disk_cache", "mxtifffile.export",
+            "mxtifffile.ngff", "mxtifffile.planner", "mxtifffile.quantify", "mxtifffile.render",
+            "mxtifffile.stats", "mxtifffile.tissue", "mxtifffile.trace", "mxtifffile.verify",
+            "mxtifffile.warmup"]
+    code = (f"import sys; from mxtifffile import MxTiffFile; "
+            f"print([m for m in {lazy!r} if m in sys.modules])")
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_public_names_resolve():
+    import mxtifffile
+    for name in mxtifffile.__all__:
+        assert getattr(mxtifffile, name) is not None
@@ -0,0 +1,41 @@
+from mxtifffile import MxTiffFile
+from mxtifffile.buffers import BufferPool
+
+
+def test_acquire_rounds_up_and_reuses():
+    pool = BufferPool()
+    buf = pool.acquire(5000)
+    assert buf.nbytes == 8192
+    pool.release(buf)
+    assert pool.acquire(6000) is buf
+    stats = pool.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["in_use_bytes"] == 8192
+
+
+def test_high_water_mark_and_free_limit():
+    pool = BufferPool(max_free_bytes=4096)
+    a = pool.acquire(4096)
+    b = pool.acquire(4096)
+    pool.release(a)
+    pool.release(b)
+    stats = pool.stats()
+    assert stats["high_water_bytes"] == 8192
+    assert stats["free_bytes"] == 4096 and stats["in_use_bytes"] == 0
+
+
+def test_borrow_yields_exact_size():
+    pool = BufferPool()
+    with pool.borrow(100) as view:
+        assert view.nbytes == 100
+    assert pool.stats()["free_bytes"] == 4096
+
+
+def test_tiled_reads_reuse_pooled_buffers(synthetic_ome):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path), enable_cache=False) as tif:
+        for x in range(0, 300, 50):
+            assert (tif.read_region("CD8", pos=(x, 10), shape=(90, 70)) == data[1, 10:80, x:x + 90]).all()
+        stats = tif.buffer_pool.stats()
+    assert stats["in_use_bytes"] == 0
+    assert stats["hits"] > stats["misses"]
@@ -0,0 +1,71 @@
+import numpy as np
+
+from mxtifffile.cache import TileCache, file_identity
+
+
+def test_lru_eviction_by_entries():
+    cache = TileCache(max_entries=2)
+    cache.put("a", np.zeros(4))
+    cache.put("b", np.zeros(4))
+    cache.get("a")
+    cache.put("c", np.zeros(4))
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    cache = TileCache(max_entries=None, max_bytes=100)
+    cache.put("a", np.zeros(10, dtype=np.uint64))
+    cache.put("b", np.zeros(10, dtype=np.uint64))
+    assert len(cache) == 1 and cache.nbytes == 80
+
+
+def test_file_identity_changes_when_file_is_rewritten(tmp_path):
+    path = tmp_path / "f.bin"
+    path.write_bytes(b"1234")
+    first = file_identity(path)
+    path.write_bytes(b"123456")
+    assert file_identity(path) != first
+
+
+def test_get_or_load_runs_loader_once_for_concurrent_misses():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = TileCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return np.arange(4)
+
+    def fetch(_):
+        barrier.wait()
+        return cache.get_or_load("tile", loader)
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(fetch, range(8)))
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 7
+
+
+def test_get_or_load_propagates_errors_and_retries():
+    cache = TileCache()
+
+    def failing():
+        raise OSError("read failed")
+
+    try:
+        cache.get_or_load("k", failing)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("expected OSError")
+    assert "k" not in cache
+    assert cache.get_or_load("k", lambda: 5) == 5
@@ -0,0 +1,69 @@
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.channel_index import ChannelIndex, LayerSelection
+
+
+def _channels():
+    return [
+        {"index": 0, "biomarker": "DAPI", "fluorophore": "DAPI", "display_name": "Nuclei"},
+        {"index": 1, "biomarker": "CD8", "fluorophore": "Opal 520", "display_name": None},
+        {"index": 2, "biomarker": "CD8", "fluorophore": "Opal 570", "display_name": None},
+        {"index": 3, "biomarker": "PanCK", "fluorophore": "DAPI2", "display_name": None},
+    ]
+
+
+def test_resolve_biomarker_returns_all_duplicates():
+    index = ChannelIndex(_channels())
+    assert index.resolve("CD8") == (1, 2)
+
+
+def test_resolve_fluorophore_and_display_name():
+    index = ChannelIndex(_channels())
+    assert index.resolve("Opal 570") == (2,)
+    assert index.resolve("Nuclei") == (0,)
+
+
+def test_case_insensitive_lookup():
+    assert ChannelIndex(_channels()).resolve("dapi") is None
+    assert ChannelIndex(_channels(), case_sensitive=False).resolve("dapi") == (0,)
+
+
+def test_alias_resolves_to_target_but_not_over_real_names():
+    index = ChannelIndex(_channels(), aliases={"Hoechst": "DAPI", "CD8": "PanCK"})
+    assert index.resolve("Hoechst") == (0,)
+    assert index.resolve("CD8") == (1, 2)
+
+
+def test_compile_validates_and_deduplicates():
+    index = ChannelIndex(_channels())
+    selection = index.compile(["CD8", 1, "PanCK"], n_pages=4)
+    assert selection.indices == (1, 2, 3)
+    assert selection.names == ("CD8", "CD8", "PanCK")
+    with pytest.raises(ValueError):
+        index.compile("missing", n_pages=4)
+    with pytest.raises(ValueError):
+        index.compile(7, n_pages=4)
+    with pytest.raises(TypeError):
+        index.compile([1.5], n_pages=4)
+
+
+def test_parse_tokens_prefers_channel_names():
+    channels = _channels() + [{"index": 4, "biomarker": "2", "fluorophore": None,
+                               "display_name": None}]
+    index = ChannelIndex(channels)
+    # "2" is the name of page 4; "3" is not a name and selects page 3
+    assert index.parse_tokens(["DAPI", "2", "3"]) == ["DAPI", "2", 3]
+    assert index.compile(index.parse_tokens(["2", "3"]), n_pages=5).indices == (4, 3)
+
+
+def test_select_is_reused_and_accepted_by_read_region(synthetic_ome):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path), case_sensitive=False, channel_aliases={"Hoechst": "DAPI"}) as tif:
+        selection = tif.select(["hoechst", "CD8"])
+        assert isinstance(selection, LayerSelection)
+        assert tif.select(["hoechst", "CD8"]) is selection
+        region = tif.read_region(selection, pos=(5, 7), shape=(40, 30))
+    assert region.shape == (30, 40, 2)
+    assert (region[:, :, 0] == data[0, 7:37, 5:45]).all()
+    assert (region[:, :, 1] == data[1, 7:37, 5:45]).all()
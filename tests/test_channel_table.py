@@ -0,0 +1,77 @@
+import json
+import pickle
+
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.channel_table import CHANNEL_FIELDS, ChannelTable
+from mxtifffile.parsers import _empty_channel
+
+
+def _dicts():
+    xml = "<PerkinElmer-QPI-ImageDescription><Biomarker>DAPI</Biomarker></PerkinElmer-QPI-ImageDescription>"
+    first = _empty_channel(0, xml)
+    first.update(biomarker="DAPI", fluorophore="DAPI", exposure="100")
+    second = _empty_channel(1, xml)
+    second.update(biomarker="CD8", fluorophore="Opal 520")
+    return [first, second]
+
+
+def test_round_trip_to_dicts():
+    dicts = _dicts()
+    table = ChannelTable.from_dicts(dicts)
+    assert len(table) == 2
+    assert table.to_dicts() == dicts
+    assert table == dicts
+
+
+def test_view_is_dict_compatible():
+    table = ChannelTable.from_dicts(_dicts())
+    ch = table[1]
+    assert ch["biomarker"] == "CD8"
+    assert ch.get("description") is None
+    assert ch.get("missing", "N/A") == "N/A"
+    assert list(ch) == list(CHANNEL_FIELDS)
+    assert dict(ch) == _dicts()[1]
+    assert table[-1]["index"] == 1
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_raw_xml_is_stored_once():
+    table = ChannelTable.from_dicts(_dicts())
+    assert len(table._xml_pool) == 1
+    assert table[0]["raw_xml"] == table[1]["raw_xml"] == _dicts()[0]["raw_xml"]
+
+
+def test_strings_are_interned():
+    table = ChannelTable.from_dicts(_dicts())
+    assert table[0]["fluorophore"] is table[0]["biomarker"]
+
+
+def test_view_assignment_and_extra_keys():
+    table = ChannelTable.from_dicts(_dicts())
+    table[0]["biomarker"] = "Hoechst"
+    table[0]["panel"] = "A"
+    assert table.column("biomarker") == ["Hoechst", "CD8"]
+    assert table[0]["panel"] == "A"
+    assert table.column("panel") == ["A", None]
+
+
+def test_table_pickles():
+    table = ChannelTable.from_dicts(_dicts())
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_mxtifffile_channel_info_is_plain_dicts(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        assert isinstance(tif._channel_table, ChannelTable)
+        info = tif.get_channel_info()
+        assert info is tif.channel_info
+        assert all(isinstance(ch, dict) for ch in info)
+        assert [ch.get("biomarker") for ch in info] == tif.biomarkers
+        assert json.loads(json.dumps(tif.channel_info)) == tif._channel_table.to_dicts()
+        # Caller changes persist, as with the parser's list of dicts
+        info[0].setdefault("note", "checked")
+        assert tif.channel_info[0]["note"] == "checked"
@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pytest
+import tifffile
+
+from mxtifffile import MxTiffFile
+from mxtifffile.cli import main
+from mxtifffile.convert import downsample2, pyramid_shapes
+
+
+@pytest.fixture
+def striped_tiff(tmp_path):
+    """Non-pyramidal, striped LZW OME-TIFF with odd dimensions and a pixel size."""
+    data = np.random.default_rng(0).integers(0, 4000, (3, 301, 523)).astype("uint16")
+    path = tmp_path / "striped.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, rowsperstrip=7, compression="lzw",
+                     resolution=(20000, 20000), resolutionunit="CENTIMETER",
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8", "Ki67"]}})
+    return path, data
+
+
+def test_pyramid_shapes_and_downsample():
+    assert pyramid_shapes(301, 523, 64) == [(301, 523), (151, 262), (76, 131), (38, 66), (19, 33)]
+    assert pyramid_shapes(301, 523, 64, levels=2) == [(301, 523), (151, 262)]
+    assert pyramid_shapes(10, 10, 512) == [(10, 10)]
+
+    band = np.array([[0, 1, 9], [3, 4, 9], [7, 7, 7]], dtype=np.uint16)
+    assert downsample2(band).tolist() == [[2, 9], [7, 7]]
+    assert downsample2(band, "nearest").tolist() == [[0, 9], [7, 7]]
+    assert downsample2(band.astype(np.float32)).tolist() == [[2.0, 9.0], [7.0, 7.0]]
+    with pytest.raises(ValueError, match="downsampling"):
+        downsample2(band, "cubic")
+
+
+def test_convert_striped_file(striped_tiff, tmp_path):
+    path, data = striped_tiff
+    out = tmp_path / "converted.ome.tif"
+    with MxTiffFile(str(path)) as tif:
+        report = tif.convert(str(out), layers=["Ki67", "DAPI"], tile=64, max_workers=2,
+                             temp_dir=str(tmp_path))
+    assert report.channels == ["Ki67", "DAPI"] and len(report.shapes) == 5
+    assert not list(tmp_path.glob("mxtifffile-convert-*"))
+
+    with MxTiffFile(str(out)) as converted:
+        assert converted.format_id == "ome-tiff" and converted.biomarkers == ["Ki67", "DAPI"]
+        levels = converted.series[0].levels
+        assert [l.shape for l in levels] == [(2,) + s for s in pyramid_shapes(301, 523, 64)]
+        page = levels[0].pages[0]
+        assert (page.tilelength, page.tilewidth) == (64, 64) and converted._is_fast_tiled(page)
+        assert 'PhysicalSizeX="0.5"' in converted.pages[0].description
+
+        assert np.array_equal(converted.read_region(None), np.moveaxis(data[[2, 0]], 0, 2))
+        expected = data[0]
+        for level in range(1, len(levels)):
+            expected = downsample2(expected)
+            assert np.array_equal(converted.read_region("DAPI", level=level), expected)
+
+
+def test_convert_decodes_each_source_tile_once(synthetic_ome, tmp_path):
+    path, data = synthetic_ome
+    out = tmp_path / "converted.ome.tif"
+    with MxTiffFile(str(path)) as tif:
+        calls = []
+        read = tif._read_page_region_optimized
+        tif._read_page_region_optimized = lambda page, *region: (calls.append(region)
+                                                                  or read(page, *region))
+        tif.convert(str(out), tile=32, levels=2, compression="zstd", downsample="nearest")
+    # 64-pixel source tiles are read in 64-row bands of 32-pixel output tiles
+    assert len(calls) == 4 * 5 and all(y % 64 == 0 and x == 0 for y, x, _, _ in calls)
+    with MxTiffFile(str(out)) as converted:
+        assert np.array_equal(converted.read_region(None), np.moveaxis(data, 0, 2))
+        assert np.array_equal(converted.read_region("CD8", level=1), data[1, ::2, ::2])
+
+
+def test_convert_bounds_bands_of_single_strip_files(tmp_path, monkeypatch):
+    import mxtifffile.convert
+
+    data = np.random.default_rng(1).integers(0, 4000, (2, 300, 200)).astype("uint16")
+    path = tmp_path / "onestrip.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, rowsperstrip=300, compression="zlib",
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8"]}})
+    # Room for 80 rows of 200 uint16 pixels per band: rounded down to 64
+    monkeypatch.setattr(mxtifffile.convert, "_BAND_BYTES", 80 * 200 * 2)
+    out = tmp_path / "converted.ome.tif"
+    with MxTiffFile(str(path)) as tif:
+        calls = []
+        read = tif._read_page_region_optimized
+        tif._read_page_region_optimized = lambda page, *region: (calls.append(region)
+                                                                  or read(page, *region))
+        tif.convert(str(out), tile=32, levels=2, max_workers=2)
+    assert max(h for _, _, h, _ in calls) == 64 and len(calls) == 2 * 5
+    with MxTiffFile(str(out)) as converted:
+        assert np.array_equal(converted.read_region(None), np.moveaxis(data, 0, 2))
+
+
+def test_convert_errors(synthetic_ome, tmp_path):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        with pytest.raises(ValueError, match="multiple of 16"):
+            tif.convert(str(tmp_path / "out.ome.tif"), tile=100)
+        with pytest.raises(ValueError, match="downsampling"):
+            tif.convert(str(tmp_path / "out.ome.tif"), downsample="cubic")
+        with pytest.raises(ValueError, match="levels"):
+            tif.convert(str(tmp_path / "out.ome.tif"), levels=0)
+
+
+def test_convert_cli(striped_tiff, tmp_path, capsys):
+    path, data = striped_tiff
+    out = tmp_path / "cli.ome.tif"
+    assert main(["convert", str(path), str(out), "-c", "CD8", "--tile", "128",
+                 "--compression", "none", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["shapes"] == [[523, 301], [262, 151], [131, 76], [66, 38]]
+    with MxTiffFile(str(out)) as converted:
+        assert converted.pages[0].compression == 1
+        assert np.array_equal(converted.read_region("CD8"), data[1])
@@ -0,0 +1,60 @@
+import pytest
+
+from mxtifffile.cache import TileCache
+from mxtifffile.dataset import MxTiffDataset
+from tests.conftest import write_synthetic_ome
+
+
+@pytest.fixture
+def slide_paths(tmp_path):
+    paths = []
+    for i, channels in enumerate((["DAPI", "CD8"], ["DAPI", "PanCK"], ["DAPI", "CD8", "Ki67"])):
+        path = tmp_path / f"slide{i}.ome.tif"
+        write_synthetic_ome(path, shape=(128, 128), channels=channels, seed=i)
+        paths.append(str(path))
+    return paths
+
+
+def test_pool_caps_open_files(slide_paths):
+    with MxTiffDataset(slide_paths, max_open=2) as ds:
+        for i in range(len(ds)):
+            ds.read_region(i, "DAPI", shape=(16, 16))
+        assert ds.open_files == slide_paths[1:]
+
+
+def test_pinned_files_are_not_evicted(slide_paths):
+    with MxTiffDataset(slide_paths, max_open=1) as ds:
+        with ds.open(0) as first:
+            ds.get(1)
+            assert not first.filehandle.closed
+            assert first.read_region("DAPI", shape=(8, 8)).shape == (8, 8)
+        assert ds.open_files == [slide_paths[1]]
+
+
+def test_catalog_answers_marker_queries_without_reopening(slide_paths):
+    with MxTiffDataset(slide_paths, max_open=1) as ds:
+        ds.scan()
+        assert ds.open_files == [slide_paths[-1]]
+        assert ds.files_with_marker("CD8") == [slide_paths[0], slide_paths[2]]
+        assert ds.files_with_marker("ki67", case_sensitive=False) == [slide_paths[2]]
+        assert ds.markers()["DAPI"] == 3
+        assert ds.catalog[slide_paths[0]]["level_shapes"][0] == [128, 128]
+
+
+def test_files_share_one_tile_cache(slide_paths):
+    cache = TileCache(max_entries=100)
+    with MxTiffDataset(slide_paths, max_open=1, tile_cache=cache) as ds:
+        ds.read_region(0, "DAPI", shape=(16, 16))
+        ds.read_region(1, "DAPI", shape=(16, 16))
+        ds.read_region(0, "DAPI", shape=(16, 16))
+        assert len(cache) == 2
+        assert cache.hits == 1
+
+
+def test_close_releases_read_handles(slide_paths):
+    with MxTiffDataset(slide_paths) as ds:
+        tif = ds.get(2)
+        tif.read_region(None, shape=(64, 64), parallel=True)
+        handle = tif._get_thread_local_file_handle()
+    assert handle.closed
+    assert tif._fd is None and tif._thread_handles == []
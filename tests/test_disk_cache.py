@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from mxtifffile import DiskTileCache, MxTiffFile
+from mxtifffile.disk_cache import file_fingerprint
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "lz4", "zstd"])
+def test_roundtrip(tmp_path, codec):
+    if codec in ("lz4", "zstd"):
+        pytest.importorskip("imagecodecs")
+    cache = DiskTileCache(str(tmp_path), codec=codec)
+    tile = np.random.default_rng(0).integers(0, 4000, (64, 48)).astype(np.uint16)
+    cache.put(("file", "L0_P1", 7), tile)
+    assert ("file", "L0_P1", 7) in cache
+    value = DiskTileCache(str(tmp_path)).get(("file", "L0_P1", 7))
+    assert np.array_equal(value, tile) and value.dtype == tile.dtype
+    assert not value.flags.writeable
+    assert cache.get("missing") is None
+
+
+def test_corrupt_entries_are_misses(tmp_path):
+    cache = DiskTileCache(str(tmp_path), codec="zlib")
+    cache.put("a", np.arange(1000, dtype=np.int32))
+    path = cache._path("a")
+    with open(path, "r+b") as fh:
+        fh.truncate(os.path.getsize(path) - 10)
+    assert cache.get("a") is None
+    assert not os.path.exists(path) and cache.errors == 1
+    assert cache.get_or_load("a", lambda: np.ones(3)).sum() == 3
+    assert "a" in cache
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskTileCache(str(tmp_path), codec="none", max_bytes=5000)
+    for i in range(4):
+        cache.put(i, np.full(256, i, dtype=np.uint8))
+        os.utime(cache._path(i), (1000 + i, 1000 + i))
+    # A hit refreshed entry 0, so entry 1 is now the least recently used
+    os.utime(cache._path(0), (2000, 2000))
+    for i in range(4, 20):
+        cache.put(i, np.full(256, i, dtype=np.uint8))
+    stats = cache.stats()
+    assert stats["bytes"] <= 5000 and stats["evictions"] > 0
+    assert 1 not in cache and 19 in cache
+
+
+def test_overwrite_does_not_inflate_size(tmp_path):
+    cache = DiskTileCache(str(tmp_path), codec="none", max_bytes=5000)
+    cache.put("a", np.zeros(16, dtype=np.uint8))
+    for _ in range(50):
+        cache.put("b", np.full(256, 7, dtype=np.uint8))
+    assert cache.stats()["evictions"] == 0
+    assert cache._bytes == cache._scan()[1]
+    assert "a" in cache and "b" in cache
+
+
+def test_file_reads_reuse_disk_tiles(tmp_path, synthetic_ome):
+    path, data = synthetic_ome
+    directory = str(tmp_path / "tiles")
+    with MxTiffFile(str(path), disk_cache=directory) as tif:
+        first = tif.read_region(["DAPI", "Ki67"], pos=(30, 40), shape=(150, 100))
+        written = tif._disk_cache.stats()["writes"]
+    assert written > 0
+
+    # A new file object, as in a later run: no tile is decoded again
+    with MxTiffFile(str(path), disk_cache=DiskTileCache(directory)) as tif:
+        tif._load_tile = lambda page, idx: pytest.fail("tile decoded again")
+        second = tif.read_region(["DAPI", "Ki67"], pos=(30, 40), shape=(150, 100))
+        assert tif._disk_cache.hits == written
+    assert np.array_equal(first, second)
+    assert np.array_equal(second, np.moveaxis(data[[0, 3], 40:140, 30:180], 0, 2))
+
+
+def test_fingerprint_tracks_content(tmp_path):
+    path = tmp_path / "f.bin"
+    path.write_bytes(b"a" * 1000)
+    st = os.stat(path)
+    before = file_fingerprint(path)
+    path.write_bytes(b"b" * 1000)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert file_fingerprint(path) != before
@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+import pytest
+import tifffile
+
+from mxtifffile import MxTiffFile
+from mxtifffile.cli import main
+
+
+def _qpi_description(name, image_type):
+    return ('<?xml version="1.0" encoding="utf-8"?>\r\n<PerkinElmer-QPI-ImageDescription>'
+            f'<ImageType>{image_type}</ImageType><Name>Opal {name}</Name>'
+            f'<Biomarker>{name}</Biomarker></PerkinElmer-QPI-ImageDescription>')
+
+
+def write_synthetic_qptiff(path, shape=(256, 320), names=("DAPI", "CD8", "PanCK"),
+                           compression="zlib", predictor=None, dtype="uint16", levels=3):
+    """Write a QPTIFF-like file: channel pages, a thumbnail, then reduced levels."""
+    data = np.random.default_rng(1).integers(0, 250, (len(names),) + shape).astype(dtype)
+    pages = dict(tile=(64, 64), compression=compression, predictor=predictor,
+                 software="PerkinElmer-QPI", metadata=None)
+    with tifffile.TiffWriter(str(path)) as writer:
+        for name, channel in zip(names, data):
+            writer.write(channel, description=_qpi_description(name, "FullResolution"), **pages)
+        writer.write(np.zeros((32, 40, 3), "uint8"), photometric="rgb", subfiletype=1,
+                     description=_qpi_description("", "Thumbnail"),
+                     software="PerkinElmer-QPI", metadata=None)
+        for level in range(1, levels):
+            for name, channel in zip(names, data):
+                reduced = channel[::2 ** level, ::2 ** level][:shape[0] >> level, :shape[1] >> level]
+                writer.write(np.ascontiguousarray(reduced), subfiletype=1,
+                             description=_qpi_description(name, "ReducedResolution"), **pages)
+    return data
+
+
+@pytest.mark.parametrize("pos,shape,copied,encoded", [
+    ((0, 0), None, 2 * (35 + 12), 0),        # whole file: every tile copied
+    ((64, 128), (150, 100), 2 * 2, 2 * 4 + 2 * 2),  # edge tiles and level 1 re-encoded
+    ((10, 5), (100, 100), 0, 2 * 4 + 2 * 1),  # off the tile grid
+])
+def test_export_ome_subset(synthetic_ome, tmp_path, pos, shape, copied, encoded):
+    path, data = synthetic_ome
+    out = tmp_path / "subset.ome.tif"
+    with MxTiffFile(str(path)) as tif:
+        report = tif.export(str(out), layers=["PanCK", "CD8"], pos=pos, shape=shape)
+    assert report.layout == "ome" and report.channels == ["PanCK", "CD8"]
+    assert (report.copied_tiles, report.encoded_tiles) == (copied, encoded)
+
+    x, y = pos
+    width, height = shape or (400, 300)
+    with MxTiffFile(str(out)) as exported:
+        assert exported.format_id == "ome-tiff" and exported.biomarkers == ["PanCK", "CD8"]
+        levels = exported.series[0].levels
+        assert len(levels) == 2 and levels[0].shape == (2, height, width)
+        region = exported.read_region(None)
+        assert np.array_equal(region, np.moveaxis(data[[2, 1], y:y + height, x:x + width], 0, 2))
+        # Tiles past the region are cropped, not copied with their neighbours' pixels
+        page = levels[0].pages[0]
+        assert page.asarray().shape == (height, width)
+
+
+@pytest.mark.parametrize("compression,predictor,dtype", [
+    ("zlib", 2, "uint16"), ("jpeg", None, "uint8"), ("lzw", None, "uint16")])
+def test_export_qptiff_keeps_page_descriptions(tmp_path, compression, predictor, dtype):
+    source = tmp_path / "slide.qptiff"
+    write_synthetic_qptiff(source, compression=compression, predictor=predictor, dtype=dtype)
+    out = tmp_path / "subset.qptiff"
+    with MxTiffFile(str(source)) as tif:
+        report = tif.export(str(out), layers=["PanCK", "DAPI"], pos=(64, 64), shape=(200, 150))
+        expected = tif.read_region(["PanCK", "DAPI"], pos=(64, 64), shape=(128, 128))
+        source_descriptions = [tif.series[0].pages[i].description for i in (2, 0)]
+    assert report.layout == "qptiff" and report.copied_tiles == 2 * 6
+
+    with MxTiffFile(str(out)) as exported:
+        assert exported.format_id == "qptiff" and exported.biomarkers == ["PanCK", "DAPI"]
+        assert [l.shape[1:] for l in exported.series[0].levels] == [(150, 200), (75, 100), (37, 50)]
+        assert [p.description for p in exported.series[0].pages] == source_descriptions
+        assert exported.series[1].name == "Thumbnail"
+        # Copied tiles decode exactly as in the source, JPEG included
+        assert np.array_equal(exported.read_region(None, shape=(128, 128)), expected)
+
+
+def _split_jpeg(stream):
+    """Split a JPEG stream into its tables and an abbreviated stream without them."""
+    tables, rest = [b"\xff\xd8"], [b"\xff\xd8"]
+    pos = 2
+    while stream[pos + 1] != 0xDA:  # segments up to the start of scan
+        end = pos + 2 + int.from_bytes(stream[pos + 2:pos + 4], "big")
+        (tables if stream[pos + 1] in (0xDB, 0xC4) else rest).append(stream[pos:end])
+        pos = end
+    return b"".join(tables) + b"\xff\xd9", b"".join(rest) + stream[pos:]
+
+
+def test_export_reencodes_edge_tiles_of_jpeg_with_shared_tables(tmp_path):
+    imagecodecs = pytest.importorskip("imagecodecs")
+    source = tmp_path / "shared_tables.ome.tif"
+    data = np.random.default_rng(2).integers(0, 250, (192, 256)).astype("uint8")
+    tiles = []
+    for y in range(0, 192, 64):
+        for x in range(0, 256, 64):
+            tables, tile = _split_jpeg(imagecodecs.jpeg8_encode(data[y:y + 64, x:x + 64], level=90))
+            tiles.append(tile)
+    # Abbreviated tiles decoded with the page's JPEGTables, as scanners write them
+    tifffile.imwrite(source, iter(tiles), shape=data.shape, dtype="uint8", tile=(64, 64),
+                     compression="jpeg", jpegtables=tables, photometric="minisblack",
+                     metadata={"axes": "YX", "Channel": {"Name": ["DAPI"]}})
+    out = tmp_path / "subset.ome.tif"
+    with MxTiffFile(str(source)) as tif:
+        report = tif.export(str(out), pos=(64, 64), shape=(150, 100), levels=1)
+        expected = tif.read_region(None, pos=(64, 64), shape=(150, 100))
+    assert report.copied_tiles == 2 and report.encoded_tiles == 4
+
+    with MxTiffFile(str(out)) as exported:
+        assert exported.series[0].levels[0].pages[0].jpegtables == tables
+        image = exported.read_region(None)
+    # Copied tiles are unchanged; re-encoded edge tiles carry their own tables
+    assert np.array_equal(image[:64, :128], expected[:64, :128])
+    assert np.abs(image.astype(int) - expected).max() < 16
+
+
+def test_export_errors(synthetic_ome, tmp_path):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        with pytest.raises(ValueError, match="qptiff"):
+            tif.export(str(tmp_path / "out.tif"), layout="qptiff")
+        with pytest.raises(ValueError, match="exceeds"):
+            tif.export(str(tmp_path / "out.tif"), pos=(300, 0), shape=(200, 10))
+
+
+def test_export_cli(synthetic_ome, tmp_path, capsys):
+    path, data = synthetic_ome
+    out = tmp_path / "cli.ome.tif"
+    assert main(["export", str(path), str(out), "-c", "Ki67", "0",
+                 "--region", "64,64,128,128", "--levels", "1", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["copied_fraction"] == 1.0 and report["shapes"] == [[128, 128]]
+    with MxTiffFile(str(out)) as exported:
+        assert exported.biomarkers == ["Ki67", "DAPI"]
+        assert np.array_equal(exported.read_region(None),
+                              np.moveaxis(data[[3, 0], 64:192, 64:192], 0, 2))
+    assert main(["export", str(path), str(out), "--region", "1,2"]) == 2
@@ -36,3 +36,151 @@ def test_custom_formats_config_missing_raises(qptiff_path, tmp_path):
     missing_json = str(tmp_path / "custom.json")
     with pytest.raises(FileNotFoundError):
         MxTiffFile(str(qptiff_path), formats_config=missing_json)
+
+
+@pytest.mark.parametrize("tile,compression,predictor", [
+    (None, "zlib", None),
+    (None, None, None),
+    ((64, 64), "zlib", "horizontal"),
+    ((64, 64), "zstd", None),
+])
+def test_segment_reader_matches_data(tmp_path, tile, compression, predictor):
+    import numpy as np
+    import tifffile
+
+    data = np.random.default_rng(1).integers(0, 4000, (3, 200, 150)).astype("uint16")
+    path = tmp_path / "segments.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, tile=tile, compression=compression,
+                     predictor=predictor, rowsperstrip=16,
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8", "PanCK"]}})
+    with MxTiffFile(str(path), enable_cache=False) as tif:
+        region = tif.read_region(None, pos=(30, 41), shape=(77, 90), parallel=True)
+        page = tif.series[0].levels[0].pages[1]
+        assert np.array_equal(tif._read_segments_region(page, 41, 30, 90, 77), data[1, 41:131, 30:107])
+    assert np.array_equal(region, np.moveaxis(data[:, 41:131, 30:107], 0, 2))
+
+
+@pytest.mark.parametrize("tile,rowsperstrip", [(None, None), (None, 7), ((32, 48), None)])
+def test_mmap_reads_uncompressed_pages(tmp_path, tile, rowsperstrip):
+    import numpy as np
+    import tifffile
+
+    data = np.random.default_rng(2).integers(0, 4000, (2, 100, 130)).astype("uint16")
+    path = tmp_path / "raw.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, tile=tile, rowsperstrip=rowsperstrip,
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8"]}})
+    with MxTiffFile(str(path), use_mmap=True) as tif:
+        page = tif.series[0].levels[0].pages[1]
+        assert tif._read_mmap_region(page, 0, 0, 1, 1) is not None
+        region = tif.read_region("CD8", pos=(13, 21), shape=(90, 70))
+        assert np.array_equal(region, data[1, 21:91, 13:103])
+        full = tif.read_region(None)
+        assert np.array_equal(full, np.moveaxis(data, 0, 2))
+        if tile is None and rowsperstrip is None:
+            assert not region.flags.owndata and not region.flags.writeable
+
+
+@pytest.mark.parametrize("compression,predictor", [("zlib", None), ("zstd", "horizontal")])
+def test_concurrent_reads_decode_each_tile_once(tmp_path, compression, predictor):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+    import tifffile
+
+    data = np.random.default_rng(3).integers(0, 4000, (1, 128, 192)).astype("uint16")
+    path = tmp_path / "tiles.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, tile=(64, 64), compression=compression,
+                     predictor=predictor, metadata={"axes": "CYX", "Channel": {"Name": ["DAPI"]}})
+    with MxTiffFile(str(path)) as tif:
+        loaded = []
+        load_tile = tif._load_tile
+        tif._load_tile = lambda page, idx: loaded.append(idx) or load_tile(page, idx)
+        barrier = threading.Barrier(6)
+
+        def read(i):
+            barrier.wait()
+            return tif.read_region("DAPI", pos=(10 + i, 5), shape=(100, 110))
+
+        with ThreadPoolExecutor(6) as pool:
+            regions = list(pool.map(read, range(6)))
+
+    assert sorted(loaded) == [0, 1, 3, 4]
+    for i, region in enumerate(regions):
+        assert np.array_equal(region, data[0, 5:115, 10 + i:110 + i])
+
+
+def test_pickle_reopens_lazily_without_detection(synthetic_ome, monkeypatch):
+    import pickle
+
+    import numpy as np
+
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        payload = pickle.dumps(tif)
+        pages = len(tif.pages)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("format detection ran on unpickle")
+
+    monkeypatch.setattr(MxTiffFile, "_detect_and_parse", fail)
+    clone = pickle.loads(payload)
+    assert "filehandle" not in clone.__dict__
+    assert clone.biomarkers == ["DAPI", "CD8", "PanCK", "Ki67"]
+    assert np.array_equal(clone.read_region("CD8", pos=(5, 7), shape=(40, 30)), data[1, 7:37, 5:45])
+    assert len(clone.pages) == pages
+    clone.close()
+    pickle.loads(payload).close()
+
+
+def test_pickle_file_object_raises(synthetic_ome):
+    import pickle
+
+    path, _ = synthetic_ome
+    with open(path, "rb") as fh, MxTiffFile(fh) as tif:
+        with pytest.raises(TypeError):
+            pickle.dumps(tif)
+
+
+@pytest.mark.skipif(not hasattr(__import__("os"), "fork"), reason="requires os.fork")
+def test_fork_resets_handles_and_locks(synthetic_ome):
+    import multiprocessing
+
+    import numpy as np
+
+    global _forked
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        tif.read_region("DAPI", pos=(0, 0), shape=(64, 64))
+        parent_pid = tif._pid
+        _forked = tif
+        # Hold the cache lock across the fork, as a parent thread might
+        tif._page_cache._lock.acquire()
+        try:
+            with multiprocessing.get_context("fork").Pool(1) as pool:
+                child_pid, region = pool.apply(_read_inherited)
+        finally:
+            tif._page_cache._lock.release()
+            _forked = None
+    assert child_pid != parent_pid
+    assert np.array_equal(region, data[2, 10:60, 20:70])
+
+
+_forked = None
+
+
+def _read_inherited():
+    # Runs in the forked worker on the instance inherited from the parent
+    return _forked._pid, _forked.read_region("PanCK", pos=(20, 10), shape=(50, 50))
+
+
+def test_pid_check_covers_render(synthetic_ome, monkeypatch):
+    path, _ = synthetic_ome
+    resets = []
+    monkeypatch.setattr(MxTiffFile, "_reset_after_fork", lambda self: resets.append(self))
+    with MxTiffFile(str(path)) as tif:
+        tif.read_region("DAPI", pos=(0, 0), shape=(64, 64))
+        # As if inherited through a fork that bypassed os.register_at_fork
+        tif._pid = -1
+        tif.render("DAPI", limits=(0, 1000), shape=(32, 32))
+        assert resets == [tif]
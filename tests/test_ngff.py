@@ -0,0 +1,115 @@
+import json
+import os
+import zlib
+
+import imagecodecs
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.cli import main
+from tests.conftest import write_synthetic_ome
+
+
+def read_zarr_array(path):
+    """Minimal Zarr v2 reader for the codecs export_ngff writes."""
+    with open(os.path.join(path, ".zarray"), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    channels, height, width = meta["shape"]
+    _, chunk_h, chunk_w = meta["chunks"]
+    compressor = meta["compressor"]
+    decode = {None: lambda b: b, "blosc": imagecodecs.blosc_decode, "zlib": zlib.decompress,
+              "zstd": imagecodecs.zstd_decode}[compressor and compressor["id"]]
+    out = np.full(meta["shape"], meta["fill_value"], dtype=meta["dtype"])
+    for c in range(channels):
+        for row in range(-(-height // chunk_h)):
+            for col in range(-(-width // chunk_w)):
+                name = os.path.join(path, str(c), str(row), str(col))
+                if not os.path.exists(name):
+                    continue
+                with open(name, "rb") as fh:
+                    chunk = np.frombuffer(decode(fh.read()), dtype=meta["dtype"])
+                chunk = chunk.reshape(chunk_h, chunk_w)
+                y, x = row * chunk_h, col * chunk_w
+                out[c, y:y + chunk_h, x:x + chunk_w] = chunk[:height - y, :width - x]
+    return meta, out
+
+
+@pytest.mark.parametrize("compressor", ["default", "zstd", "zlib", None])
+def test_export_ngff_levels_and_metadata(synthetic_ome, tmp_path, compressor):
+    path, data = synthetic_ome
+    out = tmp_path / "slide.ome.zarr"
+    with MxTiffFile(str(path)) as tif:
+        report = tif.export_ngff(str(out), layers=["Ki67", "DAPI"], compressor=compressor,
+                                 max_workers=3)
+    assert report.chunks_written == 2 * (35 + 12) and report.chunk == (64, 64)
+    assert report.decoded_bytes == 2 * 2 * (300 * 400 + 150 * 200)
+
+    meta, level0 = read_zarr_array(str(out / "0"))
+    assert meta["chunks"] == [1, 64, 64] and meta["dimension_separator"] == "/"
+    assert np.array_equal(level0, data[[3, 0]])
+    _, level1 = read_zarr_array(str(out / "1"))
+    assert np.array_equal(level1, data[[3, 0], ::2, ::2])
+
+    attrs = json.loads((out / ".zattrs").read_text())
+    multiscales = attrs["multiscales"][0]
+    assert multiscales["version"] == "0.4"
+    assert [a["name"] for a in multiscales["axes"]] == ["c", "y", "x"]
+    assert [d["coordinateTransformations"][0]["scale"] for d in multiscales["datasets"]] == \
+        [[1.0, 1.0, 1.0], [1.0, 2.0, 2.0]]
+    assert [c["label"] for c in attrs["omero"]["channels"]] == ["Ki67", "DAPI"]
+    assert json.loads((out / ".zgroup").read_text()) == {"zarr_format": 2}
+    assert not list(out.rglob(".tmp*"))
+
+
+def test_export_ngff_skips_empty_chunks_and_overwrites(tmp_path):
+    path = tmp_path / "sparse.ome.tif"
+    data = write_synthetic_ome(path, shape=(128, 192), levels=1)
+    out = tmp_path / "sparse.ome.zarr"
+    with MxTiffFile(str(path)) as tif:
+        tif.export_ngff(str(out), chunk=(32, 48))
+        with pytest.raises(FileExistsError):
+            tif.export_ngff(str(out))
+        report = tif.export_ngff(str(out), layers="CD8", overwrite=True)
+        with pytest.raises(ValueError, match="not a Zarr group"):
+            tif.export_ngff(str(tmp_path), overwrite=True)
+        # Rejected before the existing store is removed
+        with pytest.raises(ValueError, match="levels"):
+            tif.export_ngff(str(out), levels=0, overwrite=True)
+        assert (out / ".zgroup").exists()
+    assert report.chunks_written == 6 and report.chunks_empty == 0
+    _, level0 = read_zarr_array(str(out / "0"))
+    assert np.array_equal(level0, data[1:2])
+
+    blank = tmp_path / "blank.ome.tif"
+    import tifffile
+    data[:, :64] = 0
+    tifffile.imwrite(str(blank), data, ome=True, tile=(64, 64), compression="zlib",
+                     metadata={"axes": "CYX"})
+    with MxTiffFile(str(blank)) as tif:
+        report = tif.export_ngff(str(tmp_path / "blank.ome.zarr"))
+    assert report.chunks_empty == 4 * 3 and report.chunks_written == 4 * 3
+    _, level0 = read_zarr_array(str(tmp_path / "blank.ome.zarr" / "0"))
+    assert np.array_equal(level0, data)
+
+
+def test_export_ngff_readable_by_zarr(synthetic_ome, tmp_path):
+    zarr = pytest.importorskip("zarr")
+    path, data = synthetic_ome
+    out = tmp_path / "slide.ome.zarr"
+    with MxTiffFile(str(path)) as tif:
+        tif.export_ngff(str(out))
+    group = zarr.open_group(str(out), mode="r")
+    assert np.array_equal(group["0"][:], data)
+
+
+def test_ngff_cli(synthetic_ome, tmp_path, capsys):
+    path, data = synthetic_ome
+    out = tmp_path / "cli.ome.zarr"
+    assert main(["ngff", str(path), str(out), "-c", "PanCK", "--chunk", "128",
+                 "--levels", "1", "--compressor", "zlib", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["shapes"] == [[400, 300]] and report["chunks_written"] == 12
+    meta, level0 = read_zarr_array(str(out / "0"))
+    assert meta["compressor"] == {"id": "zlib", "level": 1}
+    assert np.array_equal(level0, data[2:3])
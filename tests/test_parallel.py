@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mxtifffile.parallel import bounded_map
+
+
+def test_bounded_map_keeps_order_and_bounds_submissions():
+    drawn = []
+    lock = threading.Lock()
+
+    def items():
+        for i in range(20):
+            drawn.append(i)
+            yield i
+
+    def square(i):
+        with lock:
+            return i * i
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = bounded_map(pool, square, items(), ahead=4)
+        assert next(results) == 0
+        # Items are drawn lazily: no more than *ahead* beyond those consumed
+        assert len(drawn) == 4
+        assert list(results) == [i * i for i in range(1, 20)]
+
+
+def test_bounded_map_raises_task_errors():
+    def fail(i):
+        if i == 2:
+            raise ValueError("bad item")
+        return i
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ValueError, match="bad item"):
+            list(bounded_map(pool, fail, range(5), ahead=2))
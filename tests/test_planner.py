@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+
+
+def test_plan_counts_tiles_and_bytes(synthetic_ome):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        plan = tif.plan_read(["DAPI", "CD8"], pos=(30, 41), shape=(90, 77))
+        page = tif.series[0].pages[1]
+        assert [layer.name for layer in plan.layers] == ["DAPI", "CD8"]
+        assert all(layer.path == "tile_cache" for layer in plan.layers)
+        # Columns 0-1 and rows 0-1 of 64x64 tiles
+        assert plan.layers[1].segments == 4
+        assert plan.layers[1].compressed_bytes == sum(page.databytecounts[i] for i in (0, 1, 7, 8))
+        assert plan.cached_segments == 0 and plan.est_decode_seconds > 0
+        assert "tile_cache" in plan.explain()
+
+        region = plan.execute()
+        assert np.array_equal(region, np.moveaxis(data[:2, 41:118, 30:120], 0, 2))
+        again = tif.plan_read(["DAPI", "CD8"], pos=(30, 41), shape=(90, 77))
+        assert again.cached_segments == again.segments and again.est_decode_seconds == 0
+
+
+def test_plan_reports_uncached_paths(synthetic_ome, tmp_path):
+    import tifffile
+
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path), enable_cache=False) as tif:
+        assert tif.plan_read("DAPI").layers[0].path == "tiled"
+
+    striped = tmp_path / "striped.ome.tif"
+    tifffile.imwrite(str(striped), np.zeros((1, 100, 50), "uint16"), ome=True,
+                     compression="zlib", rowsperstrip=16,
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI"]}})
+    with MxTiffFile(str(striped)) as tif:
+        plan = tif.plan_read("DAPI", pos=(0, 20), shape=(50, 20))
+        assert plan.layers[0].path == "segments" and plan.layers[0].segments == 2
+
+
+def test_plan_validates_region(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        with pytest.raises(ValueError):
+            tif.plan_read("DAPI", pos=(390, 0), shape=(20, 20))
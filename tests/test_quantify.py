@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+from tests.conftest import write_synthetic_ome
+
+
+@pytest.fixture
+def labels():
+    rng = np.random.default_rng(5)
+    labels = np.zeros((300, 400), dtype=np.int32)
+    for label in range(1, 40):
+        y, x = rng.integers(0, 280), rng.integers(0, 380)
+        labels[y:y + rng.integers(5, 60), x:x + rng.integers(5, 60)] = label * 3
+    return labels
+
+
+def test_quantify_matches_brute_force(synthetic_ome, labels):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path), max_workers=3) as tif:
+        result = tif.quantify(labels, ["DAPI", "Ki67"],
+                              stats=("area", "sum", "mean", "std", "min", "max"))
+
+    present = np.unique(labels[labels > 0])
+    assert np.array_equal(result["label"], present)
+    for row, label in enumerate(present):
+        mask = labels == label
+        assert result["area"][row] == mask.sum()
+        for name, channel in (("DAPI", data[0]), ("Ki67", data[3])):
+            values = channel[mask].astype(np.float64)
+            assert result[f"sum_{name}"][row] == values.sum()
+            assert result[f"mean_{name}"][row] == pytest.approx(values.mean())
+            assert result[f"std_{name}"][row] == pytest.approx(values.std())
+            assert result[f"min_{name}"][row] == values.min()
+            assert result[f"max_{name}"][row] == values.max()
+
+
+def test_quantify_skips_unlabelled_tiles(synthetic_ome):
+    path, _ = synthetic_ome
+    labels = np.zeros((300, 400), dtype=np.uint16)
+    labels[10:20, 10:20] = 1
+    with MxTiffFile(str(path)) as tif:
+        reads = []
+        read = tif._read_page_region_optimized
+        tif._read_page_region_optimized = lambda page, *args: reads.append(args) or read(page, *args)
+        result = tif.quantify(labels, "DAPI")
+    assert len(reads) == 1
+    assert list(result) == ["label", "area", "mean_DAPI", "sum_DAPI"]
+
+
+def test_quantify_sparse_huge_labels(synthetic_ome):
+    path, data = synthetic_ome
+    labels = np.zeros((300, 400), dtype=np.int64)
+    labels[10:20, 10:20] = 2_000_000_000
+    labels[200:250, 300:390] = 7
+    with MxTiffFile(str(path), max_workers=3) as tif:
+        # Rows are allocated per label present, not up to the largest value
+        result = tif.quantify(labels, "DAPI", stats=("area", "sum", "max"))
+    assert result["label"].tolist() == [7, 2_000_000_000]
+    assert result["area"].tolist() == [50 * 90, 100]
+    assert result["sum_DAPI"][1] == data[0, 10:20, 10:20].sum()
+    assert result["max_DAPI"][0] == data[0, 200:250, 300:390].max()
+
+
+def test_quantify_keeps_layers_sharing_a_name(tmp_path, labels):
+    path = tmp_path / "duplicate.ome.tif"
+    data = write_synthetic_ome(path, channels=("DAPI", "CD8", "DAPI", "Ki67"))
+    with MxTiffFile(str(path)) as tif:
+        result = tif.quantify(labels, [0, 2, 3], stats=("sum",))
+    assert list(result) == ["label", "sum_DAPI_0", "sum_DAPI_2", "sum_Ki67"]
+    mask = labels == result["label"][0]
+    assert result["sum_DAPI_2"][0] == data[2][mask].sum()
+
+
+def test_quantify_validates_arguments(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        with pytest.raises(ValueError):
+            tif.quantify(np.zeros((10, 10), dtype=np.int32), "DAPI")
+        with pytest.raises(ValueError):
+            tif.quantify(np.zeros((300, 400), dtype=np.int32), "DAPI", stats=("median",))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.render import parse_color
+
+
+def reference_render(channels, colors, limits):
+    rgb = np.zeros(channels[0].shape + (3,))
+    for data, color, (low, high) in zip(channels, colors, limits):
+        scaled = np.clip((data.astype(np.float64) - low) / (high - low), 0, 1)
+        rgb += np.rint(scaled[..., None] * np.asarray(color, dtype=np.float64))
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+def test_render_matches_float_reference(synthetic_ome):
+    path, data = synthetic_ome
+    limits = [(100, 3000), (0, 4000), (500, 1500)]
+    colors = ["blue", "#00ff00", (1.0, 0.5, 0.0)]
+    with MxTiffFile(str(path)) as tif:
+        image = tif.render(["DAPI", "CD8", "PanCK"], colors=colors, limits=limits,
+                           pos=(30, 20), shape=(100, 80))
+    assert image.shape == (80, 100, 3) and image.dtype == np.uint8
+    expected = reference_render(data[:3, 20:100, 30:130], [parse_color(c) for c in colors], limits)
+    assert np.array_equal(image, expected)
+
+
+def test_render_float_data_and_out(tmp_path):
+    import tifffile
+
+    data = np.linspace(-1, 1, 64 * 64, dtype=np.float32).reshape(1, 64, 64)
+    path = tmp_path / "float.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True,
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI"]}})
+    out = np.zeros((64, 64, 3), dtype=np.uint8)
+    with MxTiffFile(str(path)) as tif:
+        assert tif.render("DAPI", colors="white", limits=(0, 1), out=out) is out
+    expected = reference_render(data, [(255, 255, 255)], [(0, 1)])
+    assert np.abs(out.astype(int) - expected).max() <= 1
+
+
+def test_default_limits_use_channel_stats(synthetic_ome, tmp_path, monkeypatch):
+    monkeypatch.setenv("MXTIFFFILE_CACHE_DIR", str(tmp_path / "cache"))
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        image = tif.render(["DAPI", "CD8"], shape=(64, 64))
+        stats = tif.channel_stats(["DAPI", "CD8"], level=1)
+        limits = [tuple(st.percentile([0.5, 99.5])) for st in stats]
+        assert np.array_equal(image, tif.render(["DAPI", "CD8"], limits=limits, shape=(64, 64)))
+    with pytest.raises(ValueError):
+        parse_color("chartreuse-ish")
+
+
+def test_render_rejects_empty_selection(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        with pytest.raises(ValueError, match="No layers selected"):
+            tif.render([], shape=(64, 64))
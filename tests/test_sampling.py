@@ -0,0 +1,85 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile, PatchSampler
+
+from tests.conftest import write_synthetic_ome
+
+
+def check_patches(batch, locations, datas, patch=(24, 16)):
+    width, height = patch
+    for patch_data, (index, x, y) in zip(batch, locations):
+        expected = datas[index][:, y:y + height, x:x + width]
+        assert np.array_equal(patch_data, expected)
+
+
+def test_batches_match_file_data(synthetic_ome):
+    path, data = synthetic_ome
+    with PatchSampler(str(path), layers=["CD8", "DAPI"], patch_size=(24, 16), batch_size=10,
+                      patches_per_window=4, num_batches=3, seed=1) as sampler:
+        batches = list(sampler)
+    assert len(batches) == 3
+    for batch, locations in batches:
+        assert batch.shape == (10, 2, 16, 24) and batch.dtype == np.uint16
+        check_patches(batch, locations, [data[[1, 0]]])
+
+
+def test_seeded_sampling_is_reproducible_and_sharded(synthetic_ome):
+    path, _ = synthetic_ome
+    sampler = PatchSampler(str(path), patch_size=32, batch_size=8, num_batches=5, seed=7)
+    first = [loc for _, loc in sampler]
+    second = [loc for _, loc in sampler]
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+    shards = [list(sampler.iter_batches(worker_id=w, num_workers=2)) for w in range(2)]
+    assert [len(s) for s in shards] == [3, 2]
+    assert not np.array_equal(shards[0][0][1], shards[1][0][1])
+
+    sampler.set_epoch(1)
+    assert not np.array_equal(next(iter(sampler))[1], first[0])
+    sampler.close()
+
+
+def test_multiple_files_and_pickle(tmp_path):
+    paths, datas = [], []
+    for seed in range(2):
+        path = tmp_path / f"slide{seed}.ome.tif"
+        datas.append(write_synthetic_ome(path, seed=seed))
+        paths.append(str(path))
+
+    with MxTiffFile(paths[1]) as tif:
+        sampler = PatchSampler([paths[0], tif], patch_size=(24, 16), batch_size=16,
+                               num_batches=4, seed=0, threads=1)
+        clone = pickle.loads(pickle.dumps(sampler))
+        for s in (sampler, clone):
+            seen = set()
+            for batch, locations in s:
+                check_patches(batch, locations, datas)
+                seen.update(locations[:, 0].tolist())
+            assert seen == {0, 1}
+            s.close()
+
+
+def test_tissue_only_patches_overlap_tissue(tmp_path):
+    import tifffile
+
+    rng = np.random.default_rng(0)
+    data = np.zeros((1, 256, 256), dtype=np.uint16)
+    data[:, :, 160:] = rng.integers(0, 4000, (1, 256, 96))
+    path = tmp_path / "half.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, tile=(32, 32), compression="zlib",
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI"]}})
+    with PatchSampler(str(path), patch_size=16, batch_size=32, tissue_only=True,
+                      num_batches=4, seed=3) as sampler:
+        for batch, locations in sampler:
+            assert (locations[:, 1] + 16 > 160).all()
+            check_patches(batch, locations, [data], patch=(16, 16))
+
+
+def test_patch_larger_than_image_raises(synthetic_ome):
+    path, _ = synthetic_ome
+    with PatchSampler(str(path), patch_size=1000, num_batches=1) as sampler:
+        with pytest.raises(ValueError):
+            next(iter(sampler))
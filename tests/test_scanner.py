@@ -0,0 +1,65 @@
+import json
+import os
+
+from mxtifffile.cli import main
+from mxtifffile.scanner import iter_tiff_paths, load_scan_cache, scan_file, scan_paths
+from tests.conftest import SYNTHETIC_CHANNELS, write_synthetic_ome
+
+
+def _make_slides(root, n=3):
+    paths = []
+    for i in range(n):
+        path = root / f"slide{i}.ome.tif"
+        write_synthetic_ome(path, shape=(96, 128), seed=i)
+        paths.append(str(path))
+    (root / "notes.txt").write_text("not a slide")
+    return paths
+
+
+def test_scan_file_reports_format_channels_and_levels(synthetic_ome):
+    path, _ = synthetic_ome
+    record = scan_file(str(path))
+    assert record["error"] is None
+    assert record["format_id"] == "ome-tiff"
+    assert record["biomarkers"] == SYNTHETIC_CHANNELS
+    assert record["level_shapes"] == [[300, 400], [150, 200]]
+    assert record["levels"][0]["tile"] == [64, 64]
+    assert record["levels"][0]["pages"] == len(SYNTHETIC_CHANNELS)
+
+
+def test_scan_file_records_errors(tmp_path):
+    bad = tmp_path / "bad.tif"
+    bad.write_bytes(b"not a tiff")
+    record = scan_file(str(bad))
+    assert record["error"]
+
+
+def test_iter_tiff_paths_filters_extensions(tmp_path):
+    paths = _make_slides(tmp_path)
+    assert list(iter_tiff_paths([str(tmp_path)])) == paths
+
+
+def test_scan_paths_uses_cache_for_unchanged_files(tmp_path):
+    paths = _make_slides(tmp_path)
+    first = {r["path"]: r for r in scan_paths(paths, max_workers=1)}
+    cached = dict(first)
+    cached[paths[0]] = dict(first[paths[0]], biomarkers=["from-cache"])
+    os.utime(paths[1], ns=(0, 0))
+    second = {r["path"]: r for r in scan_paths(paths, max_workers=1, cache=cached)}
+    assert second[paths[0]]["biomarkers"] == ["from-cache"]
+    assert second[paths[1]]["biomarkers"] == SYNTHETIC_CHANNELS
+
+
+def test_cli_scan_resume_appends_only_new_files(tmp_path):
+    slides = tmp_path / "slides"
+    slides.mkdir()
+    paths = _make_slides(slides, n=2)
+    out = tmp_path / "catalog.jsonl"
+    assert main(["scan", str(slides), "-o", str(out), "-j", "1"]) == 0
+    assert len(out.read_text().splitlines()) == 2
+
+    write_synthetic_ome(slides / "slide9.ome.tif", shape=(64, 64))
+    assert main(["scan", str(slides), "-o", str(out), "-j", "1", "--resume"]) == 0
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(lines) == 3
+    assert set(load_scan_cache(str(out))) == set(paths) | {str(slides / "slide9.ome.tif")}
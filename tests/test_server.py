@@ -0,0 +1,95 @@
+import json
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffCorruptTileError, MxTiffFile
+from mxtifffile.server import TileServer
+
+imagecodecs = pytest.importorskip("imagecodecs")
+
+
+@pytest.fixture
+def server(synthetic_ome, tmp_path, monkeypatch):
+    monkeypatch.setenv("MXTIFFFILE_CACHE_DIR", str(tmp_path / "cache"))
+    path, data = synthetic_ome
+    with TileServer([str(path)], port=0, tile_size=128, workers=4).start() as server:
+        yield server, path, data
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def test_info_describes_native_levels(server):
+    server, _, _ = server
+    status, _, body = get(server.url + "/slides/0/info.json")
+    info = json.loads(body)
+    assert status == 200
+    assert info["channels"] == ["DAPI", "CD8", "PanCK", "Ki67"]
+    assert [(lv["width"], lv["height"], lv["tiles_x"]) for lv in info["levels"]] == \
+        [(400, 300, 4), (200, 150, 2)]
+
+
+def test_tile_matches_render_and_is_cached(server):
+    server, path, _ = server
+    url = server.url + "/slides/0/tiles/0/3/2.png?channels=DAPI,CD8&colors=blue,00ff00&limits=0:4000,auto"
+    status, headers, body = get(url)
+    assert status == 200 and headers["Content-Type"] == "image/png"
+    tile = imagecodecs.png_decode(body)
+    assert tile.shape == (44, 16, 3)  # edge tile of a 400x300 level
+
+    with MxTiffFile(str(path)) as tif:
+        limits = [(0, 4000), server._limits.get((tif._cache_token, (0, 1)))[1]]
+        expected = tif.render(["DAPI", "CD8"], colors=["blue", "green"], limits=limits,
+                              pos=(384, 256), shape=(16, 44))
+    assert np.array_equal(tile, expected)
+
+    status, headers2, body2 = get(url)
+    assert body2 == body and headers2["ETag"] == headers["ETag"]
+    assert server.counters["rendered"] == 1
+
+    status, _, body = get(url, {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+    assert server.counters["not_modified"] == 1
+
+
+def test_errors(server):
+    server, _, _ = server
+    assert get(server.url + "/slides/5/info.json")[0] == 404
+    assert get(server.url + "/slides/0/tiles/0/9/0.png")[0] == 404
+    assert get(server.url + "/slides/0/tiles/7/0/0.png")[0] == 404
+    assert get(server.url + "/slides/0/tiles/0/0/0.jpg?channels=Nope")[0] == 400
+    assert get(server.url + "/slides/0/tiles/0/0/0.jpg?channels=DAPI&colors=red,blue")[0] == 400
+    status, headers, body = get(server.url + "/slides/0/tiles/1/0/0.jpg?quality=80")
+    assert status == 200 and headers["Content-Type"] == "image/jpeg"
+    assert imagecodecs.jpeg8_decode(body).shape == (128, 128, 3)
+
+
+def test_internal_errors_are_500_without_paths(server, capsys):
+    server, path, _ = server
+
+    def corrupt(*args):
+        raise MxTiffCorruptTileError(f"{path}: tile 3 of IFD 0 is decode error", ifd=0, index=3)
+
+    server.encode_tile = corrupt
+    status, _, body = get(server.url + "/slides/0/tiles/1/0/0.png")
+    assert status == 500 and str(path) not in body.decode()
+    assert "corrupt" in json.loads(body)["error"]
+
+    def broken(*args):
+        raise RuntimeError("unexpected")
+
+    server.encode_tile = broken
+    status, _, body = get(server.url + "/slides/0/tiles/1/0/1.png")
+    assert status == 500 and json.loads(body) == {"error": "Internal server error"}
+    assert server.counters["errors"] == 2
+    # Logged server-side even without verbose
+    assert "RuntimeError: unexpected" in capsys.readouterr().err
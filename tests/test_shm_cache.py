@@ -0,0 +1,116 @@
+import multiprocessing
+import pickle
+import uuid
+
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile, SharedTileCache
+from mxtifffile.shm_cache import _key_digest
+
+pytest.importorskip("fcntl")
+
+
+@pytest.fixture
+def shared_cache(tmp_path):
+    cache = SharedTileCache(name=f"mxt-test-{uuid.uuid4().hex[:12]}", max_bytes=128 * 1024,
+                            slot_bytes=8192, ways=4, lock_dir=str(tmp_path))
+    yield cache
+    cache.unlink()
+    cache.close()
+
+
+def test_put_get_and_layout(shared_cache):
+    tile = np.arange(64 * 32, dtype=np.uint16).reshape(64, 32)
+    shared_cache.put(("file", "L0_P0", "tile", 3), tile)
+    assert ("file", "L0_P0", "tile", 3) in shared_cache
+    value = shared_cache.get(("file", "L0_P0", "tile", 3))
+    assert np.array_equal(value, tile) and value.dtype == tile.dtype
+    assert not value.flags.writeable
+    assert shared_cache.get("missing") is None
+    assert shared_cache.stats()["entries"] == 1
+
+    # Too large for a slot: returned by get_or_load but not stored
+    big = np.zeros(9000, dtype=np.uint8)
+    assert shared_cache.get_or_load("big", lambda: big) is big
+    assert "big" not in shared_cache
+
+    with pytest.raises(ValueError):
+        SharedTileCache(name=shared_cache.name, max_bytes=256 * 1024, slot_bytes=8192,
+                        ways=4, lock_dir=shared_cache.lock_dir)
+
+    shared_cache.clear()
+    assert len(shared_cache) == 0 and "file" not in shared_cache
+
+
+def test_full_set_evicts_least_recently_used(shared_cache):
+    # Keys that all land in one set
+    keys = [k for k in range(2000)
+            if shared_cache._set_slots(_key_digest(k)).start == 0][:5]
+    for k in keys[:4]:
+        shared_cache.put(k, np.full(8, k, dtype=np.int32))
+    shared_cache.get(keys[0])
+    shared_cache.put(keys[4], np.full(8, keys[4], dtype=np.int32))
+    assert keys[0] in shared_cache and keys[4] in shared_cache
+    assert keys[1] not in shared_cache
+
+
+def test_rewrite_recovers_slot_left_odd_by_crashed_writer(shared_cache):
+    tile = np.arange(16, dtype=np.uint16)
+    shared_cache.put("k", tile)
+    digest = _key_digest("k")
+    (slot,) = shared_cache._find(digest, shared_cache._set_slots(digest))
+    # A writer that died between its two sequence updates
+    shared_cache._seq[slot] += 1
+    assert "k" in shared_cache and shared_cache.get("k") is None
+
+    shared_cache.put("k", tile + 1)
+    assert shared_cache._seq[slot] % 2 == 0
+    assert np.array_equal(shared_cache.get("k"), tile + 1)
+    shared_cache.put("k", tile + 2)
+    assert np.array_equal(shared_cache.get("k"), tile + 2)
+
+
+def test_clear_recovers_slot_left_odd_by_crashed_writer(shared_cache):
+    tile = np.arange(16, dtype=np.uint16)
+    shared_cache.put("k", tile)
+    digest = _key_digest("k")
+    (slot,) = shared_cache._find(digest, shared_cache._set_slots(digest))
+    shared_cache._seq[slot] += 1
+
+    shared_cache.clear()
+    assert not np.any(shared_cache._seq % 2)
+    # The emptied set hands out the same slot again
+    shared_cache.put("k", tile + 1)
+    assert shared_cache._find(digest, shared_cache._set_slots(digest)).tolist() == [slot]
+    assert np.array_equal(shared_cache.get("k"), tile + 1)
+
+
+def _child_read(cache, path, region):
+    with MxTiffFile(path, tile_cache=cache) as tif:
+        tif.read_region("CD8", pos=region[:2], shape=region[2:])
+    return cache.stats()["misses"]
+
+
+def test_tiles_shared_across_processes(shared_cache, synthetic_ome):
+    path, data = synthetic_ome
+    region = (10, 20, 100, 60)
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        child_misses = pool.apply(_child_read, (shared_cache, str(path), region))
+    assert child_misses > 0
+    assert len(shared_cache) == child_misses
+
+    with MxTiffFile(str(path), tile_cache=pickle.loads(pickle.dumps(shared_cache))) as tif:
+        tif._load_tile = lambda page, idx: pytest.fail("tile decoded again")
+        crop = tif.read_region("CD8", pos=region[:2], shape=region[2:])
+    assert np.array_equal(crop, data[1, 20:80, 10:110])
+
+
+def test_pickled_file_keeps_shared_cache(shared_cache, synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path), tile_cache=shared_cache) as tif:
+        clone = pickle.loads(pickle.dumps(tif))
+    assert isinstance(clone._page_cache, SharedTileCache)
+    assert clone._page_cache.name == shared_cache.name
+    clone._page_cache.close()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.stats import ChannelStats
+
+
+def test_exact_stats_match_numpy(synthetic_ome, tmp_path):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path), max_workers=3) as tif:
+        stats = tif.channel_stats(["CD8", "Ki67"], cache_dir=str(tmp_path))
+    for st, channel in zip(stats, (data[1], data[3])):
+        assert st.exact and st.count == channel.size
+        assert st.min == channel.min() and st.max == channel.max()
+        assert st.mean == pytest.approx(channel.mean())
+        assert st.std == pytest.approx(channel.std())
+        assert np.array_equal(st.percentile([1, 50, 99.5]),
+                              np.percentile(channel, [1, 50, 99.5], method="lower"))
+    assert stats[0].name == "CD8"
+
+
+def test_results_are_cached_on_disk(synthetic_ome, tmp_path):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        first = tif.channel_stats("DAPI", sample=0.5, cache_dir=str(tmp_path))[0]
+        tif._read_page_region_optimized = None  # served from memory
+        second = tif.channel_stats("DAPI", sample=0.5, cache_dir=str(tmp_path))[0]
+        assert second is not first and np.array_equal(second.hist, first.hist)
+    assert len(list((tmp_path / "stats").iterdir())) == 1
+
+    with MxTiffFile(str(path)) as tif:
+        tif._read_page_region_optimized = None  # any read would fail
+        again = tif.channel_stats("DAPI", sample=0.5, cache_dir=str(tmp_path))[0]
+    assert again.count == first.count and np.array_equal(again.hist, first.hist)
+    assert 0 < first.count < data[0].size
+
+
+def test_cache_is_memory_only_by_default(synthetic_ome, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("MXTIFFFILE_CACHE_DIR", str(tmp_path / "cache"))
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        first = tif.channel_stats("DAPI")[0]
+        # Merging into a result must not change what later calls return
+        first.merge(tif.channel_stats("DAPI")[0])
+        assert tif.channel_stats("DAPI")[0].count == data[0].size
+        assert first.count == 2 * data[0].size
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["synthetic.ome.tif"]
+
+
+def test_binned_stats_and_merge():
+    rng = np.random.default_rng(0)
+    a = rng.normal(100, 10, 5000).astype("float32")
+    b = rng.normal(120, 10, 5000).astype("float32")
+    merged = ChannelStats.for_dtype("float32", (0, 200)).update(a)
+    merged.merge(ChannelStats.for_dtype("float32", (0, 200)).update(b))
+    both = np.concatenate([a, b])
+    assert merged.count == both.size
+    assert merged.mean == pytest.approx(both.mean(), rel=1e-6)
+    assert merged.std == pytest.approx(both.std(), rel=1e-4)
+    assert merged.percentile(50) == pytest.approx(np.median(both), abs=0.1)
+    with pytest.raises(ValueError):
+        merged.merge(ChannelStats.for_dtype("float32", (0, 100)))
+
+
+def test_sample_must_select_tiles(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        for sample in (0, -3, 0.0):
+            with pytest.raises(ValueError, match="[Ss]ample"):
+                tif.channel_stats("DAPI", sample=sample, cache=False)
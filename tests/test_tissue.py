@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+
+
+@pytest.fixture
+def slide_with_glass(tmp_path):
+    """Tiled 2-level OME-TIFF: noisy glass with a tissue block over tiles rows 1-4, cols 3-7."""
+    import tifffile
+
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 3, (2, 512, 768)).astype("uint16")
+    data[:, 100:300, 200:500] += rng.integers(500, 4000, (2, 200, 300)).astype("uint16")
+    path = tmp_path / "glass.ome.tif"
+    with tifffile.TiffWriter(str(path), ome=True) as writer:
+        writer.write(data, tile=(64, 64), compression="zlib", subifds=1,
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8"]}})
+        writer.write(data[:, ::4, ::4], tile=(64, 64), compression="zlib", subfiletype=1)
+    expected = np.zeros((8, 12), dtype=bool)
+    expected[1:5, 3:8] = True
+    return path, expected
+
+
+def test_map_from_byte_counts(slide_with_glass):
+    path, expected = slide_with_glass
+    with MxTiffFile(str(path)) as tif:
+        tmap = tif.tissue_map()
+        assert np.array_equal(tmap.mask, expected)
+        assert tmap.fraction == pytest.approx(20 / 96)
+        assert not tmap.refined
+        assert tif.tissue_map() is tmap
+        assert tmap.region_has_tissue(190, 90, 20, 20)
+        assert not tmap.region_has_tissue(0, 0, 128, 64)
+
+
+def test_refinement_corrects_ambiguous_tiles(slide_with_glass):
+    path, expected = slide_with_glass
+    with MxTiffFile(str(path)) as tif:
+        # A threshold below the glass tile size marks everything as tissue
+        coarse = tif.tissue_map(layers="DAPI", threshold=1000)
+        assert coarse.mask.all()
+        refined = tif.tissue_map(layers="DAPI", threshold=1000, refine_level=1)
+        assert refined.refined and np.array_equal(refined.mask, expected)
+
+
+def test_iter_tiles_skips_background(slide_with_glass):
+    path, expected = slide_with_glass
+    with MxTiffFile(str(path)) as tif:
+        all_tiles = list(tif.iter_tiles("DAPI"))
+        tissue_tiles = list(tif.iter_tiles("DAPI", tissue_only=True))
+        assert len(all_tiles) == expected.size
+        assert [pos for pos, _ in tissue_tiles] == list(tif.tissue_map().tile_positions())
+        (x, y), region = tissue_tiles[0]
+        assert region.shape == (64, 64)
+        assert np.array_equal(region, tif.read_region("DAPI", pos=(x, y), shape=(64, 64)))
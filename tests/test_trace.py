@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile
+from mxtifffile.cli import main
+from mxtifffile.trace import load_trace, replay_trace, synthesize_file
+
+
+def record_sample(path, trace_path):
+    with MxTiffFile(str(path)) as tif:
+        with tif.record_trace(trace_path) as recorder:
+            tif.read_region(["DAPI", "CD8"], pos=(10, 20), shape=(100, 80))
+            tif.read_region(["DAPI", "CD8"], pos=(10, 20), shape=(100, 80), parallel=True)
+            tif.read_region("Ki67", pos=(0, 0), shape=(50, 50), level=1)
+            tif.render(["DAPI"], limits=[(0, 4000)], pos=(0, 0), shape=(64, 64))
+        assert recorder.count == 4 and tif._trace is None
+        tif.read_region("DAPI", pos=(0, 0), shape=(10, 10))
+    return load_trace(trace_path)
+
+
+@pytest.mark.parametrize("name", ["trace.jsonl", "trace.jsonl.gz"])
+def test_record_trace(synthetic_ome, tmp_path, name):
+    path, _ = synthetic_ome
+    header, records = record_sample(path, tmp_path / name)
+    assert header["layers"] == 4 and len(header["levels"]) == 2
+    assert header["levels"][0]["shape"] == [300, 400]
+    assert header["levels"][0]["tile"] == [64, 64]
+    assert "DAPI" not in json.dumps(header)
+    assert [r["op"] for r in records] == ["read_region"] * 3 + ["render"]
+    first, second = records[0], records[1]
+    assert first["layers"] == [0, 1] and first["pos"] == [10, 20] and first["shape"] == [100, 80]
+    assert first["cached"] == 0 and first["segments"] > 0
+    assert second["cached"] == second["segments"] and second["parallel"]
+    assert records[2]["level"] == 1
+
+
+def test_replay_against_file_and_synthetic(synthetic_ome, tmp_path):
+    path, _ = synthetic_ome
+    trace = tmp_path / "trace.jsonl"
+    header, records = record_sample(path, trace)
+
+    report = replay_trace(str(trace), str(path), concurrency=2, repeat=2)
+    assert report.requests == 8 and report.errors == 0
+    assert report.recorded_hit_rate is not None and 0 < report.hit_rate <= 1
+    assert set(report.percentiles()) == {"p50", "p90", "p99", "max"}
+    assert report.cache_stats["misses"] > 0
+    assert "throughput" in report.summary()
+
+    synthetic = synthesize_file(header, str(tmp_path / "synthetic.ome.tif"))
+    with MxTiffFile(synthetic) as tif:
+        assert len(tif.series[0].levels) == 2
+        assert tif.series[0].levels[1].pages[0].shape == (150, 200)
+        assert tif.series[0].levels[0].pages[0].dtype == np.uint16
+    report = replay_trace((header, records), enable_cache=False)
+    assert report.requests == 4 and report.errors == 0 and report.hit_rate == 0
+
+
+def test_replay_cli(synthetic_ome, tmp_path, capsys):
+    path, _ = synthetic_ome
+    trace = tmp_path / "trace.jsonl"
+    record_sample(path, trace)
+    assert main(["replay", str(trace), "--file", str(path), "-j", "2", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["requests"] == 4 and report["latency"]["p50"] > 0
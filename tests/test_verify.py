@@ -0,0 +1,156 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import tifffile
+
+from mxtifffile import MxTiffCorruptTileError, MxTiffFile
+from mxtifffile.cli import main
+from tests.conftest import write_synthetic_ome
+
+
+def corrupt_tile(path, page_index=1, tile_index=5):
+    """Overwrite the compressed bytes of one tile of a top-level page with garbage."""
+    with tifffile.TiffFile(path) as tif:
+        page = tif.pages[page_index]
+        offset = page.dataoffsets[tile_index]
+        bytecount = page.databytecounts[tile_index]
+        y, x = divmod(tile_index, -(-page.imagewidth // page.tilewidth))
+        origin = (y * page.tilelength, x * page.tilewidth)
+    with open(path, "r+b") as fh:
+        fh.seek(offset)
+        fh.write(b"\xff" * bytecount)
+    return offset, origin
+
+
+def test_verify_clean_file(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(path) as tif:
+        report = tif.verify()
+        assert report.ok
+        assert report.mode == "full"
+        # 4 channels of 5x7 tiles, plus 3x4 tiles at level 1
+        assert report.segments == report.segments_decoded == 4 * 35 + 4 * 12
+        assert report.pages == 8
+        assert "OK" in report.summary()
+        assert json.loads(json.dumps(report.to_dict()))["ok"] is True
+
+
+def test_verify_reports_corrupt_tile(synthetic_ome):
+    path, _ = synthetic_ome
+    offset, (y, x) = corrupt_tile(path)
+    with MxTiffFile(path) as tif:
+        report = tif.verify(max_workers=2)
+        assert not report.ok
+        (problem,) = report.problems
+        assert (problem.series, problem.level, problem.page) == (0, 0, 1)
+        assert (problem.index, problem.y, problem.x) == (5, y, x)
+        assert problem.offset == offset
+        assert problem.reason == "decode_error"
+        assert report.segments_decoded == report.segments - 1
+
+
+def test_read_raises_on_corrupt_tile(synthetic_ome):
+    path, data = synthetic_ome
+    corrupt_tile(path)
+    with MxTiffFile(path, enable_cache=False) as tif:
+        # Other channels and regions still read
+        np.testing.assert_array_equal(tif.read_region("DAPI", (0, 0), (64, 64)), data[0, :64, :64])
+        with pytest.raises(MxTiffCorruptTileError) as info:
+            tif.read_region(1, (0, 0), (400, 300))
+        assert info.value.index == 5 and info.value.reason == "decode_error"
+    with MxTiffFile(path) as tif:
+        with pytest.raises(MxTiffCorruptTileError):
+            tif.read_region(1, (0, 0), (400, 300))
+
+
+def test_verify_truncated_tiles(synthetic_ome):
+    path, _ = synthetic_ome
+    size = os.path.getsize(path)
+    with tifffile.TiffFile(path, mode="r+b") as tif:
+        page = tif.pages[3]
+        offsets = list(page.dataoffsets)
+        counts = list(page.databytecounts)
+        # The last tile runs past the end of the file, the one before starts after it
+        counts[-1] = size - offsets[-1] + 100
+        offsets[-2] = size + 10
+        page.tags["TileByteCounts"].overwrite(counts)
+        page.tags["TileOffsets"].overwrite(offsets)
+        last = len(offsets) - 1
+
+    with MxTiffFile(path) as tif:
+        report = tif.verify(fast=True)
+        reasons = {(p.level, p.page, p.index): p.reason for p in report.problems}
+        assert reasons == {(0, 3, last): "truncated", (0, 3, last - 1): "out_of_bounds"}
+        with pytest.raises(MxTiffCorruptTileError) as info:
+            tif.read_region(3, (0, 0), (400, 300))
+        assert info.value.reason == "truncated"
+
+
+def test_verify_fast_mode_samples(tmp_path):
+    path = str(tmp_path / "large.ome.tif")
+    write_synthetic_ome(path, shape=(512, 512), tile=(32, 32), levels=1)
+    with MxTiffFile(path) as tif:
+        report = tif.verify(fast=True, sample=4)
+        assert report.mode == "fast"
+        assert report.segments == 4 * 256
+        assert report.segments_decoded == 4 * 4
+        assert report.ok
+        # The sample is seeded
+        assert tif.verify(fast=True, sample=4).to_dict()["segments_decoded"] == 16
+
+
+def test_verify_fast_mode_samples_segment_stored_last(synthetic_ome, monkeypatch):
+    path, _ = synthetic_ome
+    with tifffile.TiffFile(path, mode="r+b") as tif:
+        page = tif.pages[2]
+        offsets = list(page.dataoffsets)
+        counts = list(page.databytecounts)
+        # Tile 0 stored last in the file, the way writers reorder tiles
+        offsets[0], offsets[-1] = offsets[-1], offsets[0]
+        counts[0], counts[-1] = counts[-1], counts[0]
+        page.tags["TileOffsets"].overwrite(offsets)
+        page.tags["TileByteCounts"].overwrite(counts)
+
+    sampled = []
+    decode = MxTiffFile._decode_segment
+
+    def recording_decode(self, page, index):
+        sampled.append((page.index, index))
+        return decode(self, page, index)
+
+    monkeypatch.setattr(MxTiffFile, "_decode_segment", recording_decode)
+    with MxTiffFile(path) as tif:
+        tif.verify(fast=True, sample=1)
+    assert (2, 0) in sampled and (2, len(offsets) - 1) not in sampled
+
+
+def test_sparse_tiles_read_as_zeros(tmp_path):
+    path = str(tmp_path / "sparse.ome.tif")
+    data = write_synthetic_ome(path, shape=(128, 128), tile=(64, 64), levels=1)
+    with tifffile.TiffFile(path, mode="r+b") as tif:
+        # Tiles never written have zero offset and byte count
+        page = tif.pages[0]
+        page.tags["TileOffsets"].overwrite([page.dataoffsets[0], 0, 0, 0])
+        page.tags["TileByteCounts"].overwrite([page.databytecounts[0], 0, 0, 0])
+    expected = np.zeros_like(data[0])
+    expected[:64, :64] = data[0, :64, :64]
+    with MxTiffFile(path) as tif:
+        assert tif.verify().ok
+        np.testing.assert_array_equal(tif.read_region(0, (0, 0), (128, 128)), expected)
+    with MxTiffFile(path, enable_cache=False) as tif:
+        np.testing.assert_array_equal(tif.read_region(0, (0, 0), (128, 128)), expected)
+
+
+def test_cli_verify(synthetic_ome, tmp_path, capsys):
+    path, _ = synthetic_ome
+    path = str(path)
+    assert main(["verify", path]) == 0
+    assert "OK" in capsys.readouterr().out
+
+    corrupt_tile(path)
+    assert main(["verify", "--fast", "--sample", "100", "--json", path]) == 1
+    (report,) = json.loads(capsys.readouterr().out)
+    assert report["problems"][0]["index"] == 5
+    assert os.path.exists(path)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from mxtifffile import MxTiffFile, TileCache
+from mxtifffile.warmup import overview_regions, regions_from_trace
+
+
+def test_warm_whole_file_then_read_without_decoding(synthetic_ome):
+    path, data = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        job = tif.warm_cache(background=False)
+        assert job.stop_reason == "done" and job.failed == 0
+        # 4 layers x (5x7 tiles at level 0 + 3x4 at level 1)
+        assert job.loaded == 4 * (35 + 12) and job.fraction == 1.0
+        assert tif.warm_cache(background=False).skipped == job.total
+
+        tif._load_tile = lambda page, idx: pytest.fail("tile decoded after warm-up")
+        region = tif.read_region(["CD8", "PanCK"], pos=(100, 50), shape=(200, 150))
+    assert np.array_equal(region, np.moveaxis(data[1:3, 50:200, 100:300], 0, 2))
+
+
+def test_budget_and_order(synthetic_ome):
+    path, _ = synthetic_ome
+    tile_bytes = 64 * 64 * 2
+    cache = TileCache(max_entries=None, max_bytes=40 * tile_bytes)
+    with MxTiffFile(str(path), tile_cache=cache) as tif:
+        assert [r[3] for r in overview_regions(tif)] == [1, 0]
+        # Default budget: half of the cache
+        job = tif.warm_cache(layers="DAPI", background=False)
+        assert job.stop_reason == "budget" and job.loaded == 20
+        # Lowest resolution level first
+        assert all(key[1] == "L1_P0" for key in list(cache._data)[:12])
+
+        job = tif.warm_cache([("Ki67", (0, 0), (128, 64), 0)], max_tiles=1, background=False)
+        assert job.total == 1 and job.loaded == 1
+
+
+def test_background_warmup_backs_off_and_reports(synthetic_ome):
+    path, _ = synthetic_ome
+    updates = []
+    with MxTiffFile(str(path)) as tif:
+        tif._last_read = time.monotonic() + 0.3  # a foreground read "in progress"
+        job = tif.warm_cache(progress=lambda j: updates.append(j.progress()), idle_seconds=0.05)
+        time.sleep(0.1)
+        assert job.loaded == 0 and not job.done
+        assert job.wait(10)
+        assert job.stop_reason == "done" and job.loaded == job.total
+        assert updates[-1]["fraction"] == 1.0 and updates[-1]["stop_reason"] == "done"
+
+        tif._last_read = time.monotonic() + 60
+        job = tif.warm_cache()
+    # close() cancels a running warm-up
+    assert job.done and job.stop_reason == "cancelled"
+
+
+def test_background_warmup_waits_for_long_reads(synthetic_ome):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        started, release = threading.Event(), threading.Event()
+        read = tif._read_resolved
+
+        def slow_read(*args):
+            started.set()
+            release.wait(10)
+            return read(*args)
+
+        tif._read_resolved = slow_read
+        reader = threading.Thread(target=tif.read_region, args=("DAPI", (0, 0), (64, 64)))
+        reader.start()
+        assert started.wait(10)
+        job = tif.warm_cache(idle_seconds=0.01)
+        # The read has been running far longer than idle_seconds
+        time.sleep(0.2)
+        assert job.loaded == 0 and tif._reads_in_flight == 1
+        release.set()
+        reader.join()
+        tif._read_resolved = read
+        assert job.wait(10) and job.stop_reason == "done"
+        assert tif._reads_in_flight == 0
+
+
+def test_streaming_readers_count_as_foreground_reads(synthetic_ome, tmp_path):
+    path, _ = synthetic_ome
+    with MxTiffFile(str(path)) as tif:
+        seen = []
+        get_fd = tif._get_fd
+
+        def recording_get_fd():
+            # Every file read goes through the shared descriptor
+            seen.append(tif._reads_in_flight)
+            return get_fd()
+
+        tif._get_fd = recording_get_fd
+        readers = [
+            lambda: tif.channel_stats("DAPI", level=1, cache=False),
+            lambda: tif.quantify(np.ones((300, 400), dtype=np.int32), layers="DAPI", level=0),
+            lambda: tif.export(str(tmp_path / "subset.ome.tif"), layers="DAPI", levels=1),
+            lambda: tif.convert(str(tmp_path / "tiled.ome.tif"), layers="DAPI", tile=64),
+            lambda: tif.export_ngff(str(tmp_path / "out.ome.zarr"), layers="DAPI"),
+            lambda: tif.verify(fast=True, sample=1),
+        ]
+        for read in readers:
+            seen.clear()
+            tif._page_cache.clear()
+            read()
+            assert seen and set(seen) == {1}
+        assert tif._reads_in_flight == 0
+
+
+def test_regions_from_trace_and_strips(tmp_path):
+    import tifffile
+
+    data = np.random.default_rng(0).integers(0, 4000, (2, 100, 80)).astype("uint16")
+    path = tmp_path / "strips.ome.tif"
+    tifffile.imwrite(str(path), data, ome=True, rowsperstrip=16, compression="zlib",
+                     metadata={"axes": "CYX", "Channel": {"Name": ["DAPI", "CD8"]}})
+    trace = tmp_path / "trace.jsonl"
+    with MxTiffFile(str(path)) as tif:
+        with tif.record_trace(trace):
+            tif.read_region("CD8", pos=(0, 0), shape=(40, 40))
+            for _ in range(3):
+                tif.read_region(None, pos=(10, 20), shape=(30, 30))
+    regions = regions_from_trace(str(trace))
+    assert regions[0] == ([0, 1], (10, 20), (30, 30), 0) and len(regions) == 2
+
+    with MxTiffFile(str(path)) as tif:
+        job = tif.warm_cache(regions, background=False)
+        assert job.loaded == 3
+        tif._read_page_region_optimized = lambda *a: pytest.fail("region read after warm-up")
+        assert np.array_equal(tif.read_region("CD8", pos=(10, 20), shape=(30, 30)),
+                              data[1, 20:50, 10:40])